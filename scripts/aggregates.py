@@ -0,0 +1,291 @@
+"""
+Incremental aggregate store for beledci.az reviews.
+
+Keeps review counts, 1–5 star tallies and photo counts per company, rating
+and scrape batch in data/aggregates.sqlite, plus reviews per feed page for
+full crawls.  Each scrape only adds the rows
+it has not seen before (deduplicated by review_id), so refreshing the store
+costs time proportional to the new reviews, not to the full history.
+Category rollups are derived at read time by joining the per-company rows
+with companies.csv, which is small and may be re-scraped independently.
+
+Usage:
+    python scripts/aggregates.py                      # ingest data/feedbacks.csv
+    python scripts/aggregates.py --csv path/to.csv    # ingest another export
+    python scripts/aggregates.py --rebuild            # drop and rebuild from CSV
+    python scripts/aggregates.py --rebuild --pages    # ... with page volumes of a full crawl
+
+Library use:
+    import aggregates
+    with aggregates.open_store() as conn:
+        batch = aggregates.new_batch(conn)
+        aggregates.add_review(conn, batch, review)
+"""
+
+import argparse
+import csv
+import json
+import sqlite3
+from collections import Counter
+from collections.abc import Iterable, Mapping
+from dataclasses import asdict, is_dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+STORE_PATH = ROOT / "data" / "aggregates.sqlite"
+FEEDBACKS_CSV = ROOT / "data" / "feedbacks.csv"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS batches (
+    batch_id   INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at TEXT NOT NULL,
+    source     TEXT NOT NULL,
+    new_rows   INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS seen_reviews (
+    review_id TEXT PRIMARY KEY,
+    batch_id  INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS review_agg (
+    company_slug TEXT    NOT NULL,
+    company_name TEXT    NOT NULL,
+    rating       INTEGER NOT NULL,
+    batch_id     INTEGER NOT NULL,
+    n            INTEGER NOT NULL DEFAULT 0,
+    n_images     INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (company_slug, company_name, rating, batch_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS crawl_state (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS page_agg (
+    batch_id INTEGER NOT NULL,
+    page     INTEGER NOT NULL,
+    n        INTEGER NOT NULL,
+    PRIMARY KEY (batch_id, page)
+) WITHOUT ROWID;
+"""
+
+# Per-company × rating totals across all batches (what the charts consume)
+REVIEW_AGG_SQL = """
+SELECT company_slug, company_name, rating,
+       SUM(n) AS n, SUM(n_images) AS n_images
+FROM review_agg
+GROUP BY company_slug, company_name, rating
+"""
+
+# Feed pages shift as reviews arrive, so only the latest full crawl is meaningful
+PAGE_AGG_SQL = """
+SELECT page, n FROM page_agg
+WHERE batch_id = (SELECT MAX(batch_id) FROM page_agg)
+ORDER BY page
+"""
+
+
+# ---------------------------------------------------------------------------
+# Writing
+# ---------------------------------------------------------------------------
+
+def open_store(path: Path = STORE_PATH) -> sqlite3.Connection:
+    """Open (and create if needed) the aggregate store."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path)
+    page_cols = {row[1] for row in conn.execute("PRAGMA table_info(page_agg)")}
+    if page_cols and "batch_id" not in page_cols:
+        # Pre-batch layout summed pages across incremental scrapes; drop it
+        conn.execute("DROP TABLE page_agg")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def new_batch(conn: sqlite3.Connection, source: str = "scrape") -> int:
+    """Register a scrape batch and return its id."""
+    cur = conn.execute(
+        "INSERT INTO batches (created_at, source) VALUES (?, ?)",
+        (datetime.now(timezone.utc).isoformat(timespec="seconds"), source),
+    )
+    return cur.lastrowid
+
+
+def _as_row(review) -> dict:
+    return asdict(review) if is_dataclass(review) else review
+
+
+def _truthy(value) -> bool:
+    return str(value).strip().lower() in ("true", "1", "yes")
+
+
+def add_review(conn: sqlite3.Connection, batch_id: int, review) -> bool:
+    """Fold one review (Review record or CSV dict) into the store.
+
+    Returns False if the review_id was already counted.  The caller
+    commits, so a whole page or batch can share one transaction.
+    """
+    row = _as_row(review)
+    review_id = str(row.get("review_id") or "")
+    if not review_id:
+        return False
+
+    cur = conn.execute(
+        "INSERT OR IGNORE INTO seen_reviews (review_id, batch_id) VALUES (?, ?)",
+        (review_id, batch_id),
+    )
+    if cur.rowcount == 0:
+        return False
+
+    images = 1 if _truthy(row.get("has_images")) else 0
+    conn.execute(
+        """
+        INSERT INTO review_agg
+            (company_slug, company_name, rating, batch_id, n, n_images)
+        VALUES (?, ?, ?, ?, 1, ?)
+        ON CONFLICT (company_slug, company_name, rating, batch_id)
+        DO UPDATE SET n = n + 1, n_images = n_images + excluded.n_images
+        """,
+        (row.get("company_slug") or "", row.get("company_name") or "",
+         int(row.get("rating") or 0), batch_id, images),
+    )
+    conn.execute(
+        "UPDATE batches SET new_rows = new_rows + 1 WHERE batch_id = ?",
+        (batch_id,),
+    )
+    return True
+
+
+def set_page_counts(
+    conn: sqlite3.Connection, batch_id: int, counts: Mapping[int, int]
+) -> None:
+    """Record reviews per feed page for a batch that crawled the whole feed.
+
+    Counts every review on each page, seen before or not; the charts read
+    the most recent batch that has page counts.  The caller commits.
+    """
+    conn.executemany(
+        "INSERT OR REPLACE INTO page_agg (batch_id, page, n) VALUES (?, ?, ?)",
+        ((batch_id, page, n) for page, n in counts.items()),
+    )
+
+
+def add_reviews(
+    conn: sqlite3.Connection,
+    reviews: Iterable,
+    source: str = "scrape",
+    count_pages: bool = False,
+) -> int:
+    """Fold many reviews into a fresh batch and commit; return rows added.
+
+    Pass ``count_pages`` only when ``reviews`` is a full feed crawl (e.g. a
+    feedbacks.csv export): its page volumes then replace the stored ones.
+    """
+    batch_id = new_batch(conn, source)
+    pages: Counter[int] = Counter()
+    added = 0
+    for review in reviews:
+        added += add_review(conn, batch_id, review)
+        page = _as_row(review).get("page")
+        if count_pages and page not in (None, ""):
+            pages[int(page)] += 1
+    set_page_counts(conn, batch_id, pages)
+    conn.commit()
+    return added
+
+
+def ingest_csv(
+    conn: sqlite3.Connection, csv_path: Path = FEEDBACKS_CSV, count_pages: bool = False
+) -> int:
+    """Add the rows of a feedbacks CSV that the store has not seen yet.
+
+    ``count_pages`` as for add_reviews: only for the output of a full
+    ``feedback.py`` crawl, not a file the daemon has appended to.
+    """
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        return add_reviews(
+            conn, csv.DictReader(f), source=str(csv_path.name), count_pages=count_pages,
+        )
+
+
+def is_empty(conn: sqlite3.Connection) -> bool:
+    return conn.execute("SELECT 1 FROM seen_reviews LIMIT 1").fetchone() is None
+
+
+def is_seen(conn: sqlite3.Connection, review_id: str) -> bool:
+    return conn.execute(
+        "SELECT 1 FROM seen_reviews WHERE review_id = ?", (str(review_id),)
+    ).fetchone() is not None
+
+
+def max_review_id(conn: sqlite3.Connection) -> int | None:
+    """Highest numeric review_id in the store (feed ids grow over time)."""
+    return conn.execute(
+        "SELECT MAX(CAST(review_id AS INTEGER)) FROM seen_reviews"
+    ).fetchone()[0]
+
+
+def get_state(conn: sqlite3.Connection, key: str) -> dict:
+    """Return the crawl bookmark stored under ``key`` ({} if none)."""
+    row = conn.execute(
+        "SELECT value FROM crawl_state WHERE key = ?", (key,)
+    ).fetchone()
+    return json.loads(row[0]) if row else {}
+
+
+def set_state(conn: sqlite3.Connection, key: str, state: dict) -> None:
+    """Store a crawl bookmark; the caller commits."""
+    conn.execute(
+        "INSERT INTO crawl_state (key, value) VALUES (?, ?) "
+        "ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+        (key, json.dumps(state)),
+    )
+
+
+# ---------------------------------------------------------------------------
+# Reading
+# ---------------------------------------------------------------------------
+
+def load_frames(conn: sqlite3.Connection):
+    """Return (review_agg, page_agg) DataFrames.
+
+    review_agg: company_slug, company_name, rating, n, n_images (all batches)
+    page_agg:   page, n (latest full feed crawl only)
+    """
+    import pandas as pd
+
+    review_agg = pd.read_sql_query(REVIEW_AGG_SQL, conn)
+    page_agg = pd.read_sql_query(PAGE_AGG_SQL, conn)
+    return review_agg, page_agg
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Update the review aggregate store")
+    parser.add_argument(
+        "--csv", type=Path, default=FEEDBACKS_CSV,
+        help="Feedbacks CSV to ingest (default: data/feedbacks.csv)",
+    )
+    parser.add_argument(
+        "--rebuild", action="store_true",
+        help="Delete the store and rebuild it from the CSV",
+    )
+    parser.add_argument(
+        "--pages", action="store_true",
+        help="Also take the page volumes from the CSV (a full feedback.py crawl only)",
+    )
+    args = parser.parse_args()
+
+    if args.rebuild and STORE_PATH.exists():
+        STORE_PATH.unlink()
+
+    with open_store() as conn:
+        added = ingest_csv(conn, args.csv, count_pages=args.pages)
+        total = conn.execute("SELECT COUNT(*) FROM seen_reviews").fetchone()[0]
+
+    print(f"Added {added} new reviews ({total} total) to {STORE_PATH}")
+
+
+if __name__ == "__main__":
+    main()
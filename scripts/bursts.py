@@ -0,0 +1,252 @@
+"""
+Online review-burst detection per company.
+
+Consumes reviews in arrival order (each batch sorted by review_id) and
+keeps, for every company, a few exponentially weighted statistics (constant
+memory per company):
+
+  * volume   — the company's share of the platform-wide review stream, on a
+               fast and a slow horizon measured in platform reviews;
+  * 1-star   — the share of the company's own reviews that are 1-star, on a
+               fast and a slow horizon measured in that company's reviews.
+
+An alert fires when the fast estimate exceeds the slow baseline by more than
+`threshold` standard deviations of the fast EWMA under the baseline (binomial
+variance × α / (2 − α)), with a minimum amount of recent evidence and a
+cooldown so one burst does not alert on every review.  Decay is applied
+lazily when a company next receives a review, so each update is O(1).
+
+Reviews older than the newest one processed — gap refills from the daemon,
+reconcile.py or crawlqueue.py — are scored when they arrive, provided they
+are within LATE_WINDOW ids of it; the ids processed in that window are kept
+to skip duplicates.  Older reviews are skipped and counted.
+
+State is persisted after every run, so restarts continue from the last
+processed review_id instead of replaying history.
+
+Output: data/burst_alerts.csv (appended), state in data/bursts_state.json
+
+Usage:
+    python scripts/bursts.py                      # process new rows of feedbacks.csv
+    python scripts/bursts.py --threshold 4 --reset
+"""
+
+import argparse
+import csv
+import json
+import math
+from collections.abc import Iterable
+from dataclasses import asdict, dataclass, is_dataclass
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+FEEDBACKS_CSV = ROOT / "data" / "feedbacks.csv"
+STATE_PATH = ROOT / "data" / "bursts_state.json"
+ALERTS_PATH = ROOT / "data" / "burst_alerts.csv"
+
+# Half-lives: volume in platform reviews, 1-star share in the company's reviews
+VOLUME_FAST_HALFLIFE = 40
+VOLUME_SLOW_HALFLIFE = 800
+SHARE_FAST_HALFLIFE = 8
+SHARE_SLOW_HALFLIFE = 80
+
+MIN_RATE = 1e-3          # floor for a company's baseline share of the stream
+MIN_RECENT = 4.0         # minimum weighted recent reviews before alerting
+MIN_SHARE_REVIEWS = 20   # company reviews needed before judging its 1-star share
+COOLDOWN = 100           # platform reviews between alerts of the same kind
+LATE_WINDOW = 5_000      # how far below the newest review_id late reviews are taken
+
+
+def alpha(halflife: float) -> float:
+    return 1.0 - 0.5 ** (1.0 / halflife)
+
+
+@dataclass(slots=True)
+class CompanyState:
+    last_position: int = 0
+    vol_fast: float = 0.0
+    vol_slow: float = 0.0
+    recent: float = 0.0          # decayed review count on the fast horizon
+    reviews: int = 0
+    one_fast: float = 0.0        # raw EWMAs; see share() for bias correction
+    one_slow: float = 0.0
+    last_volume_alert: int = -COOLDOWN
+    last_share_alert: int = -COOLDOWN
+
+
+@dataclass(slots=True)
+class Alert:
+    review_id: int
+    company_slug: str
+    company_name: str
+    kind: str                    # "volume" or "one_star"
+    fast: float
+    baseline: float
+    z_score: float
+
+
+def share(raw: float, a: float, n: int) -> float:
+    """Bias-corrected EWMA of n observations that started from zero."""
+    return raw / (1.0 - (1.0 - a) ** n) if n else 0.0
+
+
+def z_score(fast: float, baseline: float, a: float) -> float:
+    var = baseline * (1.0 - baseline) * a / (2.0 - a)
+    return (fast - baseline) / math.sqrt(var) if var > 0 else 0.0
+
+
+class BurstDetector:
+    def __init__(self, threshold: float = 3.5):
+        self.threshold = threshold
+        self.position = 0            # platform reviews processed so far
+        self.last_review_id = 0
+        self.recent_ids: set[int] = set()    # processed ids within LATE_WINDOW
+        self.skipped_late = 0                # this session, not persisted
+        self.companies: dict[str, CompanyState] = {}
+        self.a_vf, self.a_vs = alpha(VOLUME_FAST_HALFLIFE), alpha(VOLUME_SLOW_HALFLIFE)
+        self.a_sf, self.a_ss = alpha(SHARE_FAST_HALFLIFE), alpha(SHARE_SLOW_HALFLIFE)
+
+    # -- updates -----------------------------------------------------------
+
+    def update(self, review) -> list[Alert]:
+        """Process one review (Review record or CSV dict) as it arrives.
+
+        Already processed ids return nothing; so do ids more than LATE_WINDOW
+        below the newest one, which are counted in ``skipped_late``.
+        """
+        row = asdict(review) if is_dataclass(review) else review
+        review_id = int(row["review_id"])
+        if review_id in self.recent_ids:
+            return []
+        if review_id <= self.last_review_id - LATE_WINDOW:
+            self.skipped_late += 1
+            return []
+        self.recent_ids.add(review_id)
+        self.last_review_id = max(self.last_review_id, review_id)
+        self.position += 1
+
+        slug = str(row["company_slug"]).strip("/")
+        s = self.companies.setdefault(slug, CompanyState(last_position=self.position - 1))
+        gap = self.position - s.last_position
+        s.last_position = self.position
+
+        # Volume: the company was absent for gap-1 reviews, present for this one
+        decay_f, decay_s = (1 - self.a_vf) ** gap, (1 - self.a_vs) ** gap
+        vol_baseline = max(s.vol_slow * (1 - self.a_vs) ** (gap - 1), MIN_RATE)
+        s.vol_fast = s.vol_fast * decay_f + self.a_vf
+        s.vol_slow = s.vol_slow * decay_s + self.a_vs
+        s.recent = s.recent * (1 - self.a_vf) ** gap + 1.0
+
+        # 1-star share on the company's own review sequence
+        one = 1.0 if int(row.get("rating") or 0) == 1 else 0.0
+        share_baseline = share(s.one_slow, self.a_ss, s.reviews)
+        s.reviews += 1
+        s.one_fast += self.a_sf * (one - s.one_fast)
+        s.one_slow += self.a_ss * (one - s.one_slow)
+        one_fast = share(s.one_fast, self.a_sf, s.reviews)
+
+        alerts = []
+        name = str(row.get("company_name", ""))
+        z = z_score(s.vol_fast, vol_baseline, self.a_vf)
+        if (z > self.threshold and s.recent >= MIN_RECENT
+                and self.position - s.last_volume_alert >= COOLDOWN):
+            s.last_volume_alert = self.position
+            alerts.append(Alert(review_id, slug, name, "volume",
+                                round(s.vol_fast, 4), round(vol_baseline, 4), round(z, 2)))
+
+        if s.reviews > MIN_SHARE_REVIEWS and 0 < share_baseline < 1:
+            z = z_score(one_fast, share_baseline, self.a_sf)
+            if z > self.threshold and self.position - s.last_share_alert >= COOLDOWN:
+                s.last_share_alert = self.position
+                alerts.append(Alert(review_id, slug, name, "one_star",
+                                    round(one_fast, 4), round(share_baseline, 4), round(z, 2)))
+        return alerts
+
+    def update_many(self, reviews: Iterable) -> list[Alert]:
+        """Sort a batch by review_id and process the unseen ones."""
+        rows = [asdict(r) if is_dataclass(r) else r for r in reviews]
+        rows.sort(key=lambda r: int(r["review_id"]))
+        return [alert for row in rows for alert in self.update(row)]
+
+    # -- persistence -------------------------------------------------------
+
+    def save(self, path: Path = STATE_PATH) -> None:
+        floor = self.last_review_id - LATE_WINDOW
+        self.recent_ids = {rid for rid in self.recent_ids if rid > floor}
+        state = {
+            "position": self.position,
+            "last_review_id": self.last_review_id,
+            "recent_ids": sorted(self.recent_ids),
+            "companies": {slug: asdict(s) for slug, s in self.companies.items()},
+        }
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(state), encoding="utf-8")
+        tmp.replace(path)
+
+    @classmethod
+    def load(cls, path: Path = STATE_PATH, threshold: float = 3.5) -> "BurstDetector":
+        detector = cls(threshold)
+        if path.exists():
+            state = json.loads(path.read_text(encoding="utf-8"))
+            detector.position = state["position"]
+            detector.last_review_id = state["last_review_id"]
+            detector.recent_ids = set(state["recent_ids"])
+            detector.companies = {
+                slug: CompanyState(**s) for slug, s in state["companies"].items()
+            }
+        return detector
+
+
+def append_alerts(alerts: list[Alert], path: Path = ALERTS_PATH) -> None:
+    if not alerts:
+        return
+    write_header = not path.exists()
+    with open(path, "a", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=list(asdict(alerts[0])))
+        if write_header:
+            writer.writeheader()
+        writer.writerows(asdict(a) for a in alerts)
+
+
+def print_alerts(alerts: list[Alert]) -> None:
+    for a in alerts:
+        what = "review volume" if a.kind == "volume" else "1-star share"
+        print(f"  [ALERT] #{a.review_id} {a.company_name or a.company_slug}: {what} "
+              f"{a.fast:.3f} vs baseline {a.baseline:.3f}  (z={a.z_score})")
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Detect review bursts per company")
+    parser.add_argument(
+        "--threshold", type=float, default=3.5,
+        help="Alert z-score threshold (default: 3.5)",
+    )
+    parser.add_argument("--reset", action="store_true", help="Discard saved state first")
+    parser.add_argument("--csv", type=Path, default=FEEDBACKS_CSV, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.reset and STATE_PATH.exists():
+        STATE_PATH.unlink()
+    detector = BurstDetector.load(threshold=args.threshold)
+
+    start_id = detector.last_review_id
+    floor = start_id - LATE_WINDOW
+    with open(args.csv, newline="", encoding="utf-8") as f:
+        new_rows = [r for r in csv.DictReader(f)
+                    if r["review_id"] and int(r["review_id"]) > floor
+                    and int(r["review_id"]) not in detector.recent_ids]
+    alerts = detector.update_many(new_rows)
+    detector.save()
+    append_alerts(alerts)
+    print_alerts(alerts)
+    late = sum(int(r["review_id"]) <= start_id for r in new_rows)
+    print(f"\nProcessed {len(new_rows)} new reviews ({late} older than #{start_id}); "
+          f"{len(alerts)} alerts; state saved to {STATE_PATH.name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,26 +1,35 @@
 """
 Scraper for beledci.az company data.
 
-Flow:
+Flow (streamed one company at a time):
   1. Fetch each category page  → collect all company slugs + basic listing data
   2. Fetch each company profile → collect numeric rating + full category label
 
-Output: data/companies.csv
+Output: data/companies.csv (each run is also appended to data/history.sqlite)
 
 Usage:
     python scripts/companies.py
     python scripts/companies.py --delay 0.5 --skip-profile
+
+Library use:
+    from companies import iter_companies
+    for company in iter_companies(profile=False):
+        ...
 """
 
 import argparse
 import csv
 import re
 import time
+from collections.abc import Iterator
+from dataclasses import asdict, dataclass, fields
 from pathlib import Path
 
 import requests
 from bs4 import BeautifulSoup
 
+import history
+
 BASE_URL = "https://beledci.az"
 OUTPUT_PATH = Path(__file__).parent.parent / "data" / "companies.csv"
 
@@ -53,19 +62,26 @@ CATEGORIES = [
     ("entertainment",    "Əyləncə"),
 ]
 
-CSV_FIELDS = [
-    "slug",
-    "name",
-    "company_url",
-    "category_slug",
-    "category_name",
-    "category_label",
-    "rating_value",
-    "rating_label",
-    "rating_stars",
-    "review_count",
-    "photo_url",
-]
+
+@dataclass(slots=True)
+class Company:
+    """One company row; field order matches the CSV columns."""
+
+    slug: str
+    name: str
+    company_url: str
+    category_slug: str
+    category_name: str
+    category_label: str = ""   # filled in step 2
+    rating_value: str = ""     # filled in step 2
+    rating_label: str = ""
+    rating_stars: int = 0
+    review_count: int = 0
+    photo_url: str = ""
+
+
+CSV_FIELDS = [f.name for f in fields(Company)]
+PROFILE_FIELDS = ["category_label", "rating_value"]   # only known after step 2
 
 
 # ---------------------------------------------------------------------------
@@ -90,14 +106,15 @@ def parse_review_count(rate_p) -> int:
 # Step 1 – scrape category listing pages
 # ---------------------------------------------------------------------------
 
-def scrape_category(session: requests.Session, cat_slug: str, cat_name: str) -> list[dict]:
-    """Return list of basic company dicts from /cat/{cat_slug}."""
+def iter_category(
+    session: requests.Session, cat_slug: str, cat_name: str
+) -> Iterator[Company]:
+    """Yield basic company records from /cat/{cat_slug}."""
     url = f"{BASE_URL}/cat/{cat_slug}"
     resp = session.get(url, headers=HEADERS, timeout=20)
     resp.raise_for_status()
     soup = BeautifulSoup(resp.text, "html.parser")
 
-    companies = []
     for card in soup.select("a.company-card"):
         slug = card.get("href", "").strip("/")
         if not slug:
@@ -122,47 +139,42 @@ def scrape_category(session: requests.Session, cat_slug: str, cat_name: str) ->
         rate_p = card.select_one("p.rate")
         review_count = parse_review_count(rate_p)
 
-        companies.append({
-            "slug": slug,
-            "name": name,
-            "company_url": f"{BASE_URL}/{slug}",
-            "category_slug": cat_slug,
-            "category_name": cat_name,
-            "category_label": "",      # filled in step 2
-            "rating_value": "",        # filled in step 2
-            "rating_label": rating_label,
-            "rating_stars": stars,
-            "review_count": review_count,
-            "photo_url": photo_url,
-        })
-
-    return companies
-
-
-def collect_all_companies(session: requests.Session, delay: float) -> list[dict]:
-    """Scrape all category pages and deduplicate companies."""
-    seen: dict[str, dict] = {}  # slug → row
+        yield Company(
+            slug=slug,
+            name=name,
+            company_url=f"{BASE_URL}/{slug}",
+            category_slug=cat_slug,
+            category_name=cat_name,
+            rating_label=rating_label,
+            rating_stars=stars,
+            review_count=review_count,
+            photo_url=photo_url,
+        )
+
+
+def iter_listed_companies(
+    session: requests.Session, delay: float
+) -> Iterator[Company]:
+    """Walk all category pages and yield each company slug once."""
+    seen: set[str] = set()
 
     for cat_slug, cat_name in CATEGORIES:
         print(f"  category: {cat_name} (/cat/{cat_slug})")
+        found = 0
         try:
-            rows = scrape_category(session, cat_slug, cat_name)
+            for company in iter_category(session, cat_slug, cat_name):
+                found += 1
+                # If already seen in another category, keep first occurrence
+                # (companies appear to belong to one category only)
+                if company.slug not in seen:
+                    seen.add(company.slug)
+                    yield company
         except requests.RequestException as e:
             print(f"    [ERROR] {e}")
-            rows = []
-
-        for row in rows:
-            slug = row["slug"]
-            if slug not in seen:
-                seen[slug] = row
-            # If already seen in another category, keep first occurrence
-            # (companies appear to belong to one category only)
 
-        print(f"    → {len(rows)} companies  (unique so far: {len(seen)})")
+        print(f"    → {found} companies  (unique so far: {len(seen)})")
         time.sleep(delay)
 
-    return list(seen.values())
-
 
 # ---------------------------------------------------------------------------
 # Step 2 – enrich with individual company profile pages
@@ -190,22 +202,74 @@ def fetch_company_profile(session: requests.Session, slug: str) -> dict:
     return {"rating_value": rating_value, "category_label": category_label}
 
 
-def enrich_companies(
-    session: requests.Session, companies: list[dict], delay: float
-) -> None:
-    """In-place enrich each company dict with profile data."""
-    total = len(companies)
-    for i, row in enumerate(companies, 1):
-        slug = row["slug"]
-        try:
-            profile = fetch_company_profile(session, slug)
-            row.update(profile)
-        except requests.RequestException as e:
-            print(f"  [ERROR] {slug}: {e}")
+def enrich_company(session: requests.Session, company: Company) -> bool:
+    """In-place enrich one company record with its profile data.
+
+    Returns False, leaving the record untouched, if the profile page could
+    not be fetched.
+    """
+    try:
+        profile = fetch_company_profile(session, company.slug)
+    except requests.RequestException as e:
+        print(f"  [ERROR] {company.slug}: {e}")
+        return False
+    company.rating_value = profile["rating_value"]
+    company.category_label = profile["category_label"]
+    return True
+
+
+# ---------------------------------------------------------------------------
+# Library API – lazy generator over all companies
+# ---------------------------------------------------------------------------
 
-        print(f"  [{i:>3}/{total}] {row['name']:<35} rating={row['rating_value']}")
-        if i < total:
-            time.sleep(delay)
+def iter_companies(
+    delay: float = 0.5,
+    profile: bool = True,
+    session: requests.Session | None = None,
+    previous: dict[str, dict] | None = None,
+) -> Iterator[Company]:
+    """Yield every unique company, enriched from its profile page if asked.
+
+    Records are produced as soon as their category card (and profile page)
+    has been parsed, so nothing beyond the seen-slug set is held in memory.
+    A company whose profile was skipped or failed to download keeps the
+    PROFILE_FIELDS of its row in ``previous`` (rows by slug, see read_csv),
+    so a missing page does not read as a blanked rating.
+    """
+    previous = previous or {}
+    own_session = session is None
+    if own_session:
+        session = requests.Session()
+    try:
+        for i, company in enumerate(iter_listed_companies(session, delay), 1):
+            fetched = profile and enrich_company(session, company)
+            if not fetched and company.slug in previous:
+                for field in PROFILE_FIELDS:
+                    setattr(company, field, previous[company.slug].get(field, ""))
+            if profile:
+                print(f"  [{i:>3}] {company.name:<35} rating={company.rating_value}")
+                time.sleep(delay)
+            yield company
+    finally:
+        if own_session:
+            session.close()
+
+
+def read_csv(path: Path = OUTPUT_PATH) -> dict[str, dict]:
+    """Rows of an earlier run by slug; empty if there is no CSV yet."""
+    if not path.exists():
+        return {}
+    with open(path, newline="", encoding="utf-8") as f:
+        return {row["slug"]: row for row in csv.DictReader(f)}
+
+
+def write_csv(companies: list[Company], path: Path = OUTPUT_PATH) -> None:
+    """Write companies sorted by category then name."""
+    companies.sort(key=lambda c: (c.category_slug, c.name))
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
+        writer.writeheader()
+        writer.writerows(asdict(c) for c in companies)
 
 
 # ---------------------------------------------------------------------------
@@ -226,25 +290,22 @@ def main() -> None:
 
     OUTPUT_PATH.parent.mkdir(parents=True, exist_ok=True)
 
-    with requests.Session() as session:
-        # Step 1 – collect companies from category pages
-        print("\n=== Step 1: Scraping category pages ===")
-        companies = collect_all_companies(session, args.delay)
-        print(f"\nTotal unique companies: {len(companies)}")
+    # Category cards and (unless skipped) profile pages, one company at a time
+    print("\n=== Scraping category pages and company profiles ===")
+    companies = list(iter_companies(
+        args.delay, profile=not args.skip_profile, previous=read_csv(),
+    ))
+    print(f"\nTotal unique companies: {len(companies)}")
 
-        # Step 2 – enrich with company profile pages
-        if not args.skip_profile:
-            print("\n=== Step 2: Fetching company profiles ===")
-            enrich_companies(session, companies, args.delay)
-
-    # Write CSV
-    companies.sort(key=lambda r: (r["category_slug"], r["name"]))
-    with open(OUTPUT_PATH, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
-        writer.writeheader()
-        writer.writerows(companies)
+    write_csv(companies)
+    with history.open_store() as conn:
+        # Without profiles, companies missing from the old CSV have blank
+        # ratings; keep whatever the history already knows for them
+        skipped = PROFILE_FIELDS if args.skip_profile else ()
+        run_id, changed = history.record(conn, companies, skip_fields=skipped)
 
     print(f"\nDone. {len(companies)} companies saved to {OUTPUT_PATH}")
+    print(f"      history run {run_id}: {changed} changed fields recorded")
 
 
 if __name__ == "__main__":
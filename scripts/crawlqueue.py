@@ -0,0 +1,538 @@
+"""
+Lease-based crawl queue for sharded, crash-tolerant scrapes of beledci.az.
+
+Feed pages, category pages and company profile slugs become jobs in a
+SQLite queue.  Any number of worker processes — on this host or on other
+hosts that share the queue file — claim jobs under a time-limited lease,
+extend it with heartbeats while they work, and store their records in the
+same database.  A job whose lease runs out (worker crashed or lost its host)
+is handed to the next worker that asks; a job that keeps failing is parked
+after --max-attempts.  All workers draw from one token bucket kept in the
+queue, so the combined request rate stays within --rate regardless of how
+many workers run.
+
+Records are keyed by review_id / company slug, so pages fetched twice (feed
+shifts, re-leased jobs) merge into one deduplicated dataset on --export.
+Seeding again starts a new epoch: finished jobs go back to pending, so a
+drained queue can be re-crawled in place.
+
+The queue file must live on a filesystem with working POSIX locks when
+workers on several hosts share it.
+
+Usage:
+    python scripts/crawlqueue.py --seed feed              # all feed pages
+    python scripts/crawlqueue.py --seed companies         # categories (+ profiles)
+    python scripts/crawlqueue.py --work --workers 4 --rate 2
+    python scripts/crawlqueue.py --export                 # merge into data/*.csv
+    python scripts/crawlqueue.py                          # queue status
+"""
+
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import socket
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+import requests
+
+import aggregates
+import companies as companies_scraper
+import feedback
+import history
+
+ROOT = Path(__file__).parent.parent
+QUEUE_PATH = ROOT / "data" / "crawlqueue.sqlite"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id      INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind        TEXT    NOT NULL,              -- feed_page, category, profile
+    key         TEXT    NOT NULL,              -- page number, category or company slug
+    args        TEXT    NOT NULL DEFAULT '{}', -- JSON
+    state       TEXT    NOT NULL DEFAULT 'pending',  -- pending, leased, done, failed
+    attempts    INTEGER NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_until REAL,
+    error       TEXT,
+    epoch       INTEGER NOT NULL DEFAULT 0,  -- seed run that last queued the job
+    UNIQUE (kind, key)
+);
+CREATE INDEX IF NOT EXISTS jobs_claim ON jobs (state, lease_until);
+CREATE TABLE IF NOT EXISTS records (
+    kind    TEXT NOT NULL,                     -- review, company, profile
+    key     TEXT NOT NULL,                     -- review_id or company slug
+    job_id  INTEGER NOT NULL,
+    payload TEXT NOT NULL,                     -- JSON
+    PRIMARY KEY (kind, key)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS budget (
+    name    TEXT PRIMARY KEY,
+    rate    REAL NOT NULL,                     -- tokens per second
+    burst   REAL NOT NULL,
+    tokens  REAL NOT NULL,
+    updated REAL NOT NULL
+);
+"""
+
+
+def open_queue(path: Path = QUEUE_PATH) -> sqlite3.Connection:
+    """Autocommit connection; writers take explicit BEGIN IMMEDIATE locks."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path, timeout=60, isolation_level=None)
+    conn.executescript(SCHEMA)
+    if "epoch" not in {row[1] for row in conn.execute("PRAGMA table_info(jobs)")}:
+        conn.execute("ALTER TABLE jobs ADD COLUMN epoch INTEGER NOT NULL DEFAULT 0")
+    return conn
+
+
+@contextmanager
+def immediate(conn: sqlite3.Connection):
+    """Write transaction that takes the database lock up front."""
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+
+
+@dataclass(slots=True)
+class Job:
+    job_id: int
+    kind: str
+    key: str
+    args: dict
+    attempts: int
+    epoch: int = 0
+
+
+# ---------------------------------------------------------------------------
+# Queue operations
+# ---------------------------------------------------------------------------
+
+# Queue a job, or re-arm it if it finished (done or failed) in an earlier epoch.
+# Pending and leased jobs are left alone: they are already going to run.
+UPSERT_JOB = """
+INSERT INTO jobs (kind, key, args, epoch) VALUES (?, ?, ?, ?)
+ON CONFLICT (kind, key) DO UPDATE SET
+    state = 'pending', attempts = 0, error = NULL,
+    lease_owner = NULL, lease_until = NULL,
+    args = excluded.args, epoch = excluded.epoch
+WHERE jobs.state IN ('done', 'failed') AND jobs.epoch < excluded.epoch
+"""
+
+
+def new_epoch(conn: sqlite3.Connection) -> int:
+    """Number for the next seeding; pass it to each enqueue() of that seeding."""
+    return conn.execute("SELECT COALESCE(MAX(epoch), 0) + 1 FROM jobs").fetchone()[0]
+
+
+def enqueue(
+    conn: sqlite3.Connection, kind: str, keys, args: dict | None = None,
+    epoch: int | None = None,
+) -> int:
+    """Seed jobs in ``epoch`` (default: a new one); return how many were added or re-armed.
+
+    Re-seeding a finished queue therefore crawls it again, and the follow-up
+    jobs of the re-run (profile pages) are re-armed in turn.
+    """
+    payload = json.dumps(args or {}, ensure_ascii=False)
+    before = conn.total_changes
+    with immediate(conn):
+        if epoch is None:
+            epoch = new_epoch(conn)
+        conn.executemany(UPSERT_JOB, [(kind, str(k), payload, epoch) for k in keys])
+    return conn.total_changes - before
+
+
+def claim(conn: sqlite3.Connection, owner: str, lease: float, max_attempts: int) -> Job | None:
+    """Lease the oldest pending job, or one whose lease has expired."""
+    now = time.time()
+    with immediate(conn):
+        # Expired leases that used up their attempts are parked for good
+        conn.execute(
+            "UPDATE jobs SET state = 'failed', lease_owner = NULL "
+            "WHERE state = 'leased' AND lease_until < ? AND attempts >= ?",
+            (now, max_attempts),
+        )
+        row = conn.execute(
+            "SELECT job_id, kind, key, args, attempts, epoch FROM jobs "
+            "WHERE state = 'pending' OR (state = 'leased' AND lease_until < ?) "
+            "ORDER BY job_id LIMIT 1",
+            (now,),
+        ).fetchone()
+        if row is None:
+            return None
+        conn.execute(
+            "UPDATE jobs SET state = 'leased', lease_owner = ?, lease_until = ?, "
+            "attempts = attempts + 1 WHERE job_id = ?",
+            (owner, now + lease, row[0]),
+        )
+    return Job(row[0], row[1], row[2], json.loads(row[3]), row[4] + 1, row[5])
+
+
+def heartbeat(conn: sqlite3.Connection, job: Job, owner: str, lease: float) -> bool:
+    """Extend our lease; False if it expired and another worker took the job."""
+    cur = conn.execute(
+        "UPDATE jobs SET lease_until = ? "
+        "WHERE job_id = ? AND state = 'leased' AND lease_owner = ?",
+        (time.time() + lease, job.job_id, owner),
+    )
+    return cur.rowcount == 1
+
+
+def complete(
+    conn: sqlite3.Connection, job: Job, owner: str,
+    records: list[tuple[str, str, dict]], follow_up: list[tuple[str, str, dict]],
+) -> None:
+    """Store records, enqueue follow-up jobs and mark the job done atomically.
+
+    Records are upserted by key, so a job that ran twice (lease lost, page
+    re-fetched) leaves one copy of each record behind.
+    """
+    with immediate(conn):
+        conn.executemany(
+            "INSERT OR REPLACE INTO records (kind, key, job_id, payload) VALUES (?, ?, ?, ?)",
+            [(kind, key, job.job_id, json.dumps(payload, ensure_ascii=False))
+             for kind, key, payload in records],
+        )
+        conn.executemany(
+            UPSERT_JOB,
+            [(kind, key, json.dumps(args, ensure_ascii=False), job.epoch)
+             for kind, key, args in follow_up],
+        )
+        conn.execute(
+            "UPDATE jobs SET state = 'done', lease_owner = NULL, error = NULL "
+            "WHERE job_id = ? AND lease_owner = ?",
+            (job.job_id, owner),
+        )
+
+
+def fail(conn: sqlite3.Connection, job: Job, owner: str, error: str, max_attempts: int) -> None:
+    state = "failed" if job.attempts >= max_attempts else "pending"
+    conn.execute(
+        "UPDATE jobs SET state = ?, lease_owner = NULL, lease_until = NULL, error = ? "
+        "WHERE job_id = ? AND lease_owner = ?",
+        (state, error[:500], job.job_id, owner),
+    )
+
+
+def retry_failed(conn: sqlite3.Connection) -> int:
+    """Put parked jobs back to pending with a fresh attempt count and no error."""
+    return conn.execute(
+        "UPDATE jobs SET state = 'pending', attempts = 0, error = NULL WHERE state = 'failed'"
+    ).rowcount
+
+
+def acquire_token(conn: sqlite3.Connection, name: str = "beledci.az") -> None:
+    """Block until the shared token bucket allows one more request."""
+    while True:
+        with immediate(conn):
+            row = conn.execute(
+                "SELECT rate, burst, tokens, updated FROM budget WHERE name = ?", (name,)
+            ).fetchone()
+            if row is None:
+                return
+            rate, burst, tokens, updated = row
+            now = time.time()
+            tokens = min(burst, tokens + (now - updated) * rate)
+            granted = tokens >= 1.0 or rate <= 0
+            if granted:
+                tokens = max(0.0, tokens - 1.0)
+            conn.execute(
+                "UPDATE budget SET tokens = ?, updated = ? WHERE name = ?",
+                (tokens, now, name),
+            )
+        if granted:
+            return
+        time.sleep((1.0 - tokens) / rate)
+
+
+def set_budget(conn: sqlite3.Connection, rate: float, burst: float,
+               name: str = "beledci.az") -> None:
+    conn.execute(
+        "INSERT INTO budget (name, rate, burst, tokens, updated) VALUES (?, ?, ?, ?, ?) "
+        "ON CONFLICT (name) DO UPDATE SET rate = excluded.rate, burst = excluded.burst",
+        (name, rate, burst, burst, time.time()),
+    )
+
+
+# ---------------------------------------------------------------------------
+# Job handlers — each returns (records, follow-up jobs)
+# ---------------------------------------------------------------------------
+
+def run_feed_page(session: requests.Session, job: Job):
+    reviews = list(feedback.iter_page(session, int(job.key)))
+    return [("review", str(r.review_id), asdict(r)) for r in reviews], []
+
+
+def run_category(session: requests.Session, job: Job):
+    listed = list(companies_scraper.iter_category(session, job.key, job.args["name"]))
+    records = [("company", c.slug, asdict(c)) for c in listed]
+    follow_up = [("profile", c.slug, {}) for c in listed] if job.args.get("profile") else []
+    return records, follow_up
+
+
+def run_profile(session: requests.Session, job: Job):
+    profile = companies_scraper.fetch_company_profile(session, job.key)
+    return [("profile", job.key, profile)], []
+
+
+HANDLERS = {
+    "feed_page": run_feed_page,
+    "category": run_category,
+    "profile": run_profile,
+}
+
+
+# ---------------------------------------------------------------------------
+# Worker
+# ---------------------------------------------------------------------------
+
+class Heartbeat(threading.Thread):
+    """Keeps one job's lease alive from a separate connection."""
+
+    def __init__(self, path: Path, job: Job, owner: str, lease: float):
+        super().__init__(daemon=True)
+        self.path, self.job, self.owner, self.lease = path, job, owner, lease
+        self.stopped = threading.Event()
+        self.lost = False
+
+    def run(self) -> None:
+        conn = open_queue(self.path)
+        try:
+            while not self.stopped.wait(self.lease / 3):
+                if not heartbeat(conn, self.job, self.owner, self.lease):
+                    self.lost = True
+                    return
+        finally:
+            conn.close()
+
+
+def work(path: Path, lease: float, max_attempts: int, idle_wait: float = 5.0) -> dict:
+    """Claim and run jobs until none are pending or leased; return counts."""
+    owner = f"{socket.gethostname()}:{os.getpid()}"
+    conn = open_queue(path)
+    stats = {"done": 0, "error": 0, "lost": 0}
+    with requests.Session() as session:
+        while True:
+            job = claim(conn, owner, lease, max_attempts)
+            if job is None:
+                active = conn.execute(
+                    "SELECT COUNT(*) FROM jobs WHERE state IN ('pending', 'leased')"
+                ).fetchone()[0]
+                if not active:
+                    break
+                time.sleep(idle_wait)     # others hold leases; they may expire
+                continue
+
+            beat = Heartbeat(path, job, owner, lease)
+            beat.start()
+            try:
+                acquire_token(conn)
+                records, follow_up = HANDLERS[job.kind](session, job)
+            except (requests.RequestException, KeyError, ValueError) as e:
+                beat.stopped.set()
+                beat.join()
+                fail(conn, job, owner, repr(e), max_attempts)
+                stats["error"] += 1
+                print(f"  [{owner}] [ERROR] {job.kind} {job.key} "
+                      f"(attempt {job.attempts}): {e}", flush=True)
+                continue
+            beat.stopped.set()
+            beat.join()
+            complete(conn, job, owner, records, follow_up)
+            if beat.lost:
+                stats["lost"] += 1
+            stats["done"] += 1
+            print(f"  [{owner}] {job.kind} {job.key}: {len(records)} records"
+                  + (f", +{len(follow_up)} jobs" if follow_up else ""), flush=True)
+    conn.close()
+    return stats
+
+
+def _work_process(path: Path, lease: float, max_attempts: int) -> None:
+    stats = work(path, lease, max_attempts)
+    print(f"  worker {os.getpid()} finished: {stats}", flush=True)
+
+
+# ---------------------------------------------------------------------------
+# Export — merge records into the regular CSVs
+# ---------------------------------------------------------------------------
+
+def load_records(conn: sqlite3.Connection, kind: str) -> dict[str, dict]:
+    return {
+        key: json.loads(payload)
+        for key, payload in conn.execute(
+            "SELECT key, payload FROM records WHERE kind = ?", (kind,)
+        )
+    }
+
+
+def export_reviews(conn: sqlite3.Connection, path: Path = feedback.OUTPUT_PATH) -> int:
+    """Union queue reviews with the existing CSV (queue wins), newest first."""
+    reviews = {}
+    if path.exists():
+        with open(path, newline="", encoding="utf-8") as f:
+            reviews = {row["review_id"]: row for row in csv.DictReader(f) if row["review_id"]}
+    queued = load_records(conn, "review")
+    reviews.update(queued)
+    rows = sorted(reviews.values(), key=lambda r: int(r["review_id"]), reverse=True)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=feedback.CSV_FIELDS, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(rows)
+    with aggregates.open_store() as store:
+        added = aggregates.add_reviews(store, queued.values(), source="crawlqueue")
+    print(f"{len(queued)} queued reviews merged → {len(rows)} rows in {path.name} "
+          f"({added} new in {aggregates.STORE_PATH.name})")
+    return len(rows)
+
+
+def export_companies(
+    conn: sqlite3.Connection, path: Path = companies_scraper.OUTPUT_PATH
+) -> int:
+    """Company cards joined with their profile records, via companies.write_csv.
+
+    A company without a profile record keeps the rating and label of the
+    existing CSV.  One whose profile job failed and that has no earlier
+    values is left out rather than written with a blank rating.
+    """
+    profiles = load_records(conn, "profile")
+    previous = {}
+    if path.exists():
+        with open(path, newline="", encoding="utf-8") as f:
+            previous = {row["slug"]: row for row in csv.DictReader(f)}
+    failed = {
+        key for key, in conn.execute(
+            "SELECT key FROM jobs WHERE kind = 'profile' AND state = 'failed'"
+        )
+    }
+    listed, skipped = [], []
+    for slug, row in load_records(conn, "company").items():
+        company = companies_scraper.Company(**row)
+        profile = profiles.get(slug) or previous.get(slug)
+        if profile:
+            company.rating_value = profile["rating_value"]
+            company.category_label = profile["category_label"]
+        elif slug in failed:
+            skipped.append(slug)
+            continue
+        listed.append(company)
+    if skipped:
+        print(f"Left out {len(skipped)} companies whose profile failed: {', '.join(skipped)}")
+    if not listed:
+        return 0
+    companies_scraper.write_csv(listed, path)
+    with history.open_store() as store:
+        run_id, changed = history.record(store, listed)
+    print(f"{len(listed)} companies ({len(profiles)} with profiles) written to "
+          f"{path.name}; history run {run_id}: {changed} changes")
+    return len(listed)
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+def print_status(conn: sqlite3.Connection) -> None:
+    rows = conn.execute(
+        "SELECT kind, state, COUNT(*) FROM jobs GROUP BY kind, state ORDER BY kind, state"
+    ).fetchall()
+    if not rows:
+        print("Queue is empty — seed it with --seed feed|companies")
+        return
+    for kind, state, n in rows:
+        print(f"  {kind:<10} {state:<8} {n:>6}")
+    for kind, n in conn.execute("SELECT kind, COUNT(*) FROM records GROUP BY kind"):
+        print(f"  records: {kind:<8} {n:>6}")
+    for kind, key, attempts, error in conn.execute(
+        "SELECT kind, key, attempts, error FROM jobs WHERE state = 'failed' LIMIT 10"
+    ):
+        print(f"  failed: {kind} {key} after {attempts} attempts: {error}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Lease-based crawl queue for beledci.az")
+    parser.add_argument("--queue", type=Path, default=QUEUE_PATH,
+                        help="Queue database, shared by all workers (default: data/crawlqueue.sqlite)")
+    parser.add_argument("--seed", choices=["feed", "companies", "all"],
+                        help="Enqueue feed pages and/or category pages")
+    parser.add_argument("--start", type=int, default=1, help="First feed page (default: 1)")
+    parser.add_argument("--end", type=int, default=0, help="Last feed page (default: auto-detect)")
+    parser.add_argument("--skip-profile", action="store_true",
+                        help="Do not enqueue profile pages for listed companies")
+    parser.add_argument("--work", action="store_true", help="Run workers until the queue drains")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Worker processes on this host (default: 1)")
+    parser.add_argument("--rate", type=float,
+                        help="Requests per second across all workers, 0 = unlimited "
+                             "(default: keep the stored rate, initially 2)")
+    parser.add_argument("--burst", type=float, default=2.0,
+                        help="Token bucket size (default: 2)")
+    parser.add_argument("--lease", type=float, default=60.0,
+                        help="Lease length in seconds; heartbeats renew it (default: 60)")
+    parser.add_argument("--max-attempts", type=int, default=5,
+                        help="Attempts before a job is marked failed (default: 5)")
+    parser.add_argument("--retry-failed", action="store_true",
+                        help="Put failed jobs back into the queue")
+    parser.add_argument("--export", action="store_true",
+                        help="Merge the records into feedbacks.csv / companies.csv")
+    args = parser.parse_args()
+
+    conn = open_queue(args.queue)
+    epoch = new_epoch(conn)          # one epoch for everything this run seeds
+    if args.seed in ("feed", "all"):
+        end = args.end
+        if end == 0:
+            with requests.Session() as session:
+                end = feedback.get_last_page(session)
+        n = enqueue(conn, "feed_page", range(args.start, end + 1), epoch=epoch)
+        print(f"Seeded {n} new or finished feed page jobs ({args.start}–{end})")
+    if args.seed in ("companies", "all"):
+        n = sum(
+            enqueue(conn, "category", [slug], {"name": name, "profile": not args.skip_profile},
+                    epoch=epoch)
+            for slug, name in companies_scraper.CATEGORIES
+        )
+        print(f"Seeded {n} new or finished category jobs")
+    if args.retry_failed:
+        print(f"Re-queued {retry_failed(conn)} failed jobs")
+
+    if args.rate is not None:
+        set_budget(conn, args.rate, args.burst)
+    elif conn.execute("SELECT COUNT(*) FROM budget").fetchone()[0] == 0:
+        set_budget(conn, 2.0, args.burst)
+
+    if args.work:
+        print(f"Starting {args.workers} worker(s) on {socket.gethostname()} …")
+        procs = [
+            multiprocessing.Process(
+                target=_work_process, args=(args.queue, args.lease, args.max_attempts),
+            )
+            for _ in range(args.workers)
+        ]
+        for p in procs:
+            p.start()
+        for p in procs:
+            p.join()
+
+    if args.export:
+        export_reviews(conn)
+        export_companies(conn)
+
+    if not (args.seed or args.work or args.export or args.retry_failed):
+        print_status(conn)
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
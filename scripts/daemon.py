@@ -0,0 +1,296 @@
+"""
+Long-running refresh scheduler for beledci.az data and charts.
+
+Each feed cycle crawls the review feed from page 1 down to the last point
+the store is known to be complete (resuming a pass that was cut short),
+appends the new rows to data/feedbacks.csv and then the aggregate store,
+runs them through the burst detector (bursts.py) and re-renders every chart
+that reads reviews (charts are drawn whole, so which companies got the new
+reviews does not narrow the set).  Each
+companies cycle re-scrapes the category (and profile) pages, diffs them
+against data/companies.csv column by column and re-renders only the charts
+that read a changed column.  A file lock keeps overlapping runs — from
+this daemon or a second copy of it — from colliding.
+
+Usage:
+    python scripts/daemon.py
+    python scripts/daemon.py --feed-interval 15 --companies-interval 720
+    python scripts/daemon.py --once
+    python scripts/daemon.py --dashboard       # HTML dashboard instead of PNGs
+"""
+
+import argparse
+import fcntl
+import sqlite3
+import time
+from contextlib import contextmanager
+from dataclasses import asdict
+from datetime import datetime
+from pathlib import Path
+
+import requests
+
+import aggregates
+import bursts
+import companies as companies_scraper
+import dashboard
+import feedback
+import generate_charts
+import history
+
+ROOT = Path(__file__).parent.parent
+LOCK_PATH = ROOT / "data" / ".refresh.lock"
+FEED_STATE = "feed"
+
+
+def log(message: str) -> None:
+    print(f"[{datetime.now():%Y-%m-%d %H:%M:%S}] {message}", flush=True)
+
+
+@contextmanager
+def refresh_lock():
+    """Yield True if this process holds the refresh lock, False if busy."""
+    LOCK_PATH.parent.mkdir(parents=True, exist_ok=True)
+    with open(LOCK_PATH, "w") as lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+# ---------------------------------------------------------------------------
+# Delta crawls
+# ---------------------------------------------------------------------------
+
+def _review_ids(reviews: list[feedback.Review]) -> list[int]:
+    return [int(r.review_id) for r in reviews if r.review_id.isdigit()]
+
+
+def crawl_feed_delta(
+    store: sqlite3.Connection, delay: float, max_pages: int
+) -> tuple[list[feedback.Review], dict]:
+    """Crawl the feed newest-first; return (unseen reviews, new feed bookmark).
+
+    The bookmark's ``frontier`` is the newest review_id below which the
+    store is known to be complete.  A cycle keeps paging past already-seen
+    pages until it reaches the frontier, so holes left by a crash or a
+    ``max_pages`` cap are refilled.  A cycle that stops short records where
+    it got to (``top`` and ``resume_page``); the next one catches up on new
+    reviews down to ``top`` and then jumps straight to ``resume_page``.
+
+    Nothing is written to the store here: the caller marks the reviews as
+    seen only after they are safely in the CSV.
+    """
+    state = aggregates.get_state(store, FEED_STATE)
+    frontier = state.get("frontier")
+    if frontier is None and not aggregates.is_empty(store):
+        frontier = aggregates.max_review_id(store)
+    resume_page = state.get("resume_page")
+    boundary = state.get("top") if resume_page else frontier
+
+    new_reviews: list[feedback.Review] = []
+    picked: set[str] = set()
+    top = None
+    reached = False
+    page = 1
+    with requests.Session() as session:
+        for _ in range(max_pages):
+            try:
+                reviews = list(feedback.iter_page(session, page))
+            except requests.RequestException as e:
+                log(f"[ERROR] page {page}: {e}")
+                break
+            if not reviews:                  # ran off the end of the feed
+                reached = True
+                break
+            ids = _review_ids(reviews)
+            if top is None and ids:
+                top = max(ids)
+            fresh = [
+                r for r in reviews
+                if r.review_id and r.review_id not in picked
+                and not aggregates.is_seen(store, r.review_id)
+            ]
+            picked.update(r.review_id for r in fresh)
+            new_reviews.extend(fresh)
+            log(f"page {page:>4}  →  {len(fresh):>2} new of {len(reviews)}")
+            if boundary is not None and ids and min(ids) <= boundary:
+                if boundary == frontier:
+                    reached = True
+                    break
+                # Caught up with the interrupted pass: skip the pages it covered
+                boundary = frontier
+                page = max(page + 1, resume_page)
+            else:
+                page += 1
+            time.sleep(delay)
+
+    if reached:
+        state = {"frontier": max(filter(None, (top, frontier)), default=None)}
+    elif top is not None:
+        state = {"frontier": frontier, "top": top, "resume_page": page}
+    return new_reviews, state
+
+
+def diff_companies(old: dict[str, dict], new: list) -> tuple[set[str], set[str]]:
+    """Return (changed slugs, changed input keys like 'companies.rating_value')."""
+    changed_slugs: set[str] = set()
+    changed_inputs: set[str] = set()
+    new_rows = {c.slug: {k: str(v) for k, v in asdict(c).items()} for c in new}
+
+    for slug in old.keys() ^ new_rows.keys():
+        changed_slugs.add(slug)
+        changed_inputs.update(f"companies.{f}" for f in companies_scraper.CSV_FIELDS)
+
+    for slug in old.keys() & new_rows.keys():
+        for field, value in new_rows[slug].items():
+            if old[slug].get(field, "") != value:
+                changed_slugs.add(slug)
+                changed_inputs.add(f"companies.{field}")
+    return changed_slugs, changed_inputs
+
+
+# ---------------------------------------------------------------------------
+# Cycles
+# ---------------------------------------------------------------------------
+
+def rerender(changed_inputs: set[str], html: bool = False) -> None:
+    charts = generate_charts.charts_affected_by(changed_inputs)
+    if not charts:
+        log("no chart inputs changed — nothing to render")
+        return
+    if html:
+        updated = dashboard.build(charts)
+        log(f"dashboard: {len(updated)} of {len(charts)} affected aggregate(s) changed"
+            + (": " + ", ".join(updated) if updated else ""))
+        return
+    log(f"re-rendering {len(charts)} chart(s): "
+        + ", ".join(c.__name__ for c in charts))
+    generate_charts.render(charts)
+
+
+def feed_cycle(args) -> None:
+    with aggregates.open_store() as store:
+        if aggregates.is_empty(store) and feedback.OUTPUT_PATH.exists():
+            aggregates.ingest_csv(store, feedback.OUTPUT_PATH, count_pages=True)
+        new_reviews, state = crawl_feed_delta(store, args.delay, args.max_pages)
+        # CSV first: if the append fails the reviews stay unseen and the next
+        # cycle fetches them again instead of losing them
+        if new_reviews:
+            feedback.append_csv(new_reviews)
+        aggregates.set_state(store, FEED_STATE, state)
+        aggregates.add_reviews(store, new_reviews, source="daemon")
+    if not new_reviews:
+        log("feed: no new reviews")
+        return
+    detector = bursts.BurstDetector.load()
+    alerts = detector.update_many(new_reviews)
+    detector.save()
+    if detector.skipped_late:
+        log(f"bursts: {detector.skipped_late} reviews too far behind to score")
+    bursts.append_alerts(alerts)
+    bursts.print_alerts(alerts)
+    names = {r.company_name for r in new_reviews}
+    log(f"feed: {len(new_reviews)} new reviews for {len(names)} companies: "
+        + ", ".join(sorted(names)))
+    rerender({"reviews"}, args.dashboard)
+
+
+def companies_cycle(args) -> None:
+    old = companies_scraper.read_csv()
+    # Skipped or failed profiles keep their old rating and label
+    scraped = list(companies_scraper.iter_companies(
+        args.delay, profile=not args.skip_profile, previous=old,
+    ))
+    if not scraped:
+        log("companies: scrape returned nothing — keeping existing CSV")
+        return
+    changed_slugs, changed_inputs = diff_companies(old, scraped)
+    with history.open_store() as conn:
+        history.record(conn, scraped, skip_fields=(
+            companies_scraper.PROFILE_FIELDS if args.skip_profile else ()
+        ))
+    if not changed_slugs:
+        log("companies: no changes")
+        return
+    companies_scraper.write_csv(scraped)
+    categories = {c.category_name for c in scraped if c.slug in changed_slugs}
+    log(f"companies: {len(changed_slugs)} changed in {len(categories)} categories "
+        f"({', '.join(sorted(categories))})")
+    rerender(changed_inputs, args.dashboard)
+
+
+def run_locked(name: str, cycle, args) -> None:
+    with refresh_lock() as acquired:
+        if not acquired:
+            log(f"{name}: another refresh is running — skipped")
+            return
+        try:
+            cycle(args)
+        except Exception as e:  # keep the daemon alive across bad cycles
+            log(f"[ERROR] {name}: {e!r}")
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Schedule incremental beledci.az refreshes")
+    parser.add_argument(
+        "--feed-interval", type=float, default=30,
+        help="Minutes between feed delta crawls (default: 30)",
+    )
+    parser.add_argument(
+        "--companies-interval", type=float, default=360,
+        help="Minutes between company re-scrapes (default: 360)",
+    )
+    parser.add_argument(
+        "--delay", type=float, default=0.5,
+        help="Seconds between requests (default: 0.5)",
+    )
+    parser.add_argument(
+        "--max-pages", type=int, default=20,
+        help="Upper bound on feed pages per delta crawl (default: 20)",
+    )
+    parser.add_argument(
+        "--skip-profile", action="store_true",
+        help="Skip company profile pages during company re-scrapes",
+    )
+    parser.add_argument(
+        "--dashboard", action="store_true",
+        help="Refresh the HTML dashboard (dashboard.py) instead of the PNG charts",
+    )
+    parser.add_argument(
+        "--once", action="store_true",
+        help="Run one feed and one companies cycle, then exit",
+    )
+    args = parser.parse_args()
+
+    schedule = [
+        ["feed", feed_cycle, args.feed_interval * 60, 0.0],
+        ["companies", companies_cycle, args.companies_interval * 60, 0.0],
+    ]
+    log(f"daemon started (feed every {args.feed_interval:g} min, "
+        f"companies every {args.companies_interval:g} min)")
+
+    while True:
+        for job in schedule:
+            name, cycle, interval, due = job
+            if time.monotonic() >= due:
+                log(f"{name}: cycle start")
+                run_locked(name, cycle, args)
+                job[3] = time.monotonic() + interval
+        if args.once:
+            break
+        next_due = min(job[3] for job in schedule)
+        time.sleep(max(1.0, next_due - time.monotonic()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,613 @@
+"""
+Static HTML dashboard for beledci.az, drawn in the browser.
+
+Alternative to the PNG renders of generate_charts.py: computes the aggregate
+behind each chart_NN_* once, writes it as compact JSON to dashboard/data/ and
+builds a single self-contained dashboard/index.html (data inlined, no
+external scripts) that draws every chart as SVG on the client side.  No
+figure is rasterized, so a rebuild costs roughly what load_data() costs.
+
+A JSON file is only rewritten when its content changed (or removed when its
+chart has no data), and index.html is only rebuilt when at least one of them
+did.
+
+Usage:
+    python scripts/dashboard.py
+    python scripts/dashboard.py --force        # rebuild index.html regardless
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+
+import matplotlib.colors as mcolors
+import pandas as pd
+
+import generate_charts as gc
+from generate_charts import (
+    BRAND_BLUE, BRAND_DARK, BRAND_GRAY, BRAND_GREEN, BRAND_ORANGE, BRAND_RED,
+    BRAND_YELLOW,
+)
+
+ROOT = Path(__file__).parent.parent
+DASHBOARD_DIR = ROOT / "dashboard"
+DATA_DIR = DASHBOARD_DIR / "data"
+HTML_PATH = DASHBOARD_DIR / "index.html"
+
+STAR_COLORS = [BRAND_RED, BRAND_ORANGE, BRAND_YELLOW, BRAND_BLUE, BRAND_GREEN]
+
+
+def rounded(values, digits: int = 2) -> list:
+    """JSON-friendly list: rounded floats, NaN → null."""
+    return [None if pd.isna(v) else round(float(v), digits) for v in values]
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# Panels — one per chart, built from the aggregation helper its chart_NN_* uses
+# ═══════════════════════════════════════════════════════════════════════════
+def panel_01_category_sentiment() -> dict:
+    shares, total = gc.star_shares_by_category()
+    return {
+        "kind": "hbar", "stacked": True, "unit": "%", "xmax": 100,
+        "title": "Customer Sentiment by Industry Category",
+        "subtitle": "How reviews are distributed across star ratings per sector",
+        "xlabel": "Share of Reviews (%)",
+        "labels": total.index.tolist(),
+        "series": [
+            {"name": f"{s}-Star", "color": color,
+             "values": rounded(shares[s], 1)}
+            for s, color in zip(range(1, 6), STAR_COLORS)
+        ],
+        "notes": [f"n={int(n)}" for n in total.values],
+    }
+
+
+def panel_02_top_complained() -> dict:
+    top = gc.most_reviewed_companies()
+    return {
+        "kind": "hbar",
+        "title": "Top 15 Most Reviewed Companies",
+        "subtitle": "High volume signals strong public attention — positive or negative",
+        "xlabel": "Number of Customer Reviews",
+        "labels": top.index.tolist(),
+        "series": [{"name": "Reviews", "color": BRAND_RED, "values": top.astype(int).tolist()}],
+    }
+
+
+def panel_03_one_star_rate() -> dict:
+    rate = gc.one_star_rate_of_top_companies().iloc[::-1]
+    return {
+        "kind": "hbar", "unit": "%", "xmax": 100,
+        "title": "1-Star Review Rate — Crisis Radar (Top 15 Companies)",
+        "subtitle": "Companies above 90% are in critical reputation risk territory",
+        "xlabel": "1-Star Review Rate (%)",
+        "labels": rate.index.tolist(),
+        "series": [{
+            "name": "1-star rate", "values": rounded(rate, 1),
+            "colors": [BRAND_RED if v >= 90 else (BRAND_ORANGE if v >= 80 else BRAND_YELLOW)
+                       for v in rate.values],
+        }],
+        "refs": [{"value": 90, "label": "90% Danger threshold", "color": BRAND_RED}],
+    }
+
+
+def panel_04_reviews_by_category() -> dict:
+    cat_vol = gc.review_volume_by_category().iloc[::-1]
+    return {
+        "kind": "hbar",
+        "title": "Total Customer Feedback Volume by Industry Sector",
+        "subtitle": "Red = sectors with highest public scrutiny (400+ reviews)",
+        "xlabel": "Total Reviews Received",
+        "labels": cat_vol.index.tolist(),
+        "series": [{
+            "name": "Reviews", "values": cat_vol.astype(int).tolist(),
+            "colors": [BRAND_RED if v >= 400 else BRAND_BLUE for v in cat_vol.values],
+        }],
+    }
+
+
+def panel_05_avg_rating_by_category() -> dict:
+    avg = gc.avg_rating_by_category().iloc[::-1]
+    return {
+        "kind": "hbar", "xmax": 5,
+        "title": "Average Company Rating by Industry Sector",
+        "subtitle": "Green = acceptable (3+) · Yellow = at risk (2–3) · Red = critical (<2)",
+        "xlabel": "Average Rating (out of 5.0)",
+        "labels": avg.index.tolist(),
+        "series": [{
+            "name": "Average rating", "values": rounded(avg),
+            "colors": [BRAND_GREEN if v >= 3 else (BRAND_YELLOW if v >= 2 else BRAND_RED)
+                       for v in avg.values],
+        }],
+        "refs": [{"value": 2.5, "label": "Midpoint (2.5)", "color": BRAND_GRAY}],
+    }
+
+
+def panel_06_rating_label_distribution() -> dict:
+    counts = gc.rating_label_counts()
+    return {
+        "kind": "vbar",
+        "title": f"Overall Reputation Health of All {len(gc.companies)} Companies",
+        "subtitle": "Platform-wide distribution of official rating labels",
+        "ylabel": "Number of Companies",
+        "labels": counts.index.tolist(),
+        "series": [{"name": "Companies", "values": counts.astype(int).tolist(),
+                    "colors": gc.RATING_LABEL_COLORS}],
+    }
+
+
+def panel_07_zero_review_gap() -> dict:
+    gap = gc.review_gap_by_category().iloc[::-1]
+    return {
+        "kind": "hbar", "stacked": True,
+        "title": "Customer Engagement Gap by Sector",
+        "subtitle": "Grey = companies on the platform but never reviewed",
+        "xlabel": "Number of Companies",
+        "labels": gap.index.tolist(),
+        "series": [
+            {"name": "Has Reviews", "color": BRAND_BLUE,
+             "values": gap["with_reviews"].astype(int).tolist()},
+            {"name": "No Reviews Yet", "color": BRAND_GRAY,
+             "values": gap["without_reviews"].astype(int).tolist()},
+        ],
+        "notes": [f"{p:.0f}% silent" if p > 0 else "" for p in gap["silent_pct"].values],
+    }
+
+
+def panel_08_photo_evidence() -> dict:
+    img_rate = gc.photo_rate_by_rating()
+    return {
+        "kind": "vbar", "unit": "%",
+        "title": "Photo Evidence Attached by Star Rating",
+        "subtitle": "Share of reviews with photo attachments, per star rating",
+        "ylabel": "% of Reviews with Photo Attachments",
+        "labels": ["1★", "2★", "3★", "4★", "5★"],
+        "series": [{"name": "With photos", "values": rounded(img_rate, 1),
+                    "colors": STAR_COLORS}],
+    }
+
+
+def panel_09_best_performers() -> dict:
+    agg = gc.best_performers().iloc[::-1]
+    return {
+        "kind": "hbar", "xmax": 5,
+        "title": "Top 15 Best-Performing Companies",
+        "subtitle": "Minimum 3 reviews — Green = strong performer (3.0+)",
+        "xlabel": "Average Customer Rating (out of 5.0)",
+        "labels": agg.index.tolist(),
+        "series": [{
+            "name": "Average rating", "values": rounded(agg["avg"]),
+            "colors": [BRAND_GREEN if v >= 3 else BRAND_YELLOW for v in agg["avg"].values],
+        }],
+        "notes": [f"n={int(n)}" for n in agg["count"].values],
+        "refs": [{"value": 2.5, "label": "Midpoint (2.5)", "color": BRAND_GRAY}],
+    }
+
+
+def panel_10_crisis_matrix() -> dict:
+    cat_agg = gc.sector_matrix()
+    norm = mcolors.Normalize(vmin=1.0, vmax=3.5)
+    cmap = gc.plt.cm.RdYlGn
+    return {
+        "kind": "scatter",
+        "title": "Sector Risk Matrix — Volume of Customer Feedback vs. Average Rating",
+        "subtitle": "Bottom-right = highest urgency for brand action and regulatory oversight",
+        "xlabel": "Total Reviews Received by Sector",
+        "ylabel": "Average Company Rating (out of 5.0)",
+        "points": [
+            {"label": row["category_name"], "x": int(row["total_reviews"]),
+             "y": round(row["avg_rating"], 2),
+             "color": mcolors.to_hex(cmap(norm(row["avg_rating"])))}
+            for _, row in cat_agg.iterrows()
+        ],
+        "xrefs": [{"value": 200, "label": "Volume threshold (200 reviews)", "color": "#95A5A6"}],
+        "yrefs": [{"value": 1.5, "label": "Rating threshold (1.5)", "color": "#95A5A6"}],
+    }
+
+
+def panel_11_review_stream() -> dict:
+    panel = {
+        "kind": "line",
+        "title": "Review Activity Over Time",
+    }
+    if len(gc.review_history) >= 2:
+        hist = gc.platform_review_history()
+        return {
+            **panel,
+            "subtitle": "Platform-wide review total recorded at each companies.py run",
+            "xlabel": "Scrape Run",
+            "ylabel": "Total Reviews (sum of company review counts)",
+            "x": hist["run_at"].dt.strftime("%Y-%m-%d %H:%M").tolist(),
+            "series": [
+                {"name": "Total reviews on platform", "color": BRAND_BLUE,
+                 "values": rounded(hist["reviews"], 0)},
+            ],
+        }
+
+    page_vol = gc.page_volume()
+    return {
+        **panel,
+        "subtitle": "Each page represents a batch of chronologically ordered reviews",
+        "xlabel": "Chronological Order (oldest → newest)",
+        "ylabel": "Reviews per Page",
+        "x": page_vol["period"].astype(int).tolist(),
+        "series": [
+            {"name": "Reviews per page", "color": BRAND_BLUE,
+             "values": page_vol["reviews"].astype(int).tolist()},
+            {"name": "5-page rolling average", "color": BRAND_RED,
+             "values": rounded(page_vol["rolling"])},
+        ],
+    }
+
+
+def panel_12_top_per_category() -> dict:
+    top3 = gc.top_companies_per_category()
+    return {
+        "kind": "hbar",
+        "title": "Top 3 Most-Reviewed Companies per Industry Sector",
+        "subtitle": "Reveals which brands dominate public attention in each category",
+        "xlabel": "Total Reviews",
+        "labels": (top3["name"] + " (" + top3["category_name"] + ")").tolist(),
+        "series": [{
+            "name": "Reviews", "values": top3["review_count"].astype(int).tolist(),
+            "colors": [mcolors.to_hex(c) for c in top3["color"]],
+        }],
+    }
+
+
+def panel_13_category_keywords() -> dict | None:
+    if not gc.KEYWORDS_CSV.exists():
+        return None
+    top_terms = gc.top_keywords_by_category()
+    return {
+        "kind": "facets",
+        "title": "What Customers Talk About in Each Sector",
+        "subtitle": "Most distinctive review terms per category "
+                    "(log-odds z-score vs. all other sectors)",
+        "panels": [
+            {"title": cat, "color": BRAND_BLUE,
+             "labels": top["term"].tolist(), "values": rounded(top["z_score"])}
+            for cat, top in top_terms.items()
+        ],
+    }
+
+
+def panel_14_complaint_severity() -> dict | None:
+    if gc.sentiment.empty:
+        return None
+    share, overall = gc.harsh_share_by_category()
+    share = share.iloc[::-1]
+    return {
+        "kind": "hbar", "unit": "%",
+        "title": "How Harsh Are the Complaints?",
+        "subtitle": f"Share of 1-star reviews whose text sentiment is ≤ {gc.HARSH_SCORE} "
+                    f"(categories with ≥ {gc.MIN_SCORED_ONE_STAR} scored 1-star reviews)",
+        "xlabel": "1-star reviews with harsh wording (%)",
+        "labels": share.index.tolist(),
+        "series": [{
+            "name": "harsh share", "values": rounded(share, 1),
+            "colors": [BRAND_RED if v >= overall else BRAND_ORANGE for v in share.values],
+        }],
+        "refs": [{"value": round(overall, 1), "label": f"Platform average ({overall:.1f}%)",
+                  "color": BRAND_DARK}],
+    }
+
+
+# ── Registry ───────────────────────────────────────────────────────────────
+# Keyed by the PNG chart each panel mirrors, so charts_affected_by() applies.
+PANELS = {
+    gc.chart_01_category_sentiment:        panel_01_category_sentiment,
+    gc.chart_02_top_complained:            panel_02_top_complained,
+    gc.chart_03_one_star_rate:             panel_03_one_star_rate,
+    gc.chart_04_reviews_by_category:       panel_04_reviews_by_category,
+    gc.chart_05_avg_rating_by_category:    panel_05_avg_rating_by_category,
+    gc.chart_06_rating_label_distribution: panel_06_rating_label_distribution,
+    gc.chart_07_zero_review_gap:           panel_07_zero_review_gap,
+    gc.chart_08_photo_evidence:            panel_08_photo_evidence,
+    gc.chart_09_best_performers:           panel_09_best_performers,
+    gc.chart_10_crisis_matrix:             panel_10_crisis_matrix,
+    gc.chart_11_review_stream:             panel_11_review_stream,
+    gc.chart_12_top_per_category:          panel_12_top_per_category,
+    gc.chart_13_category_keywords:         panel_13_category_keywords,
+    gc.chart_14_complaint_severity:        panel_14_complaint_severity,
+}
+
+
+def panel_name(chart) -> str:
+    return chart.__name__.removeprefix("chart_")
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# Build
+# ═══════════════════════════════════════════════════════════════════════════
+def write_if_changed(path: Path, text: str) -> bool:
+    if path.exists() and path.read_text(encoding="utf-8") == text:
+        return False
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(text, encoding="utf-8")
+    tmp.replace(path)
+    return True
+
+
+def build(charts=None, force: bool = False) -> list[str]:
+    """Write the JSON of the given charts (default: all); return changed names.
+
+    A chart whose panel returns None has its JSON removed, which counts as
+    a change.  index.html is rebuilt when any JSON changed, when ``force``
+    is set or when it does not exist yet.
+    """
+    charts = list(PANELS) if charts is None else charts
+    DATA_DIR.mkdir(parents=True, exist_ok=True)
+    gc.load_data()
+
+    changed = []
+    for chart in charts:
+        panel = PANELS[chart]()
+        path = DATA_DIR / f"{panel_name(chart)}.json"
+        if panel is None:
+            if path.exists():          # chart lost its data: drop it from the page
+                path.unlink()
+                changed.append(panel_name(chart))
+            continue
+        text = json.dumps(panel, ensure_ascii=False, separators=(",", ":"))
+        if write_if_changed(path, text):
+            changed.append(panel_name(chart))
+
+    if changed or force or not HTML_PATH.exists():
+        write_html()
+    return changed
+
+
+def write_html() -> None:
+    """Inline every JSON file under DATA_DIR into one self-contained page."""
+    panels = {}
+    for chart in PANELS:
+        path = DATA_DIR / f"{panel_name(chart)}.json"
+        if path.exists():
+            panels[panel_name(chart)] = path.read_text(encoding="utf-8")
+    data = "{" + ",".join(f"{json.dumps(k)}:{v}" for k, v in panels.items()) + "}"
+    html = HTML_TEMPLATE.replace("/*DARK*/", BRAND_DARK)
+    html = html.replace("/*DATA*/{}", data.replace("</", "<\\/"))
+    HTML_PATH.write_text(html, encoding="utf-8")
+
+
+HTML_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>beledci.az — Customer Experience Dashboard</title>
+<style>
+  body { font-family: "DejaVu Sans", Arial, sans-serif; margin: 0; background: #F4F6F7; color: /*DARK*/; }
+  header { padding: 20px 32px; background: /*DARK*/; color: white; }
+  header h1 { margin: 0; font-size: 22px; }
+  main { display: grid; grid-template-columns: repeat(auto-fill, minmax(620px, 1fr)); gap: 20px; padding: 20px 32px; }
+  section { background: white; border-radius: 6px; padding: 16px 18px; box-shadow: 0 1px 3px rgba(0,0,0,.08); }
+  section.wide { grid-column: 1 / -1; }
+  h2 { font-size: 15px; margin: 0 0 2px; }
+  p.sub { font-size: 12px; color: #7F8C8D; margin: 0 0 10px; }
+  svg { width: 100%; height: auto; font-size: 11px; }
+  svg text { fill: /*DARK*/; }
+  .grid { stroke: #E5E8E8; stroke-dasharray: 3 3; }
+  .legend { font-size: 11px; margin-top: 6px; }
+  .legend span { display: inline-block; margin-right: 12px; }
+  .legend i { display: inline-block; width: 10px; height: 10px; margin-right: 4px; }
+  .facets { display: grid; grid-template-columns: repeat(4, 1fr); gap: 8px; }
+  .facets h3 { font-size: 12px; margin: 4px 0 0; }
+</style>
+</head>
+<body>
+<header><h1>beledci.az — Customer Experience Dashboard</h1></header>
+<main id="dashboard"></main>
+<script>
+const DATA = /*DATA*/{};
+const NS = "http://www.w3.org/2000/svg";
+
+function el(tag, attrs, text) {
+  const node = document.createElementNS(NS, tag);
+  for (const [k, v] of Object.entries(attrs || {})) node.setAttribute(k, v);
+  if (text !== undefined) node.textContent = text;
+  return node;
+}
+
+function niceMax(v) {
+  const p = Math.pow(10, Math.floor(Math.log10(v || 1)));
+  return [1, 2, 2.5, 5, 10].map(m => m * p).find(m => m >= v);
+}
+
+function ticks(max, n) { return Array.from({length: n + 1}, (_, i) => max * i / n); }
+
+function fmt(v, unit) {
+  if (v === null) return "";
+  const s = Number.isInteger(v) ? String(v) : v.toFixed(v < 10 ? 2 : 1);
+  return unit === "%" ? s + "%" : s;
+}
+
+function svg(width, height) { return el("svg", {viewBox: `0 0 ${width} ${height}`}); }
+
+function html(tag, className, text) {
+  const node = document.createElement(tag);
+  if (className) node.className = className;
+  if (text !== undefined) node.textContent = text;
+  return node;
+}
+
+function legend(series) {
+  const div = html("div", "legend");
+  for (const s of series) {
+    if (!s.color) continue;
+    const swatch = html("i");
+    swatch.style.background = s.color;
+    const item = html("span", "", s.name);
+    item.prepend(swatch);
+    div.append(item);
+  }
+  return div;
+}
+
+function hbar(spec, width) {
+  const rowH = 22, left = 240, right = 90, top = 8, n = spec.labels.length;
+  const height = top + n * rowH + 36;
+  const root = svg(width, height);
+  const totals = spec.labels.map((_, i) => spec.stacked
+    ? spec.series.reduce((a, s) => a + (s.values[i] || 0), 0)
+    : Math.max(...spec.series.map(s => s.values[i] || 0)));
+  const max = spec.xmax || niceMax(Math.max(...totals));
+  const x = v => left + (width - left - right) * v / max;
+  for (const t of ticks(max, 5)) {
+    root.append(el("line", {x1: x(t), x2: x(t), y1: top, y2: top + n * rowH, class: "grid"}));
+    root.append(el("text", {x: x(t), y: top + n * rowH + 14, "text-anchor": "middle"}, fmt(t, spec.unit)));
+  }
+  spec.labels.forEach((label, i) => {
+    const y = top + i * rowH;
+    root.append(el("text", {x: left - 6, y: y + rowH / 2 + 4, "text-anchor": "end"}, label));
+    let acc = 0;
+    for (const s of spec.series) {
+      const v = s.values[i] || 0;
+      const bar = el("rect", {x: x(acc), y: y + 3, width: Math.max(0, x(acc + v) - x(acc)),
+                              height: rowH - 6, fill: s.colors ? s.colors[i] : s.color});
+      bar.append(el("title", {}, `${label} — ${s.name}: ${fmt(v, spec.unit)}`));
+      root.append(bar);
+      if (spec.stacked) acc += v;
+    }
+    const value = spec.stacked ? "" : fmt(totals[i], spec.unit);
+    const note = spec.notes && spec.notes[i];
+    const text = value && note ? `${value}  (${note})` : (value || note || "");
+    root.append(el("text", {x: x(totals[i]) + 5, y: y + rowH / 2 + 4}, text));
+  });
+  for (const r of spec.refs || []) {
+    root.append(el("line", {x1: x(r.value), x2: x(r.value), y1: top, y2: top + n * rowH,
+                            stroke: r.color, "stroke-dasharray": "6 4", "stroke-width": 1.5}));
+  }
+  root.append(el("text", {x: (left + width - right) / 2, y: height - 4, "text-anchor": "middle"}, spec.xlabel || ""));
+  return root;
+}
+
+function vbar(spec, width) {
+  const height = 320, left = 60, bottom = 40, top = 20, n = spec.labels.length;
+  const root = svg(width, height);
+  const max = niceMax(Math.max(...spec.series[0].values.map(v => v || 0)) * 1.1);
+  const y = v => height - bottom - (height - bottom - top) * v / max;
+  const band = (width - left - 10) / n;
+  for (const t of ticks(max, 5)) {
+    root.append(el("line", {x1: left, x2: width - 10, y1: y(t), y2: y(t), class: "grid"}));
+    root.append(el("text", {x: left - 6, y: y(t) + 4, "text-anchor": "end"}, fmt(t, spec.unit)));
+  }
+  const s = spec.series[0];
+  spec.labels.forEach((label, i) => {
+    const v = s.values[i] || 0, cx = left + band * (i + 0.5);
+    const bar = el("rect", {x: cx - band * 0.3, y: y(v), width: band * 0.6, height: y(0) - y(v),
+                            fill: s.colors ? s.colors[i] : s.color});
+    bar.append(el("title", {}, `${label}: ${fmt(v, spec.unit)}`));
+    root.append(bar);
+    root.append(el("text", {x: cx, y: y(v) - 5, "text-anchor": "middle", "font-weight": "bold"}, fmt(s.values[i], spec.unit)));
+    root.append(el("text", {x: cx, y: height - bottom + 16, "text-anchor": "middle"}, label));
+  });
+  root.append(el("text", {x: 14, y: height / 2, transform: `rotate(-90 14 ${height / 2})`, "text-anchor": "middle"}, spec.ylabel || ""));
+  return root;
+}
+
+function scatter(spec, width) {
+  const height = 460, left = 60, right = 20, top = 20, bottom = 44;
+  const root = svg(width, height);
+  const xs = spec.points.map(p => p.x), ys = spec.points.map(p => p.y);
+  const xmax = niceMax(Math.max(...xs) * 1.1);
+  const ylo = Math.floor(Math.min(...ys) * 4) / 4 - 0.25, yhi = Math.ceil(Math.max(...ys) * 4) / 4 + 0.25;
+  const x = v => left + (width - left - right) * v / xmax;
+  const y = v => height - bottom - (height - bottom - top) * (v - ylo) / (yhi - ylo);
+  for (const t of ticks(xmax, 5)) {
+    root.append(el("line", {x1: x(t), x2: x(t), y1: top, y2: height - bottom, class: "grid"}));
+    root.append(el("text", {x: x(t), y: height - bottom + 14, "text-anchor": "middle"}, fmt(t)));
+  }
+  for (let t = ylo; t <= yhi + 1e-9; t += 0.25) {
+    root.append(el("line", {x1: left, x2: width - right, y1: y(t), y2: y(t), class: "grid"}));
+    root.append(el("text", {x: left - 6, y: y(t) + 4, "text-anchor": "end"}, t.toFixed(2)));
+  }
+  for (const r of spec.xrefs || [])
+    root.append(el("line", {x1: x(r.value), x2: x(r.value), y1: top, y2: height - bottom, stroke: r.color, "stroke-dasharray": "2 3"}));
+  for (const r of spec.yrefs || [])
+    root.append(el("line", {x1: left, x2: width - right, y1: y(r.value), y2: y(r.value), stroke: r.color, "stroke-dasharray": "6 4"}));
+  for (const p of spec.points) {
+    const dot = el("circle", {cx: x(p.x), cy: y(p.y), r: 8, fill: p.color, stroke: "white", "stroke-width": 2});
+    dot.append(el("title", {}, `${p.label}: ${p.x} reviews · ${p.y}★`));
+    root.append(dot);
+    root.append(el("text", {x: x(p.x) + 11, y: y(p.y) + 4}, p.label));
+  }
+  root.append(el("text", {x: (left + width - right) / 2, y: height - 6, "text-anchor": "middle"}, spec.xlabel));
+  root.append(el("text", {x: 14, y: height / 2, transform: `rotate(-90 14 ${height / 2})`, "text-anchor": "middle"}, spec.ylabel));
+  return root;
+}
+
+function line(spec, width) {
+  const height = 300, left = 60, right = 20, top = 16, bottom = 44, n = spec.x.length;
+  const root = svg(width, height);
+  const max = niceMax(Math.max(...spec.series.flatMap(s => s.values.filter(v => v !== null))) * 1.05);
+  const x = i => left + (width - left - right) * (n > 1 ? i / (n - 1) : 0.5);
+  const y = v => height - bottom - (height - bottom - top) * v / max;
+  for (const t of ticks(max, 5)) {
+    root.append(el("line", {x1: left, x2: width - right, y1: y(t), y2: y(t), class: "grid"}));
+    root.append(el("text", {x: left - 6, y: y(t) + 4, "text-anchor": "end"}, fmt(t)));
+  }
+  const every = Math.max(1, Math.ceil(n / 10));
+  spec.x.forEach((label, i) => {
+    if (i % every === 0) root.append(el("text", {x: x(i), y: height - bottom + 14, "text-anchor": "middle"}, label));
+  });
+  for (const s of spec.series) {
+    const d = s.values.map((v, i) => v === null ? null : `${x(i)},${y(v)}`).filter(Boolean);
+    root.append(el("polyline", {points: d.join(" "), fill: "none", stroke: s.color, "stroke-width": 2}));
+  }
+  root.append(el("text", {x: (left + width - right) / 2, y: height - 6, "text-anchor": "middle"}, spec.xlabel));
+  root.append(el("text", {x: 14, y: height / 2, transform: `rotate(-90 14 ${height / 2})`, "text-anchor": "middle"}, spec.ylabel));
+  return root;
+}
+
+function facets(spec) {
+  const div = html("div", "facets");
+  for (const p of spec.panels) {
+    const cell = html("div");
+    cell.append(html("h3", "", p.title));
+    cell.append(hbar({labels: p.labels, series: [{name: "z", color: p.color, values: p.values}]}, 360));
+    div.append(cell);
+  }
+  return div;
+}
+
+const RENDER = {hbar, vbar, scatter, line, facets};
+const WIDE = new Set(["scatter", "facets", "line"]);
+const main = document.getElementById("dashboard");
+for (const [name, spec] of Object.entries(DATA)) {
+  const section = html("section", WIDE.has(spec.kind) ? "wide" : "");
+  section.id = name;
+  section.append(html("h2", "", spec.title), html("p", "sub", spec.subtitle || ""));
+  section.append(RENDER[spec.kind](spec, WIDE.has(spec.kind) ? 1200 : 760));
+  if (spec.series && spec.series.length > 1) section.append(legend(spec.series));
+  main.append(section);
+}
+</script>
+</body>
+</html>
+"""
+
+
+# ── Run ────────────────────────────────────────────────────────────────────
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build the beledci.az HTML dashboard")
+    parser.add_argument(
+        "--force", action="store_true",
+        help="Rebuild index.html even if no aggregate changed",
+    )
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    changed = build(force=args.force)
+    elapsed = time.perf_counter() - start
+    if changed or args.force:
+        print(f"Updated {len(changed)} aggregate(s): {', '.join(changed) or '—'}")
+        print(f"Dashboard written to {HTML_PATH}")
+    else:
+        print("All aggregates unchanged — dashboard left as is")
+    print(f"Done in {elapsed:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,17 +5,31 @@ Scrapes all pages (1–106) and saves to data/feedbacks.csv.
 Usage:
     python scripts/feedback.py
     python scripts/feedback.py --start 1 --end 106 --delay 1.0
+    python scripts/feedback.py --stream
+
+Library use:
+    from feedback import iter_reviews
+    for review in iter_reviews(1, 5):
+        ...
 """
 
 import argparse
+import codecs
 import csv
 import re
 import time
+from collections.abc import Iterator
+from dataclasses import asdict, dataclass, fields
+from html import escape
+from html.parser import HTMLParser
 from pathlib import Path
+from urllib.parse import urljoin
 
 import requests
 from bs4 import BeautifulSoup
 
+import aggregates
+
 BASE_URL = "https://beledci.az"
 OUTPUT_PATH = Path(__file__).parent.parent / "data" / "feedbacks.csv"
 
@@ -28,23 +42,31 @@ HEADERS = {
     "Accept-Language": "az,en;q=0.9",
 }
 
-CSV_FIELDS = [
-    "review_id",
-    "reviewer_name",
-    "company_name",
-    "company_slug",
-    "company_url",
-    "rating",
-    "review_text",
-    "review_url",
-    "has_images",
-    "page",
-]
-
-
-def get_last_page(session: requests.Session) -> int:
-    """Fetch page 1 and extract the last page number from pagination."""
-    resp = session.get(f"{BASE_URL}/?page=1", headers=HEADERS, timeout=20)
+
+@dataclass(slots=True)
+class Review:
+    """One review card from the feed; field order matches the CSV columns."""
+
+    review_id: str
+    reviewer_name: str
+    company_name: str
+    company_slug: str
+    company_url: str
+    rating: int
+    review_text: str
+    review_url: str
+    has_images: bool
+    page: int | None              # feed page; None if scraped from a company page
+    attachment_count: int = 0
+    attachment_urls: str = ""     # space-separated absolute URLs
+
+
+CSV_FIELDS = [f.name for f in fields(Review)]
+
+
+def get_last_page(session: requests.Session, path: str = "/") -> int:
+    """Fetch page 1 of a listing and extract the last page number from pagination."""
+    resp = session.get(f"{BASE_URL}{path}?page=1", headers=HEADERS, timeout=20)
     resp.raise_for_status()
     soup = BeautifulSoup(resp.text, "html.parser")
     last = soup.select_one("div.pagination span.last a")
@@ -61,7 +83,7 @@ def parse_rating(review_div) -> int:
     return len(filled)
 
 
-def parse_review(div, page: int) -> dict | None:
+def parse_review(div, page: int | None) -> Review | None:
     """Extract all fields from a single div.review element."""
     # Review ID from paragraph id attribute: id="r-6949"
     review_p = div.select_one("p.review-text")
@@ -93,62 +115,305 @@ def parse_review(div, page: int) -> dict | None:
     # Has images
     attachments = div.select("ul.attachments li a")
     has_images = len(attachments) > 0
+    attachment_urls = [
+        urljoin(BASE_URL, a["href"]) for a in attachments if a.get("href")
+    ]
+
+    return Review(
+        review_id=review_id,
+        reviewer_name=reviewer_name,
+        company_name=company_name,
+        company_slug=company_slug,
+        company_url=company_url,
+        rating=rating,
+        review_text=review_text,
+        review_url=review_url,
+        has_images=has_images,
+        page=page,
+        attachment_count=len(attachments),
+        attachment_urls=" ".join(attachment_urls),
+    )
 
-    return {
-        "review_id": review_id,
-        "reviewer_name": reviewer_name,
-        "company_name": company_name,
-        "company_slug": company_slug,
-        "company_url": company_url,
-        "rating": rating,
-        "review_text": review_text,
-        "review_url": review_url,
-        "has_images": has_images,
-        "page": page,
-    }
-
-
-def scrape_page(session: requests.Session, page: int) -> list[dict]:
-    """Fetch a single listing page and return list of review dicts."""
+
+# ---------------------------------------------------------------------------
+# Streaming parser – emit reviews while the response is still downloading
+# ---------------------------------------------------------------------------
+
+# Elements that never get a closing tag and must not affect the open-tag stack
+VOID_TAGS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input",
+    "link", "meta", "source", "track", "wbr",
+}
+
+STREAM_CHUNK_SIZE = 16 * 1024
+
+
+class ReviewStreamParser(HTMLParser):
+    """Incremental parser that cuts ``div.review`` blocks out of a page.
+
+    Markup outside a review block is discarded as soon as it is tokenized.
+    Inside a block the raw markup is buffered until the ``</div>`` closing
+    the block arrives; only that small fragment is handed to BeautifulSoup
+    and ``parse_review``.  Finished reviews queue up in ``self.reviews``.
+
+    Open tags are kept on a stack, as a browser would: an end tag closes
+    every unclosed element above its match (``<li>`` or ``<p>`` without an
+    end tag), and an end tag with no open match (a stray ``</span>``) is
+    dropped.
+    """
+
+    def __init__(self, page: int):
+        super().__init__(convert_charrefs=False)
+        self.page = page
+        self.reviews: list[Review] = []
+        self._open: list[str] = []   # open tags inside the current review block
+        self._buf: list[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        if self._open:
+            self._buf.append(self.get_starttag_text())
+            if tag not in VOID_TAGS:
+                self._open.append(tag)
+        elif tag == "div" and "review" in (dict(attrs).get("class") or "").split():
+            self._buf = [self.get_starttag_text()]
+            self._open = [tag]
+
+    def handle_startendtag(self, tag, attrs):
+        if self._open:
+            self._buf.append(self.get_starttag_text())
+
+    def handle_endtag(self, tag):
+        if tag not in self._open:
+            return
+        while self._open.pop() != tag:
+            pass
+        self._buf.append(f"</{tag}>")
+        if not self._open:
+            self._emit()
+
+    def handle_data(self, data):
+        if self._open:
+            self._buf.append(escape(data, quote=False))
+
+    def handle_entityref(self, name):
+        if self._open:
+            self._buf.append(f"&{name};")
+
+    def handle_charref(self, name):
+        if self._open:
+            self._buf.append(f"&#{name};")
+
+    def close(self) -> None:
+        """Flush the input; a review block still open at the end is parsed as is."""
+        super().close()
+        if self._open:
+            print(f"  [WARN] page {self.page}: review block not closed at end of page")
+            self._open = []
+            self._emit()
+
+    def _emit(self) -> None:
+        fragment = BeautifulSoup("".join(self._buf), "html.parser")
+        self._buf = []
+        div = fragment.find("div")
+        review = parse_review(div, self.page) if div else None
+        if review:
+            self.reviews.append(review)
+
+    def drain(self) -> list[Review]:
+        """Return and clear the reviews completed so far."""
+        done, self.reviews = self.reviews, []
+        return done
+
+
+def iter_page_stream(session: requests.Session, page: int) -> Iterator[Review]:
+    """Like ``iter_page`` but parse the body chunk by chunk as it arrives."""
+    url = f"{BASE_URL}/?page={page}"
+    with session.get(url, headers=HEADERS, timeout=20, stream=True) as resp:
+        resp.raise_for_status()
+        decoder = codecs.getincrementaldecoder(resp.encoding or "utf-8")(
+            errors="replace"
+        )
+        parser = ReviewStreamParser(page)
+        for chunk in resp.iter_content(chunk_size=STREAM_CHUNK_SIZE):
+            parser.feed(decoder.decode(chunk))
+            yield from parser.drain()
+        parser.feed(decoder.decode(b"", final=True))
+        parser.close()
+        yield from parser.drain()
+
+
+# ---------------------------------------------------------------------------
+# Library API – lazy generators over the feed
+# ---------------------------------------------------------------------------
+
+def iter_page(session: requests.Session, page: int) -> Iterator[Review]:
+    """Fetch a single listing page and yield its reviews one at a time."""
     url = f"{BASE_URL}/?page={page}"
     resp = session.get(url, headers=HEADERS, timeout=20)
     resp.raise_for_status()
     soup = BeautifulSoup(resp.text, "html.parser")
-    reviews = []
     for div in soup.select("div.review"):
-        row = parse_review(div, page)
-        if row:
-            reviews.append(row)
-    return reviews
-
+        review = parse_review(div, page)
+        if review:
+            yield review
 
-def scrape_all(start: int, end: int, delay: float) -> None:
-    """Scrape pages start..end (inclusive) and write to CSV."""
-    OUTPUT_PATH.parent.mkdir(parents=True, exist_ok=True)
 
-    with requests.Session() as session, open(
-        OUTPUT_PATH, "w", newline="", encoding="utf-8"
-    ) as f:
-        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
-        writer.writeheader()
+def iter_company_page(
+    session: requests.Session, slug: str, name: str, page: int
+) -> Iterator[Review]:
+    """Yield the reviews on one page of a company's own review list.
 
-        total_rows = 0
+    Company pages use the feed's review markup but may omit the company
+    link inside each card, so slug and name are filled in from the caller.
+    ``Review.page`` stays None: these rows do not belong to a feed page.
+    """
+    url = f"{BASE_URL}/{slug}?page={page}"
+    resp = session.get(url, headers=HEADERS, timeout=20)
+    resp.raise_for_status()
+    soup = BeautifulSoup(resp.text, "html.parser")
+    for div in soup.select("div.review"):
+        review = parse_review(div, None)
+        if not review:
+            continue
+        if not review.company_slug:
+            review.company_slug = f"/{slug}"
+            review.company_url = f"{BASE_URL}/{slug}"
+            review.review_url = f"{BASE_URL}/{slug}/{review.review_id}"
+        review.company_name = review.company_name or name
+        yield review
+
+
+def iter_reviews(
+    start: int = 1,
+    end: int | None = None,
+    delay: float = 0.5,
+    session: requests.Session | None = None,
+    stream: bool = False,
+    failed: list[int] | None = None,
+) -> Iterator[Review]:
+    """Yield reviews from feed pages start..end (inclusive), newest first.
+
+    ``end=None`` auto-detects the last page.  A page that fails to download
+    is reported and skipped so one bad response does not end the stream;
+    its number is appended to ``failed`` if a list is given.  Pass an
+    existing ``session`` to reuse its connection pool.  With ``stream=True``
+    each page is parsed incrementally while it downloads.
+    """
+    fetch_page = iter_page_stream if stream else iter_page
+    own_session = session is None
+    if own_session:
+        session = requests.Session()
+    try:
+        if end is None:
+            end = get_last_page(session)
         for page in range(start, end + 1):
             try:
-                rows = scrape_page(session, page)
+                yield from fetch_page(session, page)
             except requests.RequestException as e:
                 print(f"  [ERROR] page {page}: {e}")
-                rows = []
-
-            writer.writerows(rows)
-            f.flush()
-            total_rows += len(rows)
-            print(f"  page {page:>4}/{end}  →  {len(rows):>2} reviews  (total: {total_rows})")
+                if failed is not None:
+                    failed.append(page)
 
             if page < end and delay > 0:
                 time.sleep(delay)
+    finally:
+        if own_session:
+            session.close()
+
+
+def migrate_csv(path: Path = OUTPUT_PATH) -> bool:
+    """Add any Review columns missing from an older CSV's header.
+
+    Existing rows get blank values for the new columns; extra columns are
+    kept.  The file is rewritten atomically.  Returns True if it changed.
+    """
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        old_fields = reader.fieldnames or []
+        missing = [c for c in CSV_FIELDS if c not in old_fields]
+        if not missing:
+            return False
+        tmp = path.with_suffix(".csv.tmp")
+        with open(tmp, "w", newline="", encoding="utf-8") as out:
+            writer = csv.DictWriter(out, fieldnames=[*old_fields, *missing], restval="")
+            writer.writeheader()
+            writer.writerows(reader)
+    tmp.replace(path)
+    print(f"  {path.name}: added columns {', '.join(missing)}")
+    return True
+
+
+def append_csv(reviews: list[Review], path: Path = OUTPUT_PATH) -> None:
+    """Append reviews to a feedbacks CSV, first migrating an older header."""
+    write_header = not path.exists() or path.stat().st_size == 0
+    fieldnames = CSV_FIELDS
+    if not write_header:
+        migrate_csv(path)
+        with open(path, newline="", encoding="utf-8") as f:
+            fieldnames = next(csv.reader(f))
+    with open(path, "a", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        if write_header:
+            writer.writeheader()
+        writer.writerows(asdict(r) for r in reviews)
+
+
+# ---------------------------------------------------------------------------
+# CLI – stream the feed into data/feedbacks.csv
+# ---------------------------------------------------------------------------
+
+def scrape_all(
+    start: int, end: int, delay: float, stream: bool = False, last_page: int | None = None
+) -> None:
+    """Scrape pages start..end (inclusive), write to CSV and update aggregates.
+
+    Page volumes are recorded only for a complete crawl: pages 1 through
+    ``last_page`` (the detected end of the feed) with no failed page.
+    """
+    OUTPUT_PATH.parent.mkdir(parents=True, exist_ok=True)
+
+    with open(OUTPUT_PATH, "w", newline="", encoding="utf-8") as f, \
+            aggregates.open_store() as store:
+        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
+        writer.writeheader()
+        batch_id = aggregates.new_batch(store)
+
+        total_rows = 0
+        new_rows = 0
+        page_rows = 0
+        page_counts: dict[int, int] = {}
+        failed: list[int] = []
+        current_page = start
+
+        def report(page: int) -> None:
+            page_counts[page] = page_rows
+            f.flush()
+            store.commit()
+            print(f"  page {page:>4}/{end}  →  {page_rows:>2} reviews  (total: {total_rows})")
+
+        for review in iter_reviews(start, end, delay, stream=stream, failed=failed):
+            while review.page > current_page:
+                report(current_page)
+                current_page += 1
+                page_rows = 0
+            writer.writerow(asdict(review))
+            new_rows += aggregates.add_review(store, batch_id, review)
+            page_rows += 1
+            total_rows += 1
+
+        while current_page <= end:
+            report(current_page)
+            current_page += 1
+            page_rows = 0
+
+        if start == 1 and end == last_page and not failed:
+            aggregates.set_page_counts(store, batch_id, page_counts)
+        else:
+            print("\n  Partial crawl: page volumes left unchanged"
+                  + (f" ({len(failed)} pages failed)" if failed else ""))
 
     print(f"\nDone. {total_rows} reviews saved to {OUTPUT_PATH}")
+    print(f"      {new_rows} new reviews added to {aggregates.STORE_PATH.name}")
 
 
 def main() -> None:
@@ -158,13 +423,18 @@ def main() -> None:
     parser.add_argument(
         "--delay", type=float, default=0.5, help="Seconds between requests (default: 0.5)"
     )
+    parser.add_argument(
+        "--stream", action="store_true",
+        help="Parse each page incrementally while it downloads",
+    )
     args = parser.parse_args()
 
     with requests.Session() as session:
-        last_page = get_last_page(session) if args.end == 0 else args.end
+        last_page = get_last_page(session)
+    end = args.end or last_page
 
-    print(f"Scraping pages {args.start}–{last_page} with {args.delay}s delay …")
-    scrape_all(args.start, last_page, args.delay)
+    print(f"Scraping pages {args.start}–{end} with {args.delay}s delay …")
+    scrape_all(args.start, end, args.delay, stream=args.stream, last_page=last_page)
 
 
 if __name__ == "__main__":
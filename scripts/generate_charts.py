@@ -2,10 +2,27 @@
 Business Intelligence Charts for beledci.az
 Generates all charts into charts/ directory.
 
+Review-based charts read per-company totals from the incremental aggregate
+store (data/aggregates.sqlite, see aggregates.py); it is bootstrapped from
+feedbacks.csv on first run.
+
+Each figure is laid out once and exported to every selected format preset
+(PNG, high-resolution print PNG, SVG, PDF); thumbnails are downscaled from
+the PNG in a process pool instead of being re-drawn.
+
 Usage:
     python scripts/generate_charts.py
+    python scripts/generate_charts.py --formats png,print,svg,thumb
+    python scripts/generate_charts.py --profile
+    python scripts/generate_charts.py --profile-stats profiles/
 """
 
+import argparse
+import cProfile
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
 from pathlib import Path
 
 import matplotlib
@@ -15,6 +32,10 @@ import matplotlib.ticker as mticker
 import numpy as np
 import pandas as pd
 
+import aggregates
+import history
+from resolver import CompanyResolver
+
 # ── Paths ──────────────────────────────────────────────────────────────────
 ROOT = Path(__file__).parent.parent
 CHARTS_DIR = ROOT / "charts"
@@ -22,6 +43,8 @@ CHARTS_DIR.mkdir(parents=True, exist_ok=True)
 
 COMPANIES_CSV = ROOT / "data" / "companies.csv"
 FEEDBACKS_CSV = ROOT / "data" / "feedbacks.csv"
+KEYWORDS_CSV = ROOT / "data" / "keywords.csv"
+SENTIMENT_CSV = ROOT / "data" / "sentiment.csv"
 
 # ── Style ──────────────────────────────────────────────────────────────────
 BRAND_RED    = "#C0392B"
@@ -51,57 +74,159 @@ plt.rcParams.update({
     "axes.facecolor":   "#FAFAFA",
 })
 
+# ── Export presets ─────────────────────────────────────────────────────────
+@dataclass(frozen=True, slots=True)
+class ExportPreset:
+    format: str                     # savefig format: "png", "svg", "pdf", …
+    dpi: float | None = None        # raster resolution; None for vector formats
+    suffix: str = ""                # appended to the file stem, e.g. "@print"
+    downscale: float | None = None  # thumbnail: fraction of the "png" export
+
+
+PRESETS = {
+    "png":   ExportPreset("png", dpi=150),
+    "print": ExportPreset("png", dpi=300, suffix="@print"),
+    "svg":   ExportPreset("svg"),
+    "pdf":   ExportPreset("pdf"),
+    "thumb": ExportPreset("png", suffix="@thumb", downscale=0.25),
+}
+
+# Presets used by save(); set by render() / profile_charts()
+_presets: list[ExportPreset] = [PRESETS["png"]]
+_thumb_pool: ProcessPoolExecutor | None = None
+_thumb_jobs: list[Future] = []
+
+# Stems written by save() since render() / profile_charts() started
+_saved: list[str] = []
+
+# Phase marks for the chart being profiled; None when not profiling
+_timing: dict[str, float] | None = None
+
+
+def subplots(*args, **kwargs):
+    """plt.subplots that marks the end of data prep when profiling."""
+    if _timing is not None:
+        _timing["draw_start"] = time.perf_counter()
+    return plt.subplots(*args, **kwargs)
+
+
+def make_thumbnail(src: Path, dest: Path, scale: float) -> None:
+    """Downscale an exported PNG; runs in a worker process."""
+    import matplotlib.image as mimage
+    mimage.thumbnail(str(src), str(dest), scale=scale)
+
+
 def save(fig: plt.Figure, name: str) -> None:
-    path = CHARTS_DIR / name
-    fig.savefig(path, dpi=150, bbox_inches="tight")
+    """Export the figure to every active preset, laying it out only once.
+
+    A single export lets savefig(bbox_inches="tight") do its own layout
+    pass.  With several, that pass runs once without rasterizing
+    (draw_without_rendering) and the resulting box is pinned for every
+    format.  Thumbnails are queued to the worker pool.
+    """
+    if _timing is not None:
+        _timing["save_start"] = time.perf_counter()
+    targets = [preset for preset in _presets if not preset.downscale]
+    bbox = "tight"
+    if len(targets) > 1:
+        # Lay out at the first preset's dpi, as savefig would, so the main
+        # PNG comes out the same as a single-format export
+        screen_dpi = fig.dpi
+        fig.set_dpi(targets[0].dpi or screen_dpi)
+        fig.draw_without_rendering()
+        bbox = fig.get_tightbbox().padded(plt.rcParams["savefig.pad_inches"])
+        fig.set_dpi(screen_dpi)
+    stem = Path(name).stem
+    written = []
+    for preset in targets:
+        path = CHARTS_DIR / f"{stem}{preset.suffix}.{preset.format}"
+        fig.savefig(path, format=preset.format, dpi=preset.dpi or "figure", bbox_inches=bbox)
+        written.append(path.name)
     plt.close(fig)
-    print(f"  Saved → {path.name}")
+
+    for preset in _presets:
+        if preset.downscale:
+            src = CHARTS_DIR / f"{stem}.png"
+            dest = CHARTS_DIR / f"{stem}{preset.suffix}.png"
+            _thumb_jobs.append(_thumb_pool.submit(make_thumbnail, src, dest, preset.downscale))
+            written.append(dest.name)
+    _saved.append(stem)
+    print(f"  Saved → {', '.join(written)}")
 
 
 # ── Load data ──────────────────────────────────────────────────────────────
-companies = pd.read_csv(COMPANIES_CSV)
-feedbacks = pd.read_csv(FEEDBACKS_CSV)
+companies: pd.DataFrame
+review_agg: pd.DataFrame   # company × rating totals: n, n_images (+ category)
+page_agg: pd.DataFrame     # reviews per feed page
+review_history: pd.DataFrame  # platform review_count per companies.py run
+sentiment: pd.DataFrame    # per-review sentiment_score + category (empty if not scored)
+
+
+def load_data() -> None:
+    """Load companies.csv and the review aggregates into module globals."""
+    global companies, review_agg, page_agg, review_history, sentiment
+
+    companies = pd.read_csv(COMPANIES_CSV)
+
+    with aggregates.open_store() as conn:
+        if aggregates.is_empty(conn):
+            # First run: the CSV is the feedback.py crawl the store starts from
+            aggregates.ingest_csv(conn, FEEDBACKS_CSV, count_pages=True)
+        agg, page_agg = aggregates.load_frames(conn)
+
+    review_history = pd.DataFrame(columns=["run_at", "reviews"])
+    if history.STORE_PATH.exists():
+        with history.open_store() as conn:
+            review_history = pd.DataFrame(
+                history.platform_series(conn, "review_count"), columns=["run_at", "reviews"],
+            )
+        review_history["run_at"] = pd.to_datetime(review_history["run_at"], format="ISO8601")
+
+    # Resolve each review's company (slug, then fuzzy name) to get category
+    resolver = CompanyResolver(companies[["slug", "name"]].to_dict("records"))
+    matches = resolver.resolve_all(zip(agg["company_slug"], agg["company_name"]))
+    agg["slug"] = [
+        m.slug if m else None
+        for m in (matches[ref] for ref in zip(agg["company_slug"], agg["company_name"]))
+    ]
+    review_agg = agg.merge(
+        companies[["slug", "name", "category_name", "category_slug"]],
+        on="slug", how="left",
+    )
 
-# Merge feedbacks with companies to get category
-fb = feedbacks.merge(
-    companies[["name", "category_name", "category_slug"]],
-    left_on="company_name", right_on="name", how="left",
-)
+    # Per-review text sentiment (scripts/sentiment.py), with each review's category
+    sentiment = pd.DataFrame(columns=["review_id", "rating", "sentiment_score", "category_name"])
+    if SENTIMENT_CSV.exists():
+        scores = pd.read_csv(SENTIMENT_CSV, dtype={"company_slug": str, "company_name": str},
+                             keep_default_na=False)
+        category_of = review_agg[["company_slug", "company_name", "category_name"]] \
+            .drop_duplicates(["company_slug", "company_name"])
+        sentiment = scores.merge(category_of, on=["company_slug", "company_name"], how="left")
 
-print("Generating charts …\n")
 
 # ═══════════════════════════════════════════════════════════════════════════
 # Chart 1 — Overall 1-Star vs Rest breakdown (horizontal stacked bar, one row per category)
 # ═══════════════════════════════════════════════════════════════════════════
-def chart_01_category_sentiment():
-    order = (
-        fb.groupby("category_name")["rating"]
-        .count()
-        .sort_values(ascending=False)
-        .index
+def star_shares_by_category() -> tuple[pd.DataFrame, pd.Series]:
+    """% of reviews per star (columns 1–5) and review total, busiest category first."""
+    by_star = review_agg.pivot_table(
+        index="category_name", columns="rating", values="n",
+        aggfunc="sum", fill_value=0,
     )
-    order = [c for c in order if c in fb["category_name"].dropna().unique()]
+    total = by_star.sum(axis=1)
+    total = total[total > 0].sort_values(ascending=False)
+    by_star = by_star.reindex(index=total.index, columns=range(1, 6), fill_value=0)
+    return by_star.div(total, axis=0) * 100, total
 
-    rows = []
-    for cat in order:
-        sub = fb[fb["category_name"] == cat]["rating"]
-        if len(sub) == 0:
-            continue
-        rows.append({
-            "category": cat,
-            "1-Star"  : (sub == 1).mean() * 100,
-            "2-Star"  : (sub == 2).mean() * 100,
-            "3-Star"  : (sub == 3).mean() * 100,
-            "4-Star"  : (sub == 4).mean() * 100,
-            "5-Star"  : (sub == 5).mean() * 100,
-            "total"   : len(sub),
-        })
 
-    df = pd.DataFrame(rows).set_index("category")
+def chart_01_category_sentiment():
+    shares, total = star_shares_by_category()
+    df = shares.rename(columns=lambda s: f"{s}-Star")
+    df["total"] = total
     stars = ["1-Star", "2-Star", "3-Star", "4-Star", "5-Star"]
     colors = [BRAND_RED, BRAND_ORANGE, BRAND_YELLOW, BRAND_BLUE, BRAND_GREEN]
 
-    fig, ax = plt.subplots(figsize=(13, 7))
+    fig, ax = subplots(figsize=(13, 7))
     left = np.zeros(len(df))
     for col, color in zip(stars, colors):
         ax.barh(df.index, df[col], left=left, color=color, label=col, height=0.65)
@@ -128,15 +253,20 @@ def chart_01_category_sentiment():
 # ═══════════════════════════════════════════════════════════════════════════
 # Chart 2 — Top 15 Most Reviewed Companies (volume of feedback)
 # ═══════════════════════════════════════════════════════════════════════════
-def chart_02_top_complained():
-    top = (
-        fb.groupby("company_name")["rating"]
-        .count()
+def most_reviewed_companies(top: int = 15) -> pd.Series:
+    """Review count of the ``top`` most reviewed companies, largest first."""
+    return (
+        review_agg.groupby("company_name")["n"]
+        .sum()
         .sort_values(ascending=False)
-        .head(15)
+        .head(top)
     )
 
-    fig, ax = plt.subplots(figsize=(13, 6))
+
+def chart_02_top_complained():
+    top = most_reviewed_companies()
+
+    fig, ax = subplots(figsize=(13, 6))
     bars = ax.barh(top.index[::-1], top.values[::-1], color=BRAND_RED, height=0.65)
 
     for bar, val in zip(bars, top.values[::-1]):
@@ -156,27 +286,26 @@ def chart_02_top_complained():
 # ═══════════════════════════════════════════════════════════════════════════
 # Chart 3 — 1-Star Rate for Top 15 Companies (crisis radar)
 # ═══════════════════════════════════════════════════════════════════════════
-def chart_03_one_star_rate():
-    top15 = (
-        fb.groupby("company_name")["rating"]
-        .count()
-        .sort_values(ascending=False)
-        .head(15)
-        .index
-    )
-    sub = fb[fb["company_name"].isin(top15)]
-    rate = (
-        sub.groupby("company_name")["rating"]
-        .apply(lambda x: (x == 1).mean() * 100)
-        .sort_values(ascending=True)
+def one_star_rate_of_top_companies(top: int = 15) -> pd.Series:
+    """% of 1-star reviews for the ``top`` most reviewed companies, lowest first."""
+    per_company = (
+        review_agg.assign(one_star=review_agg["n"].where(review_agg["rating"] == 1, 0))
+        .groupby("company_name")[["n", "one_star"]]
+        .sum()
     )
+    top_n = per_company.sort_values("n", ascending=False).head(top)
+    return (top_n["one_star"] / top_n["n"] * 100).sort_values(ascending=True)
+
+
+def chart_03_one_star_rate():
+    rate = one_star_rate_of_top_companies()
 
     colors = [
         BRAND_RED if v >= 90 else (BRAND_ORANGE if v >= 80 else BRAND_YELLOW)
         for v in rate.values
     ]
 
-    fig, ax = plt.subplots(figsize=(13, 6))
+    fig, ax = subplots(figsize=(13, 6))
     bars = ax.barh(rate.index, rate.values, color=colors, height=0.65)
 
     for bar, val in zip(bars, rate.values):
@@ -200,14 +329,19 @@ def chart_03_one_star_rate():
 # ═══════════════════════════════════════════════════════════════════════════
 # Chart 4 — Review Volume by Category (total reviews per sector)
 # ═══════════════════════════════════════════════════════════════════════════
-def chart_04_reviews_by_category():
-    cat_vol = (
+def review_volume_by_category() -> pd.Series:
+    """Platform review count per category, smallest first."""
+    return (
         companies.groupby("category_name")["review_count"]
         .sum()
         .sort_values(ascending=True)
     )
 
-    fig, ax = plt.subplots(figsize=(11, 6))
+
+def chart_04_reviews_by_category():
+    cat_vol = review_volume_by_category()
+
+    fig, ax = subplots(figsize=(11, 6))
     colors = [BRAND_RED if v >= 400 else BRAND_BLUE for v in cat_vol.values]
     bars = ax.barh(cat_vol.index, cat_vol.values, color=colors, height=0.65)
 
@@ -228,21 +362,26 @@ def chart_04_reviews_by_category():
 # ═══════════════════════════════════════════════════════════════════════════
 # Chart 5 — Average Rating per Category (bar)
 # ═══════════════════════════════════════════════════════════════════════════
-def chart_05_avg_rating_by_category():
+def avg_rating_by_category() -> pd.Series:
+    """Mean company rating per category (unrated companies excluded), lowest first."""
     cat_rated = companies[companies["rating_value"] > 0]
-    avg = (
+    return (
         cat_rated.groupby("category_name")["rating_value"]
         .mean()
         .sort_values(ascending=True)
     )
 
+
+def chart_05_avg_rating_by_category():
+    avg = avg_rating_by_category()
+
     colors = []
     for v in avg.values:
         if v >= 3:    colors.append(BRAND_GREEN)
         elif v >= 2:  colors.append(BRAND_YELLOW)
         else:         colors.append(BRAND_RED)
 
-    fig, ax = plt.subplots(figsize=(11, 6))
+    fig, ax = subplots(figsize=(11, 6))
     bars = ax.barh(avg.index, avg.values, color=colors, height=0.65)
 
     for bar, val in zip(bars, avg.values):
@@ -265,13 +404,20 @@ def chart_05_avg_rating_by_category():
 # ═══════════════════════════════════════════════════════════════════════════
 # Chart 6 — Rating Label Distribution across all companies
 # ═══════════════════════════════════════════════════════════════════════════
+RATING_LABELS = ["Əla", "Yaxşı", "Orta", "Aşağı", "Yoxdur"]
+RATING_LABEL_COLORS = [BRAND_GREEN, BRAND_BLUE, BRAND_YELLOW, BRAND_ORANGE, BRAND_GRAY]
+
+
+def rating_label_counts() -> pd.Series:
+    """Companies per official rating label, in RATING_LABELS order."""
+    return companies["rating_label"].value_counts().reindex(RATING_LABELS, fill_value=0)
+
+
 def chart_06_rating_label_distribution():
-    label_order = ["Əla", "Yaxşı", "Orta", "Aşağı", "Yoxdur"]
-    label_colors = [BRAND_GREEN, BRAND_BLUE, BRAND_YELLOW, BRAND_ORANGE, BRAND_GRAY]
-    counts = companies["rating_label"].value_counts().reindex(label_order, fill_value=0)
+    counts = rating_label_counts()
 
-    fig, ax = plt.subplots(figsize=(9, 5))
-    bars = ax.bar(counts.index, counts.values, color=label_colors, width=0.6,
+    fig, ax = subplots(figsize=(9, 5))
+    bars = ax.bar(counts.index, counts.values, color=RATING_LABEL_COLORS, width=0.6,
                   edgecolor="white", linewidth=1.5)
 
     for bar, val in zip(bars, counts.values):
@@ -292,23 +438,34 @@ def chart_06_rating_label_distribution():
 # ═══════════════════════════════════════════════════════════════════════════
 # Chart 7 — Companies with Zero Reviews (engagement gap by sector)
 # ═══════════════════════════════════════════════════════════════════════════
-def chart_07_zero_review_gap():
-    gap = companies.groupby("category_name").apply(
-        lambda g: pd.Series({
-            "with_reviews":   (g["review_count"] > 0).sum(),
-            "without_reviews":(g["review_count"] == 0).sum(),
+def review_gap_by_category() -> pd.DataFrame:
+    """Companies with / without reviews and % silent per category, fewest silent first."""
+    has_reviews = companies["review_count"] > 0
+    gap = (
+        pd.DataFrame({
+            "with_reviews": has_reviews,
+            "without_reviews": companies["review_count"] == 0,
+            "category_name": companies["category_name"],
         })
-    ).sort_values("without_reviews", ascending=True)
+        .groupby("category_name").sum()
+        .sort_values("without_reviews", ascending=True)
+    )
+    total = gap.sum(axis=1)
+    gap = gap[total > 0]
+    gap["silent_pct"] = gap["without_reviews"] / total[total > 0] * 100
+    return gap
 
-    gap = gap[gap.sum(axis=1) > 0]
 
-    fig, ax = plt.subplots(figsize=(11, 6))
+def chart_07_zero_review_gap():
+    gap = review_gap_by_category()
+
+    fig, ax = subplots(figsize=(11, 6))
     ax.barh(gap.index, gap["with_reviews"],    color=BRAND_BLUE,  label="Has Reviews",    height=0.55)
     ax.barh(gap.index, gap["without_reviews"], color=BRAND_GRAY,  label="No Reviews Yet", height=0.55,
             left=gap["with_reviews"])
 
     for i, (idx, row) in enumerate(gap.iterrows()):
-        pct_no = row["without_reviews"] / (row["with_reviews"] + row["without_reviews"]) * 100
+        pct_no = row["silent_pct"]
         if pct_no > 0:
             ax.text(row["with_reviews"] + row["without_reviews"] + 0.2, i,
                     f"{pct_no:.0f}% silent", va="center", fontsize=8.5, color=BRAND_GRAY)
@@ -326,11 +483,18 @@ def chart_07_zero_review_gap():
 # ═══════════════════════════════════════════════════════════════════════════
 # Chart 8 — Photo Evidence Rate by Star Rating
 # ═══════════════════════════════════════════════════════════════════════════
+def photo_rate_by_rating() -> pd.Series:
+    """% of reviews with photos for ratings 1–5 (NaN where a rating has no reviews)."""
+    by_rating = review_agg.groupby("rating")[["n_images", "n"]].sum()
+    by_rating = by_rating.reindex(range(1, 6), fill_value=0)
+    return by_rating["n_images"] / by_rating["n"].replace(0, np.nan) * 100
+
+
 def chart_08_photo_evidence():
-    img_rate = feedbacks.groupby("rating")["has_images"].mean() * 100
+    img_rate = photo_rate_by_rating().fillna(0)
     star_labels = ["1★", "2★", "3★", "4★", "5★"]
 
-    fig, ax = plt.subplots(figsize=(8, 5))
+    fig, ax = subplots(figsize=(8, 5))
     colors = [BRAND_RED, BRAND_ORANGE, BRAND_YELLOW, BRAND_BLUE, BRAND_GREEN]
     bars = ax.bar(star_labels, img_rate.values, color=colors, width=0.55,
                   edgecolor="white", linewidth=1.5)
@@ -353,16 +517,25 @@ def chart_08_photo_evidence():
 # ═══════════════════════════════════════════════════════════════════════════
 # Chart 9 — Best-performing companies (avg rating, min 3 reviews)
 # ═══════════════════════════════════════════════════════════════════════════
-def chart_09_best_performers():
+def best_performers(top: int = 15, min_reviews: int = 3) -> pd.DataFrame:
+    """Review count and average rating of the ``top`` best-rated companies, best last."""
     agg = (
-        fb.groupby("company_name")["rating"]
-        .agg(count="count", avg="mean")
-        .query("count >= 3")
+        review_agg.assign(stars=review_agg["rating"] * review_agg["n"])
+        .groupby("company_name")[["n", "stars"]]
+        .sum()
+    )
+    return (
+        pd.DataFrame({"count": agg["n"], "avg": agg["stars"] / agg["n"]})
+        .query("count >= @min_reviews")
         .sort_values("avg", ascending=True)
-        .tail(15)
+        .tail(top)
     )
 
-    fig, ax = plt.subplots(figsize=(12, 6))
+
+def chart_09_best_performers():
+    agg = best_performers()
+
+    fig, ax = subplots(figsize=(12, 6))
     colors_bar = [BRAND_GREEN if v >= 3 else BRAND_YELLOW for v in agg["avg"].values]
     bars = ax.barh(agg.index, agg["avg"], color=colors_bar, height=0.65)
 
@@ -385,8 +558,9 @@ def chart_09_best_performers():
 # ═══════════════════════════════════════════════════════════════════════════
 # Chart 10 — Sector Crisis Matrix: Review Volume vs Average Rating
 # ═══════════════════════════════════════════════════════════════════════════
-def chart_10_crisis_matrix():
-    cat_agg = (
+def sector_matrix() -> pd.DataFrame:
+    """Per rated category: avg_rating, total_reviews, count; busiest first."""
+    return (
         companies[companies["rating_value"] > 0]
         .groupby("category_name")
         .agg(
@@ -399,6 +573,10 @@ def chart_10_crisis_matrix():
         .reset_index(drop=True)
     )
 
+
+def chart_10_crisis_matrix():
+    cat_agg = sector_matrix()
+
     VOL_THRESHOLD    = 200
     RATING_THRESHOLD = 1.5   # meaningful split: all data lives in 1.0–2.1
 
@@ -411,7 +589,7 @@ def chart_10_crisis_matrix():
         .tolist()
     )
 
-    fig, ax = plt.subplots(figsize=(18, 9))
+    fig, ax = subplots(figsize=(18, 9))
     fig.patch.set_facecolor("white")
 
     xmax  = cat_agg["total_reviews"].max() * 1.22
@@ -579,20 +757,34 @@ def chart_10_crisis_matrix():
 
 
 # ═══════════════════════════════════════════════════════════════════════════
-# Chart 11 — Review stream: page-by-page volume (proxy for time trend)
+# Chart 11 — Review stream: platform review total per scrape run, falling
+# back to page-by-page volume (proxy for time trend) until history exists
 # ═══════════════════════════════════════════════════════════════════════════
-def chart_11_review_stream():
+def platform_review_history() -> pd.DataFrame:
+    """Platform review total per run (run_at, reviews) and reviews added since the last."""
+    hist = review_history.sort_values("run_at")
+    return hist.assign(added=hist["reviews"].diff())
+
+
+def page_volume() -> pd.DataFrame:
+    """Reviews per feed page, oldest page first, with a 5-page rolling average."""
     # page 1 = most recent, page 106 = oldest
-    page_vol = feedbacks.groupby("page")["review_id"].count().reset_index()
-    page_vol.columns = ["page", "reviews"]
+    page_vol = page_agg.rename(columns={"n": "reviews"})
     # Invert: page 106 = oldest (left), page 1 = newest (right)
     page_vol["period"] = page_vol["page"].max() - page_vol["page"] + 1
-
-    # Rolling average
     page_vol = page_vol.sort_values("period")
     page_vol["rolling"] = page_vol["reviews"].rolling(5, center=True).mean()
+    return page_vol
+
 
-    fig, ax = plt.subplots(figsize=(13, 5))
+def chart_11_review_stream():
+    if len(review_history) >= 2:
+        chart_11_review_history()
+        return
+
+    page_vol = page_volume()
+
+    fig, ax = subplots(figsize=(13, 5))
     ax.fill_between(page_vol["period"], page_vol["reviews"],
                     alpha=0.25, color=BRAND_BLUE)
     ax.plot(page_vol["period"], page_vol["reviews"],
@@ -611,27 +803,63 @@ def chart_11_review_stream():
     save(fig, "11_review_stream.png")
 
 
+def chart_11_review_history():
+    hist = platform_review_history()
+    added = hist["added"]
+
+    fig, ax = subplots(figsize=(13, 5))
+    ax.plot(hist["run_at"], hist["reviews"], color=BRAND_BLUE, linewidth=2.2,
+            marker="o", markersize=4, label="Total reviews on platform")
+    ax2 = ax.twinx()
+    # Bar width in days (matplotlib date units): 80% of the tightest run spacing
+    width = hist["run_at"].diff().min() / pd.Timedelta(days=1) * 0.8
+    ax2.bar(hist["run_at"], added, color=BRAND_RED, alpha=0.35, width=width,
+            label="New reviews since previous run")
+    ax2.set_ylabel("New Reviews per Run")
+    ax2.grid(False)
+
+    ax.set_xlabel("Scrape Run")
+    ax.set_ylabel("Total Reviews (sum of company review counts)")
+    ax.set_title("Review Activity Over Time\n"
+                 "Platform-wide review total recorded at each companies.py run")
+    handles = ax.get_legend_handles_labels()[0] + ax2.get_legend_handles_labels()[0]
+    ax.legend(handles=handles, fontsize=9, loc="upper left")
+    ax.grid(axis="y")
+    ax.grid(axis="x", alpha=0)
+    fig.autofmt_xdate()
+
+    save(fig, "11_review_stream.png")
+
+
 # ═══════════════════════════════════════════════════════════════════════════
 # Chart 12 — Most Reviewed Companies per Category (top 3 per sector)
 # ═══════════════════════════════════════════════════════════════════════════
-def chart_12_top_per_category():
-    top3 = (
+def top_companies_per_category(per_category: int = 3) -> pd.DataFrame:
+    """Most reviewed companies of each category, most reviewed first.
+
+    Adds a ``color`` column (RGBA) shared by all companies of a category.
+    """
+    top = (
         companies[companies["review_count"] > 0]
         .sort_values("review_count", ascending=False)
         .groupby("category_name")
-        .head(3)
+        .head(per_category)
         .copy()
     )
-    top3["label"] = top3["name"] + "\n(" + top3["category_name"] + ")"
-    top3 = top3.sort_values("review_count", ascending=True)
-
-    # Color by category
-    cats = top3["category_name"].unique().tolist()
+    cats = top["category_name"].unique().tolist()
     cmap = plt.cm.get_cmap("tab20", len(cats))
     cat_color = {c: cmap(i) for i, c in enumerate(cats)}
-    colors = [cat_color[c] for c in top3["category_name"]]
+    top["color"] = top["category_name"].map(cat_color)
+    return top
+
+
+def chart_12_top_per_category():
+    top3 = top_companies_per_category()
+    top3["label"] = top3["name"] + "\n(" + top3["category_name"] + ")"
+    top3 = top3.sort_values("review_count", ascending=True)
+    colors = top3["color"].tolist()
 
-    fig, ax = plt.subplots(figsize=(13, max(8, len(top3) * 0.38)))
+    fig, ax = subplots(figsize=(13, max(8, len(top3) * 0.38)))
     bars = ax.barh(top3["label"], top3["review_count"], color=colors, height=0.7)
 
     for bar, val in zip(bars, top3["review_count"]):
@@ -648,19 +876,270 @@ def chart_12_top_per_category():
     save(fig, "12_top3_per_category.png")
 
 
+# ═══════════════════════════════════════════════════════════════════════════
+# Chart 13 — What each sector's reviews talk about (distinctive keywords)
+# ═══════════════════════════════════════════════════════════════════════════
+def top_keywords_by_category(per_category: int = 6) -> dict[str, pd.DataFrame]:
+    """Highest z-score terms per category (term, z_score, ...), busiest category first."""
+    kw = pd.read_csv(KEYWORDS_CSV)
+    kw = kw[kw["scope"] == "category"]
+    cats = (
+        kw.groupby("group")["count"].sum()
+        .sort_values(ascending=False)
+        .index.tolist()
+    )
+    return {cat: kw[kw["group"] == cat].nlargest(per_category, "z_score") for cat in cats}
+
+
+def chart_13_category_keywords():
+    if not KEYWORDS_CSV.exists():
+        print("  Skipped 13_category_keywords.png (run scripts/keywords.py first)")
+        return
+    top_terms = top_keywords_by_category()
+    cats = list(top_terms)
+    n_cols = 4
+    n_rows = max(1, -(-len(cats) // n_cols))
+
+    fig, axes = subplots(n_rows, n_cols, figsize=(18, 3.2 * n_rows), squeeze=False)
+    for ax, cat in zip(axes.flat, cats):
+        top = top_terms[cat].iloc[::-1]
+        ax.barh(top["term"], top["z_score"], color=BRAND_BLUE, height=0.6)
+        ax.set_title(cat, fontsize=11)
+        ax.tick_params(axis="y", labelsize=9)
+        ax.tick_params(axis="x", labelsize=8)
+        ax.grid(axis="x")
+        ax.grid(axis="y", alpha=0)
+    for ax in list(axes.flat)[len(cats):]:
+        ax.set_visible(False)
+
+    fig.suptitle("What Customers Talk About in Each Sector\n"
+                 "Most distinctive review terms per category (log-odds z-score vs. all other sectors)",
+                 fontsize=14, fontweight="bold")
+    fig.tight_layout()
+
+    save(fig, "13_category_keywords.png")
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# Chart 14 — How harsh the 1-star complaints are (text sentiment per category)
+# ═══════════════════════════════════════════════════════════════════════════
+HARSH_SCORE = -0.5           # sentiment_score at or below this counts as harsh
+MIN_SCORED_ONE_STAR = 10
+
+
+def harsh_share_by_category() -> tuple[pd.Series, float]:
+    """% of 1-star reviews with harsh wording per category, and platform-wide."""
+    one_star = sentiment[(sentiment["rating"] == 1) & sentiment["category_name"].notna()]
+    harsh = one_star["sentiment_score"] <= HARSH_SCORE
+    by_cat = harsh.groupby(one_star["category_name"]).agg(["mean", "size"])
+    share = by_cat.loc[by_cat["size"] >= MIN_SCORED_ONE_STAR, "mean"] * 100
+    return share.sort_values(), harsh.mean() * 100
+
+
+def chart_14_complaint_severity():
+    if sentiment.empty:
+        print("  Skipped 14_complaint_severity.png (run scripts/sentiment.py first)")
+        return
+    share, overall = harsh_share_by_category()
+
+    fig, ax = subplots(figsize=(13, 7))
+    colors = [BRAND_RED if v >= overall else BRAND_ORANGE for v in share.values]
+    bars = ax.barh(share.index, share.values, color=colors, height=0.65)
+    for bar, val in zip(bars, share.values):
+        ax.text(bar.get_width() + 0.5, bar.get_y() + bar.get_height() / 2,
+                f"{val:.1f}%", va="center", fontsize=9, color=BRAND_DARK)
+
+    ax.axvline(overall, color=BRAND_DARK, linestyle="--", linewidth=1.2,
+               label=f"Platform average ({overall:.1f}%)")
+    ax.set_xlabel("1-star reviews with harsh wording (%)")
+    ax.set_title("How Harsh Are the Complaints?\n"
+                 f"Share of 1-star reviews whose text sentiment is ≤ {HARSH_SCORE} "
+                 f"(categories with ≥ {MIN_SCORED_ONE_STAR} scored 1-star reviews)")
+    ax.set_xlim(0, max(share.max() * 1.15, overall * 1.15, 1))
+    ax.xaxis.set_major_formatter(mticker.PercentFormatter())
+    ax.legend(fontsize=9)
+    ax.grid(axis="x")
+    ax.grid(axis="y", alpha=0)
+
+    save(fig, "14_complaint_severity.png")
+
+
+# ── Registry ───────────────────────────────────────────────────────────────
+# Inputs each chart reads: "reviews" (aggregate store) or "companies.<column>".
+# Used by daemon.py to re-render only the charts a refresh actually touched.
+CHART_INPUTS = {
+    chart_01_category_sentiment:        {"reviews", "companies.name", "companies.category_name"},
+    chart_02_top_complained:            {"reviews"},
+    chart_03_one_star_rate:             {"reviews"},
+    chart_04_reviews_by_category:       {"companies.category_name", "companies.review_count"},
+    chart_05_avg_rating_by_category:    {"companies.category_name", "companies.rating_value"},
+    chart_06_rating_label_distribution: {"companies.rating_label"},
+    chart_07_zero_review_gap:           {"companies.category_name", "companies.review_count"},
+    chart_08_photo_evidence:            {"reviews"},
+    chart_09_best_performers:           {"reviews"},
+    chart_10_crisis_matrix:             {"companies.category_name", "companies.rating_value",
+                                         "companies.review_count"},
+    chart_11_review_stream:             {"reviews", "companies.review_count"},
+    chart_12_top_per_category:          {"companies.name", "companies.category_name",
+                                         "companies.review_count"},
+    chart_13_category_keywords:         {"keywords"},
+    chart_14_complaint_severity:        {"sentiment"},
+}
+CHARTS = list(CHART_INPUTS)
+
+
+def charts_affected_by(changed: set[str]) -> list:
+    """Return the charts that read any of the changed inputs, in order."""
+    return [chart for chart, inputs in CHART_INPUTS.items() if inputs & changed]
+
+
+def use_presets(names) -> None:
+    """Select export presets by name; thumbnails imply the base PNG."""
+    global _presets
+    unknown = set(names) - set(PRESETS)
+    if unknown:
+        raise ValueError(f"unknown export preset(s): {', '.join(sorted(unknown))}")
+    names = list(dict.fromkeys(names))
+    if any(PRESETS[n].downscale for n in names) and "png" not in names:
+        names.insert(0, "png")
+    _presets = [PRESETS[n] for n in names]
+
+
+@contextmanager
+def thumbnail_pool(workers: int | None = None):
+    """Run thumbnail downscales in worker processes; wait for them on exit."""
+    global _thumb_pool
+    if not any(p.downscale for p in _presets):
+        yield
+        return
+    _thumb_pool = ProcessPoolExecutor(workers)
+    try:
+        yield
+        for job in _thumb_jobs:
+            job.result()
+    finally:
+        _thumb_jobs.clear()
+        _thumb_pool.shutdown()
+        _thumb_pool = None
+
+
+def render(charts=None, formats=("png",), thumb_workers: int | None = None) -> list[str]:
+    """Reload the data and draw the given charts (default: all of them).
+
+    A chart that raises is reported and the rest still run.  Returns the
+    names of the files actually saved (skipped and failed charts have none).
+    """
+    charts = CHARTS if charts is None else charts
+    use_presets(formats)
+    load_data()
+    _saved.clear()
+    with thumbnail_pool(thumb_workers):
+        for chart in charts:
+            try:
+                chart()
+            except Exception as e:
+                print(f"  [ERROR] {chart.__name__}: {e!r}")
+    return list(_saved)
+
+
+# ── Profiling ──────────────────────────────────────────────────────────────
+def profile_charts(
+    charts=None, stats_dir: Path | None = None, formats=("png",)
+) -> list[str]:
+    """Draw charts while timing prep / draw / save per chart; return saved names.
+
+    Prep runs from the chart call to its first subplots(), draw from there
+    to save(), and save covers savefig + close.  With ``stats_dir`` each
+    chart also runs under cProfile and its stats are dumped to
+    ``{stats_dir}/{chart}.prof`` (timings then include profiler overhead).
+    """
+    global _timing
+    charts = CHARTS if charts is None else charts
+    use_presets(formats)
+    if stats_dir is not None:
+        stats_dir.mkdir(parents=True, exist_ok=True)
+
+    t0 = time.perf_counter()
+    load_data()
+    load_time = time.perf_counter() - t0
+
+    _saved.clear()
+    rows = []
+    with thumbnail_pool():
+        for chart in charts:
+            _timing = {}
+            profiler = cProfile.Profile() if stats_dir is not None else None
+            start = time.perf_counter()
+            if profiler:
+                profiler.enable()
+            try:
+                chart()
+            finally:
+                if profiler:
+                    profiler.disable()
+                end = time.perf_counter()
+            if profiler:
+                profiler.dump_stats(stats_dir / f"{chart.__name__}.prof")
+
+            draw_start = _timing.get("draw_start", start)
+            save_start = _timing.get("save_start", end)
+            rows.append((chart.__name__, draw_start - start,
+                         save_start - draw_start, end - save_start, end - start))
+    _timing = None
+
+    total = sum(r[4] for r in rows)
+    print(f"\nload_data: {load_time * 1000:8.1f} ms\n")
+    print(f"{'#':>2}  {'chart':<36}{'prep ms':>9}{'draw ms':>9}{'save ms':>9}"
+          f"{'total ms':>10}{'share':>8}")
+    print("─" * 85)
+    for rank, (name, prep, draw, save_t, chart_total) in enumerate(
+        sorted(rows, key=lambda r: r[4], reverse=True), 1
+    ):
+        print(f"{rank:>2}  {name:<36}{prep * 1000:9.1f}{draw * 1000:9.1f}"
+              f"{save_t * 1000:9.1f}{chart_total * 1000:10.1f}"
+              f"{chart_total / total * 100:7.1f}%")
+    print("─" * 85)
+    print(f"    {'all charts':<36}{sum(r[1] for r in rows) * 1000:9.1f}"
+          f"{sum(r[2] for r in rows) * 1000:9.1f}{sum(r[3] for r in rows) * 1000:9.1f}"
+          f"{total * 1000:10.1f}")
+    if stats_dir is not None:
+        print(f"\ncProfile stats written to {stats_dir}/ "
+              "(inspect with: python -m pstats <file>.prof)")
+    return list(_saved)
+
+
 # ── Run all ────────────────────────────────────────────────────────────────
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate beledci.az charts")
+    parser.add_argument(
+        "--profile", action="store_true",
+        help="Time prep, drawing and save() per chart and print a ranked table",
+    )
+    parser.add_argument(
+        "--profile-stats", type=Path, metavar="DIR",
+        help="Also dump cProfile stats per chart into DIR (implies --profile)",
+    )
+    parser.add_argument(
+        "--formats", default="png", metavar="LIST",
+        help=f"Comma-separated export presets: {', '.join(PRESETS)} (default: png)",
+    )
+    parser.add_argument(
+        "--thumb-workers", type=int, metavar="N",
+        help="Processes for thumbnail downscaling (default: CPU count)",
+    )
+    args = parser.parse_args()
+    formats = [f.strip() for f in args.formats.split(",") if f.strip()]
+    unknown = set(formats) - set(PRESETS)
+    if unknown:
+        parser.error(f"unknown preset(s): {', '.join(sorted(unknown))}")
+
+    print("Generating charts …\n")
+    if args.profile or args.profile_stats:
+        saved = profile_charts(stats_dir=args.profile_stats, formats=formats)
+    else:
+        saved = render(formats=formats, thumb_workers=args.thumb_workers)
+    print(f"\n✓ {len(saved)} of {len(CHARTS)} charts saved to {CHARTS_DIR}/")
+
+
 if __name__ == "__main__":
-    chart_01_category_sentiment()
-    chart_02_top_complained()
-    chart_03_one_star_rate()
-    chart_04_reviews_by_category()
-    chart_05_avg_rating_by_category()
-    chart_06_rating_label_distribution()
-    chart_07_zero_review_gap()
-    chart_08_photo_evidence()
-    chart_09_best_performers()
-    chart_10_crisis_matrix()
-    chart_11_review_stream()
-    chart_12_top_per_category()
-
-    print(f"\n✓ All 12 charts saved to {CHARTS_DIR}/")
+    main()
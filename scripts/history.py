@@ -0,0 +1,248 @@
+"""
+Historical company snapshot store with delta encoding.
+
+Every run of companies.py overwrites companies.csv.  This store keeps what
+would otherwise be lost: each run is registered with its timestamp, but for
+each company only the fields whose value differs from the previous run are
+written.  Storage therefore grows with the number of changes, not with
+runs × companies.  A `listed` pseudo-field records companies appearing on or
+disappearing from the category pages.
+
+Point-in-time reconstruction picks, per (slug, field), the latest change at
+or before the requested run using the (slug, field, run_id) primary key;
+per-company and platform-wide time series replay the change log forward.
+
+Usage:
+    python scripts/history.py --record                 # snapshot data/companies.csv now
+    python scripts/history.py --at 2026-01-31T00:00    # reconstruct companies at a time
+    python scripts/history.py --series bolt            # one company over time
+    python scripts/history.py                          # store summary
+"""
+
+import argparse
+import csv
+import sqlite3
+import sys
+from collections.abc import Iterable
+from dataclasses import asdict, is_dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+STORE_PATH = ROOT / "data" / "history.sqlite"
+COMPANIES_CSV = ROOT / "data" / "companies.csv"
+
+# company_url is derived from slug, so it is not worth tracking
+TRACKED_FIELDS = [
+    "name", "category_slug", "category_name", "category_label",
+    "rating_value", "rating_label", "rating_stars", "review_count", "photo_url",
+    "listed",
+]
+SERIES_FIELDS = ["rating_value", "rating_stars", "review_count", "rating_label"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY AUTOINCREMENT,   -- identifies the run
+    run_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_run_at ON runs (run_at);
+CREATE TABLE IF NOT EXISTS changes (
+    slug   TEXT    NOT NULL,
+    field  TEXT    NOT NULL,
+    run_id INTEGER NOT NULL,
+    value  TEXT    NOT NULL,
+    PRIMARY KEY (slug, field, run_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS latest (
+    slug  TEXT NOT NULL,
+    field TEXT NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (slug, field)
+) WITHOUT ROWID;
+"""
+
+
+def open_store(path: Path = STORE_PATH) -> sqlite3.Connection:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def now_iso() -> str:
+    # Microseconds, so runs in the same second still sort in order
+    return datetime.now(timezone.utc).isoformat(timespec="microseconds")
+
+
+# ---------------------------------------------------------------------------
+# Writing
+# ---------------------------------------------------------------------------
+
+def record(
+    conn: sqlite3.Connection,
+    companies: Iterable,
+    run_at: str | None = None,
+    skip_fields: Iterable[str] = (),
+) -> tuple[int, int]:
+    """Append one run; store only changed fields.  Returns (run_id, changes).
+
+    ``skip_fields`` were not fetched this run (e.g. profile fields with
+    ``companies.py --skip-profile``); their previous values carry forward
+    instead of being overwritten with blanks.
+    """
+    tracked = [f for f in TRACKED_FIELDS if f not in set(skip_fields)]
+    run_at = run_at or now_iso()
+    run_id = conn.execute("INSERT INTO runs (run_at) VALUES (?)", (run_at,)).lastrowid
+
+    latest: dict[tuple[str, str], str] = {
+        (slug, field): value
+        for slug, field, value in conn.execute("SELECT slug, field, value FROM latest")
+    }
+    current: dict[tuple[str, str], str] = {}
+    for company in companies:
+        row = asdict(company) if is_dataclass(company) else company
+        slug = row["slug"]
+        for field in tracked:
+            current[slug, field] = "1" if field == "listed" else str(row.get(field, ""))
+
+    # Companies that were listed before but are missing from this run
+    for (slug, field), value in latest.items():
+        if field == "listed" and value == "1" and (slug, "listed") not in current:
+            current[slug, "listed"] = "0"
+
+    delta = [(slug, field, run_id, value)
+             for (slug, field), value in current.items()
+             if latest.get((slug, field)) != value]
+    conn.executemany("INSERT INTO changes VALUES (?, ?, ?, ?)", delta)
+    conn.executemany(
+        "INSERT OR REPLACE INTO latest VALUES (?, ?, ?)",
+        [(slug, field, value) for slug, field, _, value in delta],
+    )
+    conn.commit()
+    return run_id, len(delta)
+
+
+def record_csv(conn: sqlite3.Connection, path: Path = COMPANIES_CSV,
+               run_at: str | None = None,
+               skip_fields: Iterable[str] = ()) -> tuple[int, int]:
+    with open(path, newline="", encoding="utf-8") as f:
+        return record(conn, csv.DictReader(f), run_at, skip_fields)
+
+
+# ---------------------------------------------------------------------------
+# Reading
+# ---------------------------------------------------------------------------
+
+def runs(conn: sqlite3.Connection) -> list[tuple[int, str]]:
+    return conn.execute("SELECT run_id, run_at FROM runs ORDER BY run_id").fetchall()
+
+
+def snapshot_at(conn: sqlite3.Connection, at: str | None = None) -> dict[str, dict]:
+    """Reconstruct {slug: fields} as of the last run at or before ``at``."""
+    cutoff = conn.execute(
+        "SELECT MAX(run_id) FROM runs WHERE run_at <= ?", (at or "9999",)
+    ).fetchone()[0]
+    if cutoff is None:
+        return {}
+    rows = conn.execute(
+        """
+        SELECT c.slug, c.field, c.value
+        FROM changes c
+        JOIN (SELECT slug, field, MAX(run_id) AS run_id
+              FROM changes WHERE run_id <= ?
+              GROUP BY slug, field) m
+          ON c.slug = m.slug AND c.field = m.field AND c.run_id = m.run_id
+        """,
+        (cutoff,),
+    )
+    out: dict[str, dict] = {}
+    for slug, field, value in rows:
+        out.setdefault(slug, {"slug": slug})[field] = value
+    return {slug: row for slug, row in out.items() if row.get("listed") == "1"}
+
+
+def series(
+    conn: sqlite3.Connection, slug: str, fields: list[str] = SERIES_FIELDS
+) -> list[dict]:
+    """One row per run with the company's field values carried forward."""
+    changes: dict[int, dict[str, str]] = {}
+    for run_id, field, value in conn.execute(
+        "SELECT run_id, field, value FROM changes WHERE slug = ? ORDER BY run_id",
+        (slug,),
+    ):
+        changes.setdefault(run_id, {})[field] = value
+
+    state: dict[str, str] = {}
+    out = []
+    for run_id, run_at in runs(conn):
+        state.update(changes.get(run_id, {}))
+        if state.get("listed") == "1":
+            out.append({"run_at": run_at, **{f: state.get(f, "") for f in fields}})
+    return out
+
+
+def platform_series(conn: sqlite3.Connection, field: str = "review_count") -> list[tuple[str, float]]:
+    """Sum of a numeric field over listed companies, per run."""
+    by_run: dict[int, list[tuple[str, str, str]]] = {}
+    for run_id, slug, f, value in conn.execute(
+        "SELECT run_id, slug, field, value FROM changes WHERE field IN (?, 'listed') "
+        "ORDER BY run_id",
+        (field,),
+    ):
+        by_run.setdefault(run_id, []).append((slug, f, value))
+
+    values: dict[str, float] = {}
+    listed: set[str] = set()
+    out = []
+    for run_id, run_at in runs(conn):
+        for slug, f, value in by_run.get(run_id, []):
+            if f == "listed" and value == "1":
+                listed.add(slug)
+            elif f == "listed":
+                listed.discard(slug)
+            else:
+                values[slug] = float(value or 0)
+        out.append((run_at, sum(values.get(s, 0.0) for s in listed)))
+    return out
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Company snapshot history")
+    parser.add_argument("--record", action="store_true", help="Record companies.csv as a new run")
+    parser.add_argument("--run-at", help="Timestamp for --record (default: now, UTC ISO-8601)")
+    parser.add_argument("--at", help="Print the companies as of this ISO timestamp")
+    parser.add_argument("--series", metavar="SLUG", help="Print one company's history")
+    args = parser.parse_args()
+
+    with open_store() as conn:
+        if args.record:
+            run_id, n = record_csv(conn, run_at=args.run_at)
+            print(f"Run {run_id}: {n} changed fields recorded")
+        elif args.at:
+            snap = snapshot_at(conn, args.at)
+            writer = csv.DictWriter(
+                sys.stdout, fieldnames=["slug", *TRACKED_FIELDS[:-1]],
+                extrasaction="ignore",
+            )
+            writer.writeheader()
+            writer.writerows(snap[s] for s in sorted(snap))
+        elif args.series:
+            for row in series(conn, args.series):
+                print("  ".join(f"{k}={v}" for k, v in row.items()))
+        else:
+            all_runs = runs(conn)
+            n_changes = conn.execute("SELECT COUNT(*) FROM changes").fetchone()[0]
+            n_slugs = conn.execute("SELECT COUNT(DISTINCT slug) FROM latest").fetchone()[0]
+            dense = len(all_runs) * n_slugs * len(TRACKED_FIELDS)
+            print(f"runs: {len(all_runs)}  companies: {n_slugs}  stored changes: {n_changes}"
+                  f"  (vs {dense} for full snapshots)")
+            if all_runs:
+                print(f"first run: {all_runs[0][1]}  last run: {all_runs[-1][1]}")
+
+
+if __name__ == "__main__":
+    main()
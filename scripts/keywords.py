@@ -0,0 +1,228 @@
+"""
+Distinctive keywords per company and per category from review_text.
+
+Streams feedbacks.csv in chunks, tokenizes each review with Azerbaijani-aware
+rules, maps tokens to a fixed number of feature columns with the hashing
+trick (no vocabulary is built) and folds each chunk into sparse
+company × feature count matrices.  Memory is bounded by the chunk size and
+the non-zeros of those matrices, not by the corpus size.  Distinctive terms
+are ranked with the log-odds ratio with an informative Dirichlet prior
+(Monroe, Colaresi & Quinn 2008), comparing each group against all others.
+
+Output: data/keywords.csv (scope, group, term, count, z_score)
+
+Usage:
+    python scripts/keywords.py
+    python scripts/keywords.py --chunk-size 50000 --features 20 --top 20
+    python scripts/keywords.py --ngrams 2
+"""
+
+import argparse
+import re
+import zlib
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from resolver import CompanyResolver
+
+ROOT = Path(__file__).parent.parent
+FEEDBACKS_CSV = ROOT / "data" / "feedbacks.csv"
+COMPANIES_CSV = ROOT / "data" / "companies.csv"
+OUTPUT_PATH = ROOT / "data" / "keywords.csv"
+
+TOKEN_RE = re.compile(r"[^\W\d_]+")
+
+# Function words that carry no topic (Azerbaijani, plus common Russian/English loans)
+STOPWORDS = frozenset("""
+    və ilə üçün da də ki bu o bir belə elə çox daha ən hər heç nə niyə necə
+    kimi qədər sonra əvvəl artıq hələ isə ya yaxud amma ancaq lakin çünki
+    mən sən biz siz onlar məni məndə mənə bizə sizə onun onu ona onlara
+    var yox yoxdur idi imiş olan olub olur oldu olaraq olmaq edir etdi etmək
+    edən edib deyil həm yenə hətta sadəcə yalnız bütün hamı özü öz bəs
+    də bura orda burada orada indi gün saat dəfə
+    и в не на что the and for
+""".split())
+
+
+def az_lower(text: str) -> str:
+    """Lowercase with Azerbaijani dotted/dotless i rules."""
+    return text.replace("I", "ı").replace("İ", "i").lower()
+
+
+def tokenize(text: str, ngrams: int = 1) -> list[str]:
+    words = [
+        w for w in TOKEN_RE.findall(az_lower(text))
+        if len(w) > 2 and w not in STOPWORDS
+    ]
+    tokens = list(words)
+    for n in range(2, ngrams + 1):
+        tokens += [" ".join(words[i:i + n]) for i in range(len(words) - n + 1)]
+    return tokens
+
+
+def bucket(token: str, n_features: int) -> int:
+    # crc32 is stable across processes, unlike hash()
+    return zlib.crc32(token.encode("utf-8")) & (n_features - 1)
+
+
+# ---------------------------------------------------------------------------
+# Streaming accumulation
+# ---------------------------------------------------------------------------
+
+class KeywordAccumulator:
+    """Sparse group × hashed-feature term counts, grown chunk by chunk."""
+
+    def __init__(self, n_features: int, ngrams: int):
+        self.n_features = n_features
+        self.ngrams = ngrams
+        self.groups: dict[str, int] = {}
+        self.docs = Counter()
+        self.counts = sparse.csr_matrix((0, n_features), dtype=np.int64)
+        # One display form per bucket; bounded by n_features entries
+        self.term_of: dict[int, str] = {}
+
+    def add_chunk(self, keys: list[str], texts: list[str]) -> None:
+        rows, cols = [], []
+        for doc, text in enumerate(texts):
+            for token in tokenize(text, self.ngrams):
+                b = bucket(token, self.n_features)
+                self.term_of.setdefault(b, token)
+                rows.append(doc)
+                cols.append(b)
+        X = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.int64), (rows, cols)),
+            shape=(len(texts), self.n_features),
+        )
+
+        group_ids = np.fromiter(
+            (self.groups.setdefault(k, len(self.groups)) for k in keys),
+            dtype=np.int64, count=len(keys),
+        )
+        self.docs.update(keys)
+        G = sparse.csr_matrix(
+            (np.ones(len(keys), dtype=np.int64), (group_ids, np.arange(len(keys)))),
+            shape=(len(self.groups), len(keys)),
+        )
+        self.counts.resize((len(self.groups), self.n_features))
+        self.counts = self.counts + G @ X
+
+    def rollup(self, mapping: dict[str, str]) -> "KeywordAccumulator":
+        """Aggregate groups into parent groups (e.g. company → category)."""
+        out = KeywordAccumulator(self.n_features, self.ngrams)
+        out.term_of = self.term_of
+        parents = sorted({mapping[g] for g in self.groups if g in mapping})
+        out.groups = {p: i for i, p in enumerate(parents)}
+        rows, cols = [], []
+        for g, i in self.groups.items():
+            if g in mapping:
+                rows.append(out.groups[mapping[g]])
+                cols.append(i)
+                out.docs[mapping[g]] += self.docs[g]
+        M = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.int64), (rows, cols)),
+            shape=(len(parents), len(self.groups)),
+        )
+        out.counts = (M @ self.counts).tocsr()
+        return out
+
+
+def distinctive_terms(acc: KeywordAccumulator, top: int, alpha0: float,
+                      min_docs: int) -> list[tuple[str, str, int, float]]:
+    """Log-odds z-scores of each group vs. the rest; top terms per group."""
+    counts = acc.counts.tocsr()
+    total = np.asarray(counts.sum(axis=0)).ravel().astype(float)
+    n_total = total.sum()
+    if n_total == 0:
+        return []
+    alpha = alpha0 * total / n_total
+
+    out = []
+    names = {i: g for g, i in acc.groups.items()}
+    for i in range(counts.shape[0]):
+        if acc.docs[names[i]] < min_docs:
+            continue
+        row = counts.getrow(i)
+        idx, y_i = row.indices, row.data.astype(float)
+        if len(idx) == 0:
+            continue
+        n_i = y_i.sum()
+        y_r = total[idx] - y_i
+        n_r = n_total - n_i
+        a = alpha[idx]
+        delta = (np.log((y_i + a) / (n_i + alpha0 - y_i - a))
+                 - np.log((y_r + a) / (n_r + alpha0 - y_r - a)))
+        z = delta / np.sqrt(1.0 / (y_i + a) + 1.0 / (y_r + a))
+        for j in np.argsort(-z)[:top]:
+            out.append((names[i], acc.term_of.get(int(idx[j]), f"#{idx[j]}"),
+                        int(y_i[j]), round(float(z[j]), 3)))
+    return out
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Extract distinctive review keywords")
+    parser.add_argument(
+        "--chunk-size", type=int, default=20000,
+        help="Reviews per streamed chunk (default: 20000)",
+    )
+    parser.add_argument(
+        "--features", type=int, default=18,
+        help="log2 of the number of hashed feature columns (default: 18)",
+    )
+    parser.add_argument("--ngrams", type=int, default=1, help="Max n-gram length (default: 1)")
+    parser.add_argument("--top", type=int, default=15, help="Terms per group (default: 15)")
+    parser.add_argument(
+        "--min-reviews", type=int, default=5,
+        help="Skip groups with fewer reviews (default: 5)",
+    )
+    parser.add_argument(
+        "--prior", type=float, default=500.0,
+        help="Dirichlet prior strength alpha0 (default: 500)",
+    )
+    args = parser.parse_args()
+
+    acc = KeywordAccumulator(1 << args.features, args.ngrams)
+    reader = pd.read_csv(
+        FEEDBACKS_CSV,
+        usecols=["company_slug", "company_name", "review_text"],
+        dtype=str, keep_default_na=False, chunksize=args.chunk_size,
+    )
+    n_reviews = 0
+    names: dict[str, str] = {}
+    for chunk in reader:
+        slugs = chunk["company_slug"].str.strip("/").tolist()
+        names.update(zip(slugs, chunk["company_name"]))
+        acc.add_chunk(slugs, chunk["review_text"].tolist())
+        n_reviews += len(chunk)
+        print(f"  {n_reviews:>9} reviews  →  {acc.counts.nnz:,} non-zeros "
+              f"across {len(acc.groups)} companies")
+
+    companies = pd.read_csv(COMPANIES_CSV, usecols=["slug", "name", "category_name"])
+    resolver = CompanyResolver(companies.to_dict("records"))
+    category_of_slug = dict(zip(companies["slug"], companies["category_name"]))
+    category_of = {}
+    for slug, name in names.items():
+        match = resolver.resolve(name, slug)
+        if match:
+            category_of[slug] = category_of_slug[match.slug]
+
+    rows = [("company", *r) for r in distinctive_terms(acc, args.top, args.prior, args.min_reviews)]
+    by_category = acc.rollup(category_of)
+    rows += [("category", *r)
+             for r in distinctive_terms(by_category, args.top, args.prior, args.min_reviews)]
+
+    out = pd.DataFrame(rows, columns=["scope", "group", "term", "count", "z_score"])
+    out.to_csv(OUTPUT_PATH, index=False)
+    print(f"\nDone. {len(out)} keyword rows for {out['group'].nunique()} groups "
+          f"saved to {OUTPUT_PATH}")
+
+
+if __name__ == "__main__":
+    main()
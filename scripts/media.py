@@ -0,0 +1,318 @@
+"""
+Optional media stage: download review attachments and company avatars.
+
+Reads attachment URLs from data/feedbacks.csv (`attachment_urls`, recorded by
+feedback.py) and avatar URLs from data/companies.csv (`photo_url`), downloads
+them concurrently over a pooled HTTP session and stores each file once under
+its SHA-256 content hash.  URLs already in the index are skipped on re-runs,
+and identical files behind different URLs share one object.  Thumbnails are
+produced in a process pool (requires Pillow).
+
+Layout:
+    data/media/index.sqlite          url → sha256, size, content type, suffix, source
+    data/media/objects/ab/abcd…      content-addressed originals (hash only, no suffix)
+    data/media/thumbs/abcd….jpg      thumbnails
+
+Usage:
+    python scripts/media.py
+    python scripts/media.py --only avatars --workers 16
+    python scripts/media.py --base-url http://127.0.0.1:8000   # local file server
+"""
+
+import argparse
+import csv
+import hashlib
+import importlib.util
+import mimetypes
+import os
+import sqlite3
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+from urllib.parse import urlsplit, urlunsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+ROOT = Path(__file__).parent.parent
+FEEDBACKS_CSV = ROOT / "data" / "feedbacks.csv"
+COMPANIES_CSV = ROOT / "data" / "companies.csv"
+MEDIA_DIR = ROOT / "data" / "media"
+OBJECTS_DIR = MEDIA_DIR / "objects"
+THUMBS_DIR = MEDIA_DIR / "thumbs"
+INDEX_PATH = MEDIA_DIR / "index.sqlite"
+
+HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/120.0.0.0 Safari/537.36"
+    ),
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS media (
+    url          TEXT PRIMARY KEY,
+    sha256       TEXT NOT NULL,
+    size         INTEGER NOT NULL,
+    content_type TEXT NOT NULL,
+    kind         TEXT NOT NULL,     -- "attachment" or "avatar"
+    ref          TEXT NOT NULL,     -- review_id or company slug
+    suffix       TEXT NOT NULL DEFAULT ''   -- file extension from URL or content type
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS media_sha256 ON media (sha256);
+"""
+
+CHUNK_SIZE = 64 * 1024
+
+
+@dataclass(slots=True)
+class MediaJob:
+    url: str
+    kind: str
+    ref: str
+
+
+@dataclass(slots=True)
+class Stored:
+    job: MediaJob
+    sha256: str
+    size: int
+    content_type: str
+    suffix: str
+    path: Path
+    is_new: bool
+
+
+# ---------------------------------------------------------------------------
+# Inputs
+# ---------------------------------------------------------------------------
+
+def rebase(url: str, base_url: str | None) -> str:
+    """Point a scraped URL at another origin (e.g. a local file server)."""
+    if not base_url:
+        return url
+    base, parts = urlsplit(base_url), urlsplit(url)
+    return urlunsplit((base.scheme, base.netloc, parts.path, parts.query, ""))
+
+
+def collect_jobs(only: str) -> list[MediaJob]:
+    """Jobs keyed by the scraped URLs; --base-url is applied only when fetching."""
+    jobs: list[MediaJob] = []
+    if only in ("all", "attachments") and FEEDBACKS_CSV.exists():
+        with open(FEEDBACKS_CSV, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                for url in (row.get("attachment_urls") or "").split():
+                    jobs.append(MediaJob(url, "attachment", row["review_id"]))
+    if only in ("all", "avatars") and COMPANIES_CSV.exists():
+        with open(COMPANIES_CSV, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                if row.get("photo_url"):
+                    jobs.append(MediaJob(row["photo_url"], "avatar", row["slug"]))
+    return jobs
+
+
+# ---------------------------------------------------------------------------
+# Download + content-addressed store
+# ---------------------------------------------------------------------------
+
+def make_session(workers: int) -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers, max_retries=2)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update(HEADERS)
+    return session
+
+
+def object_path(sha256: str) -> Path:
+    """Objects are keyed by content alone; the suffix lives in the index."""
+    return OBJECTS_DIR / sha256[:2] / sha256
+
+
+def download(
+    session: requests.Session, job: MediaJob, base_url: str | None = None
+) -> Stored:
+    """Stream one URL to a temp file while hashing, then move it into place.
+
+    ``base_url`` redirects the request to another origin; the job keeps its
+    scraped URL, which is what the index records.
+    """
+    OBJECTS_DIR.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=OBJECTS_DIR, suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as tmp, \
+                session.get(rebase(job.url, base_url), timeout=30, stream=True) as resp:
+            resp.raise_for_status()
+            content_type = resp.headers.get("Content-Type", "").split(";")[0].strip()
+            digest = hashlib.sha256()
+            size = 0
+            for chunk in resp.iter_content(chunk_size=CHUNK_SIZE):
+                digest.update(chunk)
+                tmp.write(chunk)
+                size += len(chunk)
+
+        sha256 = digest.hexdigest()
+        path = object_path(sha256)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        is_new = not path.exists()
+        if is_new:
+            os.replace(tmp_name, path)
+    finally:
+        # Duplicate content, or the stream broke off: drop the partial file
+        Path(tmp_name).unlink(missing_ok=True)
+
+    suffix = (
+        Path(urlsplit(job.url).path).suffix.lower()
+        or mimetypes.guess_extension(content_type)
+        or ""
+    )
+    return Stored(job, sha256, size, content_type or "application/octet-stream",
+                  suffix, path, is_new)
+
+
+def migrate_objects() -> None:
+    """Rename objects stored as {sha256}{suffix} to the hash-only layout."""
+    for old in OBJECTS_DIR.glob("*/*.*"):
+        new = old.with_name(old.name.split(".")[0])
+        if new.exists():
+            old.unlink()              # same bytes were stored under two suffixes
+        else:
+            old.rename(new)
+
+
+def open_index() -> sqlite3.Connection:
+    MEDIA_DIR.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(INDEX_PATH)
+    conn.executescript(SCHEMA)
+    if "suffix" not in {row[1] for row in conn.execute("PRAGMA table_info(media)")}:
+        conn.execute("ALTER TABLE media ADD COLUMN suffix TEXT NOT NULL DEFAULT ''")
+        migrate_objects()
+    return conn
+
+
+def fetch_all(
+    jobs: list[MediaJob], workers: int, base_url: str | None = None
+) -> list[Path]:
+    """Download every job not yet indexed; return paths of new objects."""
+    conn = open_index()
+    known = {url for (url,) in conn.execute("SELECT url FROM media")}
+    pending = list({j.url: j for j in jobs if j.url not in known}.values())
+    print(f"{len(jobs)} media URLs, {len(jobs) - len(pending)} already stored, "
+          f"{len(pending)} to fetch with {workers} workers")
+
+    new_objects: list[Path] = []
+    stats = {"new": 0, "dedup": 0, "error": 0}
+    with make_session(workers) as session, ThreadPoolExecutor(workers) as pool:
+        futures = {pool.submit(download, session, job, base_url): job for job in pending}
+        for done, future in enumerate(as_completed(futures), 1):
+            job = futures[future]
+            try:
+                stored = future.result()
+            except (requests.RequestException, OSError) as e:
+                stats["error"] += 1
+                print(f"  [ERROR] {job.url}: {e}")
+                continue
+            conn.execute(
+                "INSERT OR REPLACE INTO media "
+                "(url, sha256, size, content_type, kind, ref, suffix) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job.url, stored.sha256, stored.size, stored.content_type,
+                 job.kind, job.ref, stored.suffix),
+            )
+            if stored.is_new:
+                stats["new"] += 1
+                new_objects.append(stored.path)
+            else:
+                stats["dedup"] += 1
+            if done % 50 == 0:
+                conn.commit()
+                print(f"  {done}/{len(pending)} fetched")
+    conn.commit()
+    conn.close()
+    print(f"  new objects: {stats['new']}  duplicates: {stats['dedup']}  "
+          f"errors: {stats['error']}")
+    return new_objects
+
+
+# ---------------------------------------------------------------------------
+# Thumbnails
+# ---------------------------------------------------------------------------
+
+def make_thumbnail(src: Path, size: int) -> str:
+    """Write THUMBS_DIR/{sha}.jpg for one object; runs in a worker process."""
+    from PIL import Image
+
+    dest = THUMBS_DIR / f"{src.name.split('.')[0]}.jpg"
+    if dest.exists():
+        return "exists"
+    try:
+        with Image.open(src) as img:
+            img.thumbnail((size, size))
+            img.convert("RGB").save(dest, "JPEG", quality=80, optimize=True)
+    except (OSError, ValueError):   # SVG avatars, truncated files, …
+        return "skipped"
+    return "created"
+
+
+def make_thumbnails(workers: int, size: int) -> None:
+    if importlib.util.find_spec("PIL") is None:
+        print("Pillow is not installed — skipping thumbnails (pip install pillow)")
+        return
+    THUMBS_DIR.mkdir(parents=True, exist_ok=True)
+    sources = [
+        p for p in OBJECTS_DIR.glob("*/*")
+        if not p.name.endswith(".part")
+        and not (THUMBS_DIR / f"{p.name.split('.')[0]}.jpg").exists()
+    ]
+    if not sources:
+        print("Thumbnails up to date")
+        return
+    results: dict[str, int] = {}
+    with ProcessPoolExecutor(workers) as pool:
+        for outcome in pool.map(make_thumbnail, sources, [size] * len(sources), chunksize=8):
+            results[outcome] = results.get(outcome, 0) + 1
+    print(f"Thumbnails ({size}px): " + ", ".join(f"{k}: {v}" for k, v in sorted(results.items())))
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Download beledci.az attachments and avatars")
+    parser.add_argument(
+        "--only", choices=["all", "attachments", "avatars"], default="all",
+        help="Which media to fetch (default: all)",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=8,
+        help="Concurrent downloads / pooled connections (default: 8)",
+    )
+    parser.add_argument(
+        "--thumb-workers", type=int, default=os.cpu_count() or 2,
+        help="Processes for thumbnail generation (default: CPU count)",
+    )
+    parser.add_argument(
+        "--thumb-size", type=int, default=256,
+        help="Longest thumbnail edge in pixels (default: 256)",
+    )
+    parser.add_argument(
+        "--no-thumbs", action="store_true",
+        help="Skip thumbnail generation",
+    )
+    parser.add_argument(
+        "--base-url",
+        help="Rewrite media URLs to this origin, e.g. a local test file server",
+    )
+    args = parser.parse_args()
+
+    jobs = collect_jobs(args.only)
+    fetch_all(jobs, args.workers, args.base_url)
+    if not args.no_thumbs:
+        make_thumbnails(args.thumb_workers, args.thumb_size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""
+Reconcile feed-captured reviews with the companies' own review counts.
+
+companies.csv carries `review_count` from the category cards; feedbacks.csv
+holds the reviews actually captured from the home feed.  The two drift apart
+(reviews missed while the feed shifted between page requests, deleted
+reviews, …).  This stage counts feed reviews per slug in one vectorized
+group-by, compares them with `review_count`, and crawls the review pages of
+only those companies that disagree:
+
+  * a deficit (profile > feed) is filled by walking the company's pages
+    newest-first until the missing reviews are found;
+  * a surplus (feed > profile) walks all of the company's pages and reports
+    the captured review_ids that are no longer listed.
+
+Recovered reviews are appended to feedbacks.csv (with an empty `page`, as
+they do not come from a feed page) and folded into the aggregate store.
+Stale review_ids are only reported, never deleted.
+
+Output: data/reconcile.csv (one row per disagreeing company)
+
+Usage:
+    python scripts/reconcile.py --dry-run        # report disagreements only
+    python scripts/reconcile.py
+    python scripts/reconcile.py --only bolt --max-pages 10
+"""
+
+import argparse
+import csv
+import time
+from pathlib import Path
+
+import pandas as pd
+import requests
+
+import aggregates
+import feedback
+
+ROOT = Path(__file__).parent.parent
+FEEDBACKS_CSV = ROOT / "data" / "feedbacks.csv"
+COMPANIES_CSV = ROOT / "data" / "companies.csv"
+REPORT_PATH = ROOT / "data" / "reconcile.csv"
+
+REPORT_FIELDS = [
+    "slug", "name", "review_count", "feed_count", "delta",
+    "pages_crawled", "recovered", "stale_ids",
+]
+
+
+def disagreements(feedbacks: pd.DataFrame, companies: pd.DataFrame) -> pd.DataFrame:
+    """Per listed company: profile count vs. feed count, non-zero deltas only.
+
+    Sorted by the size of the disagreement, largest first.
+    """
+    feed_count = feedbacks["company_slug"].str.strip("/").value_counts()
+    out = companies.set_index("slug")[["name", "review_count"]].copy()
+    out["feed_count"] = feed_count.reindex(out.index, fill_value=0)
+    out["delta"] = out["review_count"] - out["feed_count"]
+    out = out[out["delta"] != 0]
+    return out.sort_values("delta", key=lambda d: d.abs(), ascending=False, kind="stable")
+
+
+def crawl_company(
+    session: requests.Session, slug: str, name: str, delta: int,
+    known_ids: set[str], delay: float, max_pages: int,
+) -> tuple[list[feedback.Review], set[str] | None, int]:
+    """Walk one company's review pages.
+
+    Returns (reviews not yet captured, ids listed on the company's pages,
+    pages crawled).  For a deficit the walk stops once ``delta`` new reviews
+    were found; for a surplus every page is needed to tell which captured
+    reviews are gone, so the listed ids are None if --max-pages cut it short.
+    """
+    last_page = feedback.get_last_page(session, f"/{slug}")
+    time.sleep(delay)
+    found: dict[str, feedback.Review] = {}
+    listed: set[str] = set()
+    pages = 0
+    for page in range(1, min(last_page, max_pages) + 1):
+        reviews = list(feedback.iter_company_page(session, slug, name, page))
+        pages += 1
+        listed.update(r.review_id for r in reviews)
+        # A review can show up twice when the list shifts between requests
+        found.update((r.review_id, r) for r in reviews if r.review_id not in known_ids)
+        if not reviews or (delta > 0 and len(found) >= delta):
+            break
+        time.sleep(delay)
+    complete = pages < max_pages or last_page <= max_pages
+    return list(found.values()), listed if complete else None, pages
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Reconcile feed reviews with company review counts")
+    parser.add_argument(
+        "--delay", type=float, default=0.5,
+        help="Seconds between requests (default: 0.5)",
+    )
+    parser.add_argument(
+        "--max-pages", type=int, default=50,
+        help="Upper bound on review pages per company (default: 50)",
+    )
+    parser.add_argument("--only", metavar="SLUG", help="Reconcile a single company")
+    parser.add_argument(
+        "--dry-run", action="store_true",
+        help="Only print the disagreements; crawl nothing",
+    )
+    args = parser.parse_args()
+
+    feedbacks = pd.read_csv(FEEDBACKS_CSV, usecols=["review_id", "company_slug"],
+                            dtype=str, keep_default_na=False)
+    companies = pd.read_csv(COMPANIES_CSV, usecols=["slug", "name", "review_count"])
+    todo = disagreements(feedbacks, companies)
+    if args.only:
+        todo = todo.loc[todo.index == args.only]
+
+    deficit = todo[todo["delta"] > 0]
+    print(f"{len(todo)} companies disagree: {len(deficit)} missing "
+          f"{int(deficit['delta'].sum())} reviews, {len(todo) - len(deficit)} have extra")
+    for slug, row in todo.iterrows():
+        print(f"  {slug:<28} profile={row['review_count']:>4}  feed={row['feed_count']:>4}  "
+              f"delta={row['delta']:+d}")
+    if args.dry_run or todo.empty:
+        return
+
+    ids_by_slug = feedbacks.assign(slug=feedbacks["company_slug"].str.strip("/")) \
+        .groupby("slug")["review_id"].agg(set)
+    known_ids = set(feedbacks["review_id"])
+    report = []
+    recovered: list[feedback.Review] = []
+    with requests.Session() as session:
+        for slug, row in todo.iterrows():
+            delta = int(row["delta"])
+            try:
+                found, listed, pages = crawl_company(
+                    session, slug, row["name"], delta, known_ids, args.delay, args.max_pages,
+                )
+            except requests.RequestException as e:
+                print(f"  [ERROR] {slug}: {e}")
+                continue
+            stale = []
+            if delta < 0 and listed is not None:
+                stale = sorted(ids_by_slug.get(slug, set()) - listed, key=int)
+            known_ids.update(r.review_id for r in found)
+            recovered.extend(found)
+            report.append({
+                "slug": slug, "name": row["name"],
+                "review_count": int(row["review_count"]), "feed_count": int(row["feed_count"]),
+                "delta": delta, "pages_crawled": pages, "recovered": len(found),
+                "stale_ids": " ".join(stale),
+            })
+            print(f"  {slug:<28} {pages:>3} pages → {len(found)} recovered"
+                  + (f", {len(stale)} no longer listed" if stale else ""))
+            time.sleep(args.delay)
+
+    if recovered:
+        feedback.append_csv(recovered, FEEDBACKS_CSV)
+        with aggregates.open_store() as store:
+            if aggregates.is_empty(store):
+                aggregates.ingest_csv(store, FEEDBACKS_CSV, count_pages=True)
+            else:
+                aggregates.add_reviews(store, recovered, source="reconcile")
+
+    with open(REPORT_PATH, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=REPORT_FIELDS)
+        writer.writeheader()
+        writer.writerows(report)
+    print(f"\nDone. {len(recovered)} reviews recovered into {FEEDBACKS_CSV.name}; "
+          f"report saved to {REPORT_PATH}")
+
+
+if __name__ == "__main__":
+    main()
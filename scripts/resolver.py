@@ -0,0 +1,206 @@
+"""
+Company resolver: match review company references to companies.csv rows.
+
+Reviews carry a `company_slug` and `company_name` as scraped from the feed;
+companies.csv is scraped separately from the category pages.  Exact joins
+silently lose reviews whose company was renamed, spelled differently or
+written with ASCII instead of Azerbaijani letters.  The resolver folds
+names (case, punctuation, ə/ı/ş/ç/ğ/ö/ü → e/i/s/c/g/o/u), tries exact slug
+and folded-name lookups first and falls back to a character-trigram
+inverted index, so each lookup only scores companies sharing a trigram
+with the query instead of scanning every company.
+
+Output: data/company_matches.csv (one row per distinct slug/name in feedbacks.csv)
+
+Usage:
+    python scripts/resolver.py
+    python scripts/resolver.py --threshold 0.7
+    python scripts/resolver.py --query "Kontakt Hom"
+"""
+
+import argparse
+import csv
+import re
+import unicodedata
+from collections import Counter
+from collections.abc import Iterable, Mapping
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+COMPANIES_CSV = ROOT / "data" / "companies.csv"
+FEEDBACKS_CSV = ROOT / "data" / "feedbacks.csv"
+REPORT_PATH = ROOT / "data" / "company_matches.csv"
+
+DEFAULT_THRESHOLD = 0.6
+
+# Azerbaijani letters without a useful NFKD decomposition (plus dotted/dotless i)
+AZ_FOLD = str.maketrans({
+    "ə": "e", "Ə": "e", "ı": "i", "I": "i", "İ": "i",
+    "ş": "s", "Ş": "s", "ç": "c", "Ç": "c", "ğ": "g", "Ğ": "g",
+    "ö": "o", "Ö": "o", "ü": "u", "Ü": "u",
+})
+NON_ALNUM = re.compile(r"[^0-9a-zЀ-ӿ]+")
+
+
+def fold(text: str) -> str:
+    """Normalise a company name or slug for matching."""
+    text = text.translate(AZ_FOLD).lower()
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    text = text.replace("'", "").replace("’", "")   # McDonald's → mcdonalds
+    return NON_ALNUM.sub(" ", text).strip()
+
+
+def trigrams(key: str) -> set[str]:
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+@dataclass(slots=True)
+class Match:
+    """Best companies.csv row for a query, with a 0–1 confidence."""
+
+    slug: str
+    name: str
+    confidence: float
+    method: str          # "slug", "name" or "trigram"
+
+
+# ---------------------------------------------------------------------------
+# Resolver
+# ---------------------------------------------------------------------------
+
+class CompanyResolver:
+    """Trigram-indexed lookup over company names and slugs."""
+
+    def __init__(self, companies: Iterable[Mapping], threshold: float = DEFAULT_THRESHOLD):
+        self.threshold = threshold
+        self.slugs: list[str] = []
+        self.names: list[str] = []
+        self.by_slug: dict[str, int] = {}
+        self.by_key: dict[str, int] = {}
+        self.key_grams: list[list[set[str]]] = []     # company → trigram sets of its keys
+        self.index: dict[str, list[int]] = {}         # trigram → companies
+
+        for i, row in enumerate(companies):
+            slug, name = str(row["slug"]).strip("/"), str(row["name"])
+            self.slugs.append(slug)
+            self.names.append(name)
+            self.by_slug[slug] = i
+            keys = {fold(name), fold(slug)}
+            grams = []
+            for key in keys:
+                self.by_key.setdefault(key, i)
+                grams.append(trigrams(key))
+            self.key_grams.append(grams)
+            for gram in set().union(*grams):
+                self.index.setdefault(gram, []).append(i)
+
+    @classmethod
+    def from_csv(cls, path: Path = COMPANIES_CSV, **kwargs) -> "CompanyResolver":
+        with open(path, newline="", encoding="utf-8") as f:
+            return cls(list(csv.DictReader(f)), **kwargs)
+
+    def _match(self, i: int, confidence: float, method: str) -> Match:
+        return Match(self.slugs[i], self.names[i], round(confidence, 4), method)
+
+    def candidates(self, text: str, limit: int = 5) -> list[Match]:
+        """Rank companies by trigram Dice similarity to ``text``."""
+        query = trigrams(fold(text))
+        shared = Counter(i for gram in query for i in self.index.get(gram, ()))
+        scored = []
+        for i in shared:
+            best = max(2 * len(query & g) / (len(query) + len(g)) for g in self.key_grams[i])
+            scored.append((best, i))
+        scored.sort(reverse=True)
+        return [self._match(i, score, "trigram") for score, i in scored[:limit]]
+
+    def resolve(self, name: str, slug: str = "") -> Match | None:
+        """Best match for a review's company reference, or None if too weak."""
+        slug = slug.strip("/")
+        if slug in self.by_slug:
+            return self._match(self.by_slug[slug], 1.0, "slug")
+        for text in (name, slug):
+            i = self.by_key.get(fold(text)) if text else None
+            if i is not None:
+                return self._match(i, 0.99, "name")
+
+        best = None
+        for text in (name, slug.replace("-", " ")):
+            top = self.candidates(text, limit=1) if text else []
+            if top and (best is None or top[0].confidence > best.confidence):
+                best = top[0]
+        return best if best and best.confidence >= self.threshold else None
+
+    def resolve_all(
+        self, refs: Iterable[tuple[str, str]]
+    ) -> dict[tuple[str, str], Match | None]:
+        """Resolve each distinct (company_slug, company_name) pair once."""
+        return {(slug, name): self.resolve(name, slug) for slug, name in set(refs)}
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+def write_report(resolver: CompanyResolver, feedbacks_csv: Path, path: Path) -> None:
+    with open(feedbacks_csv, newline="", encoding="utf-8") as f:
+        counts = Counter((r["company_slug"], r["company_name"]) for r in csv.DictReader(f))
+    matches = resolver.resolve_all(counts)
+
+    rows = []
+    for (slug, name), n in counts.items():
+        match = matches[slug, name]
+        best = match or next(iter(resolver.candidates(name, limit=1)), None)
+        rows.append({
+            "company_slug": slug,
+            "company_name": name,
+            "reviews": n,
+            "matched_slug": match.slug if match else "",
+            "matched_name": match.name if match else "",
+            "confidence": match.confidence if match else 0.0,
+            "method": match.method if match else "unmatched",
+            "best_candidate": f"{best.name} ({best.confidence:.2f})" if best and not match else "",
+        })
+    rows.sort(key=lambda r: (r["confidence"], -r["reviews"]))
+
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]) if rows else ["company_slug"])
+        writer.writeheader()
+        writer.writerows(rows)
+
+    by_method = Counter(r["method"] for r in rows)
+    reviews_by_method = Counter()
+    for r in rows:
+        reviews_by_method[r["method"]] += r["reviews"]
+    print(f"{len(rows)} distinct company references in {feedbacks_csv.name}:")
+    for method in ("slug", "name", "trigram", "unmatched"):
+        print(f"  {method:<10} {by_method[method]:>4} companies  "
+              f"{reviews_by_method[method]:>5} reviews")
+    print(f"\nReport saved to {path}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Resolve review companies to companies.csv")
+    parser.add_argument(
+        "--threshold", type=float, default=DEFAULT_THRESHOLD,
+        help=f"Minimum trigram confidence to accept a match (default: {DEFAULT_THRESHOLD})",
+    )
+    parser.add_argument("--query", help="Print the top candidates for one name and exit")
+    args = parser.parse_args()
+
+    resolver = CompanyResolver.from_csv(threshold=args.threshold)
+
+    if args.query:
+        match = resolver.resolve(args.query)
+        print(f"resolved: {asdict(match) if match else None}\n")
+        for candidate in resolver.candidates(args.query):
+            print(f"  {candidate.confidence:.3f}  {candidate.name}  ({candidate.slug})")
+        return
+
+    write_report(resolver, FEEDBACKS_CSV, REPORT_PATH)
+
+
+if __name__ == "__main__":
+    main()
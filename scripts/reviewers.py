@@ -0,0 +1,246 @@
+"""
+Reviewer × company co-occurrence analysis.
+
+Builds a sparse reviewer × company incidence matrix B (review counts) from
+feedbacks.csv and derives:
+
+  * company ↔ company co-review similarity from the sparse product BᵀB
+    (binarized, so a pair scores the number of reviewers who reviewed both),
+    normalised to cosine similarity;
+  * the heaviest reviewers per category from B · M, where M maps
+    companies to categories.
+
+The matrix and the set of ingested review_ids are persisted, so later runs
+only fold in reviews they have not seen.  Reviewers are identified by their
+display name, so different people sharing a name are merged.
+
+Output:
+    data/company_similarity.csv
+    data/top_reviewers.csv
+
+Usage:
+    python scripts/reviewers.py
+    python scripts/reviewers.py --rebuild --min-shared 3 --top 20
+    python scripts/reviewers.py --synthetic 5000000      # scaling benchmark
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from resolver import CompanyResolver
+
+ROOT = Path(__file__).parent.parent
+FEEDBACKS_CSV = ROOT / "data" / "feedbacks.csv"
+COMPANIES_CSV = ROOT / "data" / "companies.csv"
+STATE_DIR = ROOT / "data" / "reviewers"
+SIMILARITY_PATH = ROOT / "data" / "company_similarity.csv"
+TOP_REVIEWERS_PATH = ROOT / "data" / "top_reviewers.csv"
+
+
+class CoReviewIndex:
+    """Incrementally updated sparse reviewer × company review counts."""
+
+    def __init__(self):
+        self.reviewers: dict[str, int] = {}
+        self.companies: dict[str, int] = {}
+        self.counts = sparse.csr_matrix((0, 0), dtype=np.int32)
+        self.seen = np.empty(0, dtype=np.int64)
+
+    # -- updates -----------------------------------------------------------
+
+    def add(self, review_ids, reviewers, companies) -> int:
+        """Fold in reviews whose id is new; return how many were added."""
+        review_ids = np.asarray(review_ids, dtype=np.int64)
+        fresh = ~np.isin(review_ids, self.seen)
+        # Count a review_id repeated within the batch only once
+        first = np.zeros(len(review_ids), dtype=bool)
+        first[np.unique(review_ids, return_index=True)[1]] = True
+        fresh &= first
+        if not fresh.any():
+            return 0
+
+        reviewers = np.asarray(reviewers, dtype=object)[fresh]
+        companies = np.asarray(companies, dtype=object)[fresh]
+        rows = np.fromiter(
+            (self.reviewers.setdefault(r, len(self.reviewers)) for r in reviewers),
+            dtype=np.int64, count=len(reviewers),
+        )
+        cols = np.fromiter(
+            (self.companies.setdefault(c, len(self.companies)) for c in companies),
+            dtype=np.int64, count=len(companies),
+        )
+        shape = (len(self.reviewers), len(self.companies))
+        delta = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.int32), (rows, cols)), shape=shape,
+        )
+        self.counts.resize(shape)
+        self.counts = (self.counts + delta).tocsr()
+        self.seen = np.union1d(self.seen, review_ids[fresh])
+        return int(fresh.sum())
+
+    # -- persistence -------------------------------------------------------
+
+    def save(self, state_dir: Path = STATE_DIR) -> None:
+        state_dir.mkdir(parents=True, exist_ok=True)
+        sparse.save_npz(state_dir / "incidence.npz", self.counts)
+        np.save(state_dir / "seen_review_ids.npy", self.seen)
+        with open(state_dir / "labels.json", "w", encoding="utf-8") as f:
+            json.dump({"reviewers": list(self.reviewers), "companies": list(self.companies)},
+                      f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, state_dir: Path = STATE_DIR) -> "CoReviewIndex":
+        index = cls()
+        if not (state_dir / "incidence.npz").exists():
+            return index
+        index.counts = sparse.load_npz(state_dir / "incidence.npz").tocsr()
+        index.seen = np.load(state_dir / "seen_review_ids.npy")
+        with open(state_dir / "labels.json", encoding="utf-8") as f:
+            labels = json.load(f)
+        index.reviewers = {r: i for i, r in enumerate(labels["reviewers"])}
+        index.companies = {c: i for i, c in enumerate(labels["companies"])}
+        return index
+
+    # -- analysis ----------------------------------------------------------
+
+    def company_similarity(self, min_shared: int = 2) -> pd.DataFrame:
+        """Company pairs sharing at least ``min_shared`` reviewers."""
+        binary = (self.counts > 0).astype(np.int32)
+        shared = (binary.T @ binary).tocoo()          # companies × companies
+        degree = np.asarray(binary.sum(axis=0)).ravel()
+
+        keep = (shared.row < shared.col) & (shared.data >= min_shared)
+        a, b, n = shared.row[keep], shared.col[keep], shared.data[keep]
+        names = np.array(list(self.companies), dtype=object)
+        return pd.DataFrame({
+            "company_a": names[a],
+            "company_b": names[b],
+            "shared_reviewers": n,
+            "cosine": np.round(n / np.sqrt(degree[a] * degree[b]), 4),
+        }).sort_values(["cosine", "shared_reviewers"], ascending=False, ignore_index=True)
+
+    def top_reviewers(self, category_of: dict[str, str], top: int = 10) -> pd.DataFrame:
+        """Reviewers with the most reviews in each category."""
+        categories = sorted(set(category_of.values()))
+        cat_idx = {c: i for i, c in enumerate(categories)}
+        pairs = [(j, cat_idx[category_of[c]]) for c, j in self.companies.items()
+                 if c in category_of]
+        rows, cols = zip(*pairs) if pairs else ((), ())
+        M = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.int32), (rows, cols)),
+            shape=(len(self.companies), len(categories)),
+        )
+        per_category = (self.counts @ M).tocsc()                 # reviewers × categories
+        companies_per = ((self.counts > 0).astype(np.int32) @ M).tocsc()
+
+        names = np.array(list(self.reviewers), dtype=object)
+        out = []
+        for k, category in enumerate(categories):
+            col = per_category.getcol(k)
+            order = np.argsort(-col.data)[:top]
+            for rank, i in enumerate(order, 1):
+                reviewer = col.indices[i]
+                out.append((category, rank, names[reviewer], int(col.data[i]),
+                            int(companies_per[reviewer, k])))
+        return pd.DataFrame(out, columns=["category", "rank", "reviewer_name",
+                                          "reviews", "companies"])
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+def ingest_csv(index: CoReviewIndex, chunk_size: int) -> int:
+    added = 0
+    for chunk in pd.read_csv(
+        FEEDBACKS_CSV, usecols=["review_id", "reviewer_name", "company_slug"],
+        dtype={"reviewer_name": str, "company_slug": str}, keep_default_na=False,
+        chunksize=chunk_size,
+    ):
+        chunk = chunk[chunk["reviewer_name"].str.strip() != ""]
+        added += index.add(chunk["review_id"], chunk["reviewer_name"].str.strip(),
+                           chunk["company_slug"].str.strip("/"))
+    return added
+
+
+def category_mapping(index: CoReviewIndex) -> dict[str, str]:
+    companies = pd.read_csv(COMPANIES_CSV, usecols=["slug", "name", "category_name"])
+    resolver = CompanyResolver(companies.to_dict("records"))
+    category_of_slug = dict(zip(companies["slug"], companies["category_name"]))
+    out = {}
+    for slug in index.companies:
+        match = resolver.resolve("", slug)
+        if match:
+            out[slug] = category_of_slug[match.slug]
+    return out
+
+
+def synthetic_benchmark(n_reviews: int, min_shared: int) -> None:
+    """Time ingest + similarity on random Zipf-distributed reviews."""
+    rng = np.random.default_rng(0)
+    n_reviewers, n_companies = max(10, n_reviews // 3), max(10, n_reviews // 500)
+    reviewers = (rng.zipf(1.6, n_reviews) % n_reviewers).astype(str)
+    companies = (rng.zipf(1.3, n_reviews) % n_companies).astype(str)
+
+    index = CoReviewIndex()
+    t0 = time.perf_counter()
+    half = n_reviews // 2
+    index.add(np.arange(half), reviewers[:half], companies[:half])
+    t1 = time.perf_counter()
+    index.add(np.arange(half, n_reviews), reviewers[half:], companies[half:])
+    t2 = time.perf_counter()
+    sim = index.company_similarity(min_shared)
+    t3 = time.perf_counter()
+
+    print(f"synthetic: {n_reviews:,} reviews, {len(index.reviewers):,} reviewers, "
+          f"{len(index.companies):,} companies, nnz={index.counts.nnz:,}")
+    print(f"  initial ingest     {t1 - t0:8.2f} s")
+    print(f"  incremental ingest {t2 - t1:8.2f} s")
+    print(f"  similarity (BᵀB)   {t3 - t2:8.2f} s  →  {len(sim):,} pairs")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Reviewer × company co-occurrence analysis")
+    parser.add_argument("--rebuild", action="store_true", help="Ignore saved state and rebuild")
+    parser.add_argument(
+        "--min-shared", type=int, default=2,
+        help="Minimum shared reviewers for a company pair (default: 2)",
+    )
+    parser.add_argument("--top", type=int, default=10, help="Reviewers per category (default: 10)")
+    parser.add_argument(
+        "--chunk-size", type=int, default=100000,
+        help="Rows per CSV chunk (default: 100000)",
+    )
+    parser.add_argument(
+        "--synthetic", type=int, metavar="N",
+        help="Benchmark on N random reviews instead of feedbacks.csv",
+    )
+    args = parser.parse_args()
+
+    if args.synthetic:
+        synthetic_benchmark(args.synthetic, args.min_shared)
+        return
+
+    index = CoReviewIndex() if args.rebuild else CoReviewIndex.load()
+    added = ingest_csv(index, args.chunk_size)
+    index.save()
+    print(f"Added {added} reviews → {len(index.reviewers)} reviewers × "
+          f"{len(index.companies)} companies ({index.counts.nnz} non-zeros)")
+
+    sim = index.company_similarity(args.min_shared)
+    sim.to_csv(SIMILARITY_PATH, index=False)
+    print(f"{len(sim)} company pairs saved to {SIMILARITY_PATH}")
+
+    top = index.top_reviewers(category_mapping(index), args.top)
+    top.to_csv(TOP_REVIEWERS_PATH, index=False)
+    print(f"{len(top)} top-reviewer rows saved to {TOP_REVIEWERS_PATH}")
+
+
+if __name__ == "__main__":
+    main()
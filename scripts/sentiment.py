@@ -0,0 +1,402 @@
+"""
+Lexicon-based sentiment scores for review_text.
+
+The star rating is coarse (most reviews are 1-star), so this stage scores how
+negative or positive each review's wording is, on a scale from -1 to +1.
+Scoring uses a hand-built Azerbaijani lexicon of word stems, with a few
+Russian and English entries for mixed-language reviews:
+
+  * tokens are matched to stems by longest prefix, since Azerbaijani is
+    agglutinative (pis, pisdir, pisləşib all match "pis"); negated verb forms
+    such as "bəyənmə…" or "işləmir" are stems of their own, and diacritics are
+    folded so that "cox" and "yaxsi" match "çox" and "yaxşı";
+  * bigram phrases ("cavab vermir", "sağ ol") override their two unigrams;
+  * intensifiers ("çox", "lap", "очень") scale the next token;
+  * any form of "deyil" / "yox" (deyiləm, yoxdur, …) flips the preceding polar
+    token ("yaxşı deyil", "razı deyiləm"), and "не" / "not" flip the next one;
+  * the summed valence s is normalised to s / sqrt(s² + 15), as in VADER
+    (Hutto & Gilbert, 2014).
+
+Each batch is tokenized once and scored with numpy array operations.
+Batches run in a process pool.  Scores are memoized in a sqlite cache keyed
+by a hash of the text and a fingerprint of the lexicon, so re-runs and
+duplicate texts are never scored twice, and editing the lexicon invalidates
+the cache automatically.
+
+Output: data/sentiment.csv (review_id, company_slug, company_name, rating,
+sentiment_score), cache in data/sentiment_cache.sqlite
+
+Usage:
+    python scripts/sentiment.py
+    python scripts/sentiment.py --workers 8 --batch-size 20000
+    python scripts/sentiment.py --text "Sürücü çox kobud idi, heç tövsiyə etmirəm"
+    python scripts/sentiment.py --benchmark 1000000
+"""
+
+import argparse
+import hashlib
+import random
+import sqlite3
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from keywords import TOKEN_RE, az_lower
+
+ROOT = Path(__file__).parent.parent
+FEEDBACKS_CSV = ROOT / "data" / "feedbacks.csv"
+OUTPUT_PATH = ROOT / "data" / "sentiment.csv"
+CACHE_PATH = ROOT / "data" / "sentiment_cache.sqlite"
+
+# ---------------------------------------------------------------------------
+# Lexicon
+# ---------------------------------------------------------------------------
+
+# Stem → valence in [-2, 2].  Matched as a prefix of the (folded) token, so
+# keep stems long enough not to swallow unrelated words.
+LEXICON = {
+    # Azerbaijani, negative
+    "pis": -1.5, "bərbad": -2.0, "biabır": -2.0, "rəzil": -2.0, "rüsvay": -2.0,
+    "dəhşət": -1.8, "iyrənc": -2.0, "qəbuledilməz": -2.0, "fırıldaq": -2.0,
+    "dələduz": -2.0, "oğru": -1.8, "aldat": -1.8, "aldad": -1.8, "yalan": -1.5,
+    "kobud": -1.5, "hörmətsiz": -1.5, "nəzakətsiz": -1.5, "mədəniyyətsiz": -1.5,
+    "savadsız": -1.3, "səriştəsiz": -1.3, "məsuliyyətsiz": -1.5, "laqeyd": -1.3,
+    "keyfiyyətsiz": -1.5, "səliqəsiz": -1.2, "çirk": -1.3, "iy verir": -1.3,
+    "xarab": -1.5, "qırıl": -1.0, "sınıq": -1.0, "zədə": -1.0, "köhnə": -0.5,
+    "narazı": -1.5, "məyus": -1.3, "əsəb": -1.2, "təəssüf": -1.0,
+    "şikayət": -1.0, "problem": -1.0, "səhv": -0.8, "itki": -1.0, "itir": -1.0,
+    "ziyan": -1.2, "zərər": -1.2, "gecik": -1.0, "ləng": -1.0, "yavaş": -0.6,
+    "zəif": -1.0, "baha": -0.8, "cavabsız": -1.2, "nəticəsiz": -1.0,
+    "işləmir": -1.2, "işləməyir": -1.2, "vermir": -0.8, "verilmir": -0.8,
+    "vermədi": -0.8, "gəlmir": -0.8, "gəlmədi": -0.8, "olmur": -0.6,
+    "olmadı": -0.6, "açmır": -1.0, "bəyənmə": -1.2, "qaytarmır": -1.3,
+    "qaytarılmır": -1.3, "bəyənmir": -1.2, "bəyənilməz": -1.2, "xoşagəlməz": -1.3,
+    "uğursuz": -1.2, "rahatsız": -1.0, "imtina": -0.8, "ləğv": -0.6, "məhkəmə": -1.0,
+    "cərimə": -0.8, "vaxtı keçmiş": -1.5, "həll olunmur": -1.3,
+    "cavab vermir": -1.3, "heç kim": -1.0, "pul qaytar": -1.0, "tövsiyə etmir": -1.5,
+    # Azerbaijani, positive
+    "yaxşı": 1.2, "əla": 1.8, "super": 1.5, "mükəmməl": 2.0, "möhtəşəm": 2.0,
+    "gözəl": 1.5, "təşəkkür": 1.2, "minnətdar": 1.5, "razı": 1.3, "məmnun": 1.5,
+    "tövsiyə": 1.2, "peşəkar": 1.3, "nəzakətli": 1.3, "mehriban": 1.3,
+    "səliqəli": 1.2, "keyfiyyətli": 1.3, "keyfiyyət": 0.5, "dadlı": 1.3,
+    "sürətli": 1.0, "operativ": 1.0, "ucuz": 0.5, "rahat": 0.8, "təmiz": 1.0,
+    "xoş": 1.2, "sevindir": 1.2, "uğur": 1.0, "bəyən": 1.2, "halal": 1.2,
+    "afərin": 1.5, "düzgün": 0.6, "normal": 0.3, "problemsiz": 0.8,
+    "həll olundu": 1.0, "sağ ol": 1.2,
+    # Russian
+    "плох": -1.5, "ужас": -2.0, "отврат": -2.0, "кошмар": -2.0, "хам": -1.5,
+    "обман": -1.8, "мошен": -2.0, "верните": -1.0, "жалоб": -1.0,
+    "хорош": 1.2, "отличн": 1.8, "прекрасн": 1.8, "замечательн": 1.8,
+    "спасибо": 1.2, "вкусн": 1.3, "рекоменд": 1.2,
+    # English
+    "bad": -1.5, "terrible": -2.0, "worst": -2.0, "awful": -2.0,
+    "good": 1.2, "great": 1.5, "excellent": 1.8, "best": 1.5, "thank": 1.2,
+}
+
+# Words that would otherwise match a shorter, unrelated stem
+# (əlaqə → əla, pişik → pis, supermarket → super, …)
+NEUTRAL = {
+    "əlaqə", "əlavə", "elan", "pişik", "pişir", "supermarket", "bahar", "badam",
+    "razılaş",
+}
+LEXICON.update(dict.fromkeys(NEUTRAL, 0.0))
+
+INTENSIFIERS = {
+    "çox": 1.5, "lap": 1.4, "ən": 1.3, "olduqca": 1.4, "həddən": 1.5,
+    "tamamilə": 1.3, "heç": 1.3, "очень": 1.5, "very": 1.5,
+}
+# Stems, matched by prefix like the lexicon: deyiləm, deyillər, yoxdur, yoxdu, …
+NEGATE_PREVIOUS = frozenset({"deyil", "yox"})
+NOT_NEGATORS = frozenset({"yoxla", "yoxsul", "yoxuş"})   # yoxlamaq "to check", …
+NEGATE_NEXT = frozenset({"не", "нет", "not", "no"})
+NEGATION_FACTOR = -0.75      # "yaxşı deyil" is milder than "pis"
+ALPHA = 15.0                 # VADER normalisation constant
+MIN_STEM = 2                 # "ol" in "sağ ol"
+
+_FOLD = list(zip("əıöüşçğ", "eiouscg"))
+
+
+def fold(text: str) -> str:
+    """Drop Azerbaijani diacritics (reviews are often typed on Latin keyboards)."""
+    # Chained replace() is several times faster than translate() on non-ASCII text
+    for letter, plain in _FOLD:
+        text = text.replace(letter, plain)
+    return text
+
+
+def normalize(text: str) -> list[str]:
+    return TOKEN_RE.findall(fold(az_lower(text)))
+
+
+UNIGRAMS = {fold(k): v for k, v in LEXICON.items() if " " not in k}
+BIGRAMS = {tuple(fold(k).split()): v for k, v in LEXICON.items() if " " in k}
+PHRASE_FIRST = frozenset(first for first, _ in BIGRAMS)
+PHRASE_SECOND = frozenset(second for _, second in BIGRAMS)
+FOLDED_INTENSIFIERS = {fold(k): v for k, v in INTENSIFIERS.items()}
+NEGATOR_STEMS = {
+    **{fold(w): True for w in NEGATE_PREVIOUS},
+    **{fold(w): False for w in NOT_NEGATORS},
+}
+
+MODEL_ID = "lexicon-" + hashlib.blake2b(
+    repr((sorted(LEXICON.items()), sorted(INTENSIFIERS.items()), sorted(NEGATE_PREVIOUS),
+          sorted(NOT_NEGATORS), sorted(NEGATE_NEXT), NEGATION_FACTOR, ALPHA)).encode("utf-8"),
+    digest_size=6,
+).hexdigest()
+
+
+def longest_stem(token: str, stems) -> str | None:
+    """Longest entry of ``stems`` that prefixes ``token``."""
+    for end in range(len(token), MIN_STEM - 1, -1):
+        if token[:end] in stems:
+            return token[:end]
+    return None
+
+
+@lru_cache(maxsize=1 << 16)
+def valence(token: str) -> float:
+    s = longest_stem(token, UNIGRAMS)
+    return UNIGRAMS[s] if s else 0.0
+
+
+@lru_cache(maxsize=1 << 16)
+def negates_previous(token: str) -> bool:
+    s = longest_stem(token, NEGATOR_STEMS)
+    return NEGATOR_STEMS[s] if s else False
+
+
+@lru_cache(maxsize=1 << 16)
+def phrase_stems(token: str) -> tuple[str | None, str | None]:
+    """The token's stem as the first and as the second word of a phrase."""
+    return longest_stem(token, PHRASE_FIRST), longest_stem(token, PHRASE_SECOND)
+
+
+# ---------------------------------------------------------------------------
+# Scoring
+# ---------------------------------------------------------------------------
+
+def score_batch(texts: list[str]) -> np.ndarray:
+    """Sentiment in [-1, 1] for each text; 0 when no lexicon word occurs.
+
+    Tokens are mapped to ids of a per-batch vocabulary, lexicon features are
+    looked up once per distinct token and everything else is array work.
+    """
+    tokens: list[str] = []
+    lengths = np.empty(len(texts), dtype=np.int64)
+    for i, text in enumerate(texts):
+        words = normalize(text)
+        tokens += words
+        lengths[i] = len(words)
+    n = len(tokens)
+    if n == 0:
+        return np.zeros(len(texts))
+    tok, words = pd.factorize(np.asarray(tokens, dtype=object))
+    doc = np.repeat(np.arange(len(texts)), lengths)
+    same = doc[1:] == doc[:-1]                   # token i and i+1 share a review
+
+    w = np.fromiter(map(valence, words), dtype=np.float64, count=len(words))[tok]
+
+    # Phrases replace the valence of both their words
+    first, second = zip(*map(phrase_stems, words))
+    has_first = np.fromiter((f is not None for f in first), dtype=bool, count=len(words))
+    has_second = np.fromiter((s is not None for s in second), dtype=bool, count=len(words))
+    for i in np.flatnonzero(has_first[tok[:-1]] & has_second[tok[1:]] & same):
+        value = BIGRAMS.get((first[tok[i]], second[tok[i + 1]]))
+        if value is not None:
+            w[i], w[i + 1] = value, 0.0
+
+    # Intensifiers scale the following token
+    boost = np.fromiter((FOLDED_INTENSIFIERS.get(t, 1.0) for t in words),
+                        dtype=np.float64, count=len(words))[tok]
+    w[1:] *= np.where(same, boost[:-1], 1.0)
+
+    # Negators: flip the nearest polar token before (within two) or the next one
+    post = np.fromiter(map(negates_previous, words), dtype=bool, count=len(words))[tok]
+    pre = np.fromiter((t in NEGATE_NEXT for t in words), dtype=bool, count=len(words))[tok]
+    flip = np.ones(n)
+    prev1 = np.flatnonzero(post[1:] & same) + 1
+    near = prev1[w[prev1 - 1] != 0]
+    flip[near - 1] = NEGATION_FACTOR
+    far = prev1[(w[prev1 - 1] == 0) & (prev1 >= 2)]
+    far = far[(doc[far - 2] == doc[far]) & (w[far - 2] != 0)]
+    flip[far - 2] = NEGATION_FACTOR
+    nxt = np.flatnonzero(pre[:-1] & same)
+    flip[nxt + 1] = NEGATION_FACTOR
+    w *= flip
+
+    s = np.bincount(doc, weights=w, minlength=len(texts))
+    return s / np.sqrt(s * s + ALPHA)
+
+
+def text_key(text: str) -> bytes:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+# ---------------------------------------------------------------------------
+# Cache
+# ---------------------------------------------------------------------------
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scores (
+    text_hash BLOB NOT NULL,
+    model     TEXT NOT NULL,
+    score     REAL NOT NULL,
+    PRIMARY KEY (text_hash, model)
+) WITHOUT ROWID;
+"""
+
+
+def open_cache(path: Path = CACHE_PATH) -> sqlite3.Connection:
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def cached_scores(conn: sqlite3.Connection, keys: list[bytes]) -> dict[bytes, float]:
+    out = {}
+    for i in range(0, len(keys), 900):       # stay under SQLITE_MAX_VARIABLE_NUMBER
+        part = keys[i:i + 900]
+        out.update(conn.execute(
+            f"SELECT text_hash, score FROM scores WHERE model = ? "
+            f"AND text_hash IN ({','.join('?' * len(part))})",
+            [MODEL_ID, *part],
+        ))
+    return out
+
+
+class Scorer:
+    """Scores texts through the cache, sending misses to a process pool."""
+
+    def __init__(self, conn: sqlite3.Connection, workers: int | None = None,
+                 batch_size: int = 10_000):
+        self.conn = conn
+        self.batch_size = batch_size
+        self.pool = ProcessPoolExecutor(workers) if workers != 1 else None
+        self.reviews = self.scored = self.cached = 0
+
+    def __enter__(self) -> "Scorer":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        if self.pool is not None:
+            self.pool.shutdown()
+
+    def score(self, texts: list[str]) -> np.ndarray:
+        keys = [text_key(t) for t in texts]
+        known = cached_scores(self.conn, list(set(keys)))
+        todo = {k: t for k, t in zip(keys, texts) if k not in known}
+        self.reviews += len(texts)
+        self.cached += sum(k in known for k in keys)
+        self.scored += len(todo)
+
+        todo_keys, todo_texts = list(todo), list(todo.values())
+        batches = [todo_texts[i:i + self.batch_size]
+                   for i in range(0, len(todo_texts), self.batch_size)]
+        results = self.pool.map(score_batch, batches) if self.pool else map(score_batch, batches)
+        fresh = np.concatenate(list(results)) if batches else np.empty(0)
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO scores VALUES (?, ?, ?)",
+                ((k, MODEL_ID, float(s)) for k, s in zip(todo_keys, fresh)),
+            )
+        known.update(zip(todo_keys, fresh.tolist()))
+        return np.fromiter((known[k] for k in keys), dtype=np.float64, count=len(keys))
+
+
+# ---------------------------------------------------------------------------
+# Benchmark
+# ---------------------------------------------------------------------------
+
+def synthetic_texts(n: int, duplicate_rate: float, seed: int = 0) -> list[str]:
+    """Random reviews built from the corpus vocabulary (lexicon if no corpus)."""
+    rng = random.Random(seed)
+    if FEEDBACKS_CSV.exists():
+        texts = pd.read_csv(FEEDBACKS_CSV, usecols=["review_text"], dtype=str,
+                            keep_default_na=False)["review_text"]
+        vocab = [w for t in texts for w in t.split()]
+    else:
+        vocab = [w for k in LEXICON for w in k.split()] + ["və", "bu", "bir"] * 20
+    out: list[str] = []
+    for _ in range(n):
+        if out and rng.random() < duplicate_rate:
+            out.append(rng.choice(out))
+        else:
+            out.append(" ".join(rng.choices(vocab, k=rng.randint(5, 60))))
+    return out
+
+
+def benchmark(n: int, workers: int | None, batch_size: int, duplicate_rate: float) -> None:
+    print(f"Generating {n:,} synthetic reviews ({duplicate_rate:.0%} duplicates) …")
+    texts = synthetic_texts(n, duplicate_rate)
+    pool = f"{workers or 'all'} workers"
+    runs = [("1 process, cold cache", 1, True), (f"{pool}, cold cache", workers, True),
+            (f"{pool}, warm cache", workers, False)]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "cache.sqlite"
+        for label, w, cold in runs:
+            if cold:
+                path.unlink(missing_ok=True)
+            with open_cache(path) as conn, Scorer(conn, w, batch_size) as scorer:
+                t0 = time.perf_counter()
+                scorer.score(texts)
+                elapsed = time.perf_counter() - t0
+            conn.close()
+            print(f"  {label:<28} {elapsed:8.2f} s  {n / elapsed:>11,.0f} reviews/s  "
+                  f"({scorer.scored:,} texts scored, {scorer.cached:,} from cache)")
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Lexicon-based review sentiment")
+    parser.add_argument("--workers", type=int, help="Scoring processes (default: CPU count)")
+    parser.add_argument("--batch-size", type=int, default=10_000,
+                        help="Texts per worker batch (default: 10000)")
+    parser.add_argument("--chunk-size", type=int, default=100_000,
+                        help="Rows per CSV chunk (default: 100000)")
+    parser.add_argument("--text", help="Score one text and print the result")
+    parser.add_argument("--benchmark", type=int, metavar="N",
+                        help="Time scoring of N synthetic reviews instead")
+    parser.add_argument("--duplicates", type=float, default=0.1,
+                        help="Duplicate share in --benchmark data (default: 0.1)")
+    args = parser.parse_args()
+
+    if args.text:
+        print(f"{score_batch([args.text])[0]:+.3f}")
+        return
+    if args.benchmark:
+        benchmark(args.benchmark, args.workers, args.batch_size, args.duplicates)
+        return
+
+    reader = pd.read_csv(
+        FEEDBACKS_CSV,
+        usecols=["review_id", "company_slug", "company_name", "rating", "review_text"],
+        dtype={"review_text": str}, keep_default_na=False, chunksize=args.chunk_size,
+    )
+    frames = []
+    t0 = time.perf_counter()
+    with open_cache() as conn, Scorer(conn, args.workers, args.batch_size) as scorer:
+        for chunk in reader:
+            chunk["sentiment_score"] = scorer.score(chunk["review_text"].tolist()).round(4)
+            frames.append(chunk.drop(columns="review_text"))
+            print(f"  {scorer.reviews:>9} reviews  "
+                  f"({scorer.scored} texts scored, {scorer.cached} from cache)")
+    conn.close()
+
+    out = pd.concat(frames, ignore_index=True)
+    out.to_csv(OUTPUT_PATH, index=False)
+    print(f"\nDone in {time.perf_counter() - t0:.1f} s. Mean score {out['sentiment_score'].mean():+.3f} "
+          f"(1-star {out.loc[out['rating'] == 1, 'sentiment_score'].mean():+.3f}); "
+          f"saved to {OUTPUT_PATH}")
+
+
+if __name__ == "__main__":
+    main()
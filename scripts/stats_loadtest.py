@@ -0,0 +1,118 @@
+"""
+Load test for stats_service.py.
+
+Opens a number of keep-alive connections, replays a mix of company-detail,
+category and top-k queries against a running service and reports
+throughput plus p50 / p90 / p99 / max latency.
+
+Usage:
+    python scripts/stats_service.py &
+    python scripts/stats_loadtest.py
+    python scripts/stats_loadtest.py --concurrency 64 --requests 50000
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+
+
+async def fetch(reader, writer, host: str, target: str) -> tuple[int, bytes]:
+    writer.write(f"GET {target} HTTP/1.1\r\nHost: {host}\r\n\r\n".encode("latin-1"))
+    await writer.drain()
+    status_line = await reader.readline()
+    status = int(status_line.split()[1])
+    length = 0
+    while True:
+        header = await reader.readline()
+        if header in (b"\r\n", b""):
+            break
+        name, _, value = header.decode("latin-1").partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+    return status, await reader.readexactly(length)
+
+
+async def build_targets(host: str, port: int) -> list[str]:
+    """Discover slugs from the service itself and build a query mix."""
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        _, body = await fetch(reader, writer, host, "/top?by=reviews&k=1000&min_reviews=0")
+        company_slugs = [c["slug"] for c in json.loads(body)]
+        _, body = await fetch(reader, writer, host, "/categories")
+        category_slugs = [c["slug"] for c in json.loads(body)]
+    finally:
+        writer.close()
+
+    targets = [f"/companies/{s}" for s in company_slugs]
+    targets += [f"/categories/{s}" for s in category_slugs]
+    for by in ("reviews", "one_star_rate", "avg_rating"):
+        targets += [f"/top?by={by}&k={k}" for k in (5, 10, 15)]
+        targets += [f"/top?by={by}&k=3&category={s}" for s in category_slugs]
+    return targets
+
+
+async def worker(host, port, targets, n_requests, latencies, errors):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for _ in range(n_requests):
+            target = random.choice(targets)
+            start = time.perf_counter()
+            status, _ = await fetch(reader, writer, host, target)
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                errors.append((status, target))
+    finally:
+        writer.close()
+
+
+def percentile(sorted_values: list[float], p: float) -> float:
+    idx = min(len(sorted_values) - 1, max(0, round(p / 100 * len(sorted_values)) - 1))
+    return sorted_values[idx]
+
+
+async def run(args) -> None:
+    targets = await build_targets(args.host, args.port)
+    per_worker = max(1, args.requests // args.concurrency)
+    latencies: list[float] = []
+    errors: list[tuple[int, str]] = []
+
+    print(f"{args.concurrency} connections × {per_worker} requests "
+          f"over {len(targets)} distinct queries …")
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        worker(args.host, args.port, targets, per_worker, latencies, errors)
+        for _ in range(args.concurrency)
+    ))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    ms = lambda s: f"{s * 1000:.2f} ms"  # noqa: E731
+    print(f"\nrequests : {len(latencies)}  ({len(errors)} non-200)")
+    print(f"elapsed  : {elapsed:.2f} s  →  {len(latencies) / elapsed:,.0f} req/s")
+    print(f"mean     : {ms(statistics.fmean(latencies))}")
+    for p in (50, 90, 99):
+        print(f"p{p:<7} : {ms(percentile(latencies, p))}")
+    print(f"max      : {ms(latencies[-1])}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load-test the stats service")
+    parser.add_argument("--host", default="127.0.0.1", help="Service host (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765, help="Service port (default: 8765)")
+    parser.add_argument(
+        "--concurrency", type=int, default=32,
+        help="Concurrent keep-alive connections (default: 32)",
+    )
+    parser.add_argument(
+        "--requests", type=int, default=20000,
+        help="Total requests across all connections (default: 20000)",
+    )
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
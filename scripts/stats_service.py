@@ -0,0 +1,318 @@
+"""
+Local HTTP query service for per-company and per-category review stats.
+
+Loads companies.csv and feedbacks.csv once into indexes keyed by company
+slug and category slug, precomputes review count, star distribution, 1-star
+rate and average rating for every company and category, and answers JSON
+queries from those aggregates.  Encoded responses are kept in an LRU cache.
+The CSVs are polled for changes and the indexes rebuilt in the background,
+so a fresh scrape shows up without restarting the service.
+
+Endpoints:
+    GET /health
+    GET /companies/{slug}
+    GET /categories
+    GET /categories/{category_slug}
+    GET /top?by=reviews|one_star_rate|avg_rating&k=10&category=bank&min_reviews=3
+
+Usage:
+    python scripts/stats_service.py
+    python scripts/stats_service.py --port 8765 --cache-size 4096 --reload-interval 10
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import time
+from dataclasses import asdict, dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from urllib.parse import parse_qs, unquote, urlsplit
+
+ROOT = Path(__file__).parent.parent
+COMPANIES_CSV = ROOT / "data" / "companies.csv"
+FEEDBACKS_CSV = ROOT / "data" / "feedbacks.csv"
+
+RANK_METRICS = ("reviews", "one_star_rate", "avg_rating")
+MAX_REQUEST_LINE = 8 * 1024
+
+
+@dataclass(slots=True)
+class Stats:
+    """Review aggregates for one company or one category."""
+
+    slug: str
+    name: str
+    category_slug: str = ""
+    category_name: str = ""
+    rating_value: str = ""
+    listed_review_count: int = 0
+    stars: list[int] = field(default_factory=lambda: [0] * 5)
+
+    @property
+    def reviews(self) -> int:
+        return sum(self.stars)
+
+    @property
+    def one_star_rate(self) -> float:
+        return self.stars[0] / self.reviews if self.reviews else 0.0
+
+    @property
+    def avg_rating(self) -> float:
+        if not self.reviews:
+            return 0.0
+        return sum(i * n for i, n in enumerate(self.stars, 1)) / self.reviews
+
+    def to_json(self) -> dict:
+        out = asdict(self)
+        out.update(
+            reviews=self.reviews,
+            one_star_rate=round(self.one_star_rate, 4),
+            avg_rating=round(self.avg_rating, 3),
+        )
+        return out
+
+
+# ---------------------------------------------------------------------------
+# Indexes
+# ---------------------------------------------------------------------------
+
+class StatsIndex:
+    """Immutable snapshot of the CSVs; replaced wholesale on reload."""
+
+    def __init__(self, companies_csv: Path, feedbacks_csv: Path, cache_size: int):
+        self.loaded_at = time.time()
+        self.companies: dict[str, Stats] = {}
+        self.categories: dict[str, Stats] = {}
+        self.by_category: dict[str, list[Stats]] = {}
+        self.unmatched_reviews = 0       # unknown company or unreadable rating
+        self.skipped_companies = 0       # unreadable review_count
+
+        # A malformed cell skips its row rather than failing the whole build;
+        # the reviews of a skipped company then count as unmatched
+        with open(companies_csv, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                try:
+                    listed_review_count = int(row["review_count"] or 0)
+                except ValueError:
+                    self.skipped_companies += 1
+                    continue
+                company = Stats(
+                    slug=row["slug"],
+                    name=row["name"],
+                    category_slug=row["category_slug"],
+                    category_name=row["category_name"],
+                    rating_value=row["rating_value"],
+                    listed_review_count=listed_review_count,
+                )
+                self.companies[company.slug] = company
+                self.by_category.setdefault(company.category_slug, []).append(company)
+                self.categories.setdefault(
+                    company.category_slug,
+                    Stats(slug=company.category_slug, name=company.category_name),
+                )
+
+        with open(feedbacks_csv, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                company = self.companies.get(row["company_slug"].strip("/"))
+                try:
+                    rating = int(row["rating"] or 0)
+                except ValueError:
+                    rating = 0
+                if company is None or not 1 <= rating <= 5:
+                    self.unmatched_reviews += 1
+                    continue
+                company.stars[rating - 1] += 1
+                self.categories[company.category_slug].stars[rating - 1] += 1
+
+        # Precomputed rankings: (category or "*", metric) → companies best first
+        self._rankings: dict[tuple[str, str], list[Stats]] = {}
+        for scope, members in [("*", list(self.companies.values())),
+                               *self.by_category.items()]:
+            for metric in RANK_METRICS:
+                self._rankings[scope, metric] = sorted(
+                    members, key=lambda c: (getattr(c, metric), c.reviews), reverse=True,
+                )
+
+        self.respond = lru_cache(maxsize=cache_size)(self._respond)
+
+    # -- queries -----------------------------------------------------------
+
+    def top(self, by: str, k: int, category: str, min_reviews: int) -> list[dict]:
+        ranking = self._rankings.get((category or "*", by))
+        if ranking is None:
+            return []
+        out = []
+        for company in ranking:
+            if company.reviews >= min_reviews:
+                out.append(company.to_json())
+                if len(out) == k:
+                    break
+        return out
+
+    def _respond(self, target: str) -> tuple[int, bytes]:
+        """Return (status, JSON body) for a request target; memoized."""
+        url = urlsplit(target)
+        parts = [unquote(p) for p in url.path.strip("/").split("/") if p]
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+
+        if parts == ["health"]:
+            body = {"companies": len(self.companies), "loaded_at": self.loaded_at,
+                    "unmatched_reviews": self.unmatched_reviews,
+                    "skipped_companies": self.skipped_companies}
+        elif len(parts) == 2 and parts[0] == "companies":
+            company = self.companies.get(parts[1])
+            if company is None:
+                return 404, _encode({"error": f"unknown company {parts[1]!r}"})
+            body = company.to_json()
+        elif parts == ["categories"]:
+            body = [c.to_json() for c in self.categories.values()]
+        elif len(parts) == 2 and parts[0] == "categories":
+            category = self.categories.get(parts[1])
+            if category is None:
+                return 404, _encode({"error": f"unknown category {parts[1]!r}"})
+            body = category.to_json()
+            body["companies"] = [c.to_json() for c in self._rankings[parts[1], "reviews"]]
+        elif parts == ["top"]:
+            by = query.get("by", "reviews")
+            if by not in RANK_METRICS:
+                return 400, _encode({"error": f"'by' must be one of {RANK_METRICS}"})
+            try:
+                k = max(1, min(int(query.get("k", 10)), len(self.companies)))
+                min_reviews = int(query.get("min_reviews", 1))
+            except ValueError:
+                return 400, _encode({"error": "'k' and 'min_reviews' must be integers"})
+            category = query.get("category", "")
+            if category and category not in self.categories:
+                return 404, _encode({"error": f"unknown category {category!r}"})
+            body = self.top(by, k, category, min_reviews)
+        else:
+            return 404, _encode({"error": "not found"})
+        return 200, _encode(body)
+
+
+def _encode(body) -> bytes:
+    return json.dumps(body, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+# ---------------------------------------------------------------------------
+# HTTP server
+# ---------------------------------------------------------------------------
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed"}
+
+
+class StatsService:
+    def __init__(self, args):
+        self.args = args
+        self.index = self._build()
+        self._mtimes = self._current_mtimes()
+
+    def _build(self) -> StatsIndex:
+        return StatsIndex(self.args.companies, self.args.feedbacks, self.args.cache_size)
+
+    def _current_mtimes(self) -> tuple[float, float]:
+        return (self.args.companies.stat().st_mtime, self.args.feedbacks.stat().st_mtime)
+
+    async def watch(self) -> None:
+        """Rebuild the index off the event loop whenever a CSV changes."""
+        while True:
+            await asyncio.sleep(self.args.reload_interval)
+            try:
+                mtimes = self._current_mtimes()
+            except FileNotFoundError:
+                continue
+            if mtimes == self._mtimes:
+                continue
+            try:
+                index = await asyncio.to_thread(self._build)
+            except (OSError, ValueError, KeyError) as e:
+                # Probably caught a scraper mid-write; retry next poll
+                print(f"  [reload] failed: {e!r}")
+                continue
+            self.index, self._mtimes = index, mtimes
+            print(f"  [reload] {len(index.companies)} companies re-indexed")
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line or len(request_line) > MAX_REQUEST_LINE:
+                    break
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    method = target = version = None
+                # Persistent by default only in HTTP/1.1; 1.0 clients must ask
+                keep_alive = version == "HTTP/1.1"
+                while True:
+                    header = await reader.readline()
+                    if header in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = header.decode("latin-1").partition(":")
+                    if name.strip().lower() == "connection":
+                        token = value.strip().lower()
+                        if token == "close":
+                            keep_alive = False
+                        elif token == "keep-alive":
+                            keep_alive = version is not None
+
+                if version is None:
+                    status, body = 400, _encode({"error": "malformed request line"})
+                elif method != "GET":
+                    status, body = 405, _encode({"error": "only GET is supported"})
+                else:
+                    status, body = self.index.respond(target)
+
+                writer.write(
+                    f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+                    "Content-Type: application/json; charset=utf-8\r\n"
+                    f"Content-Length: {len(body)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+                    .encode("latin-1") + body
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self) -> None:
+        server = await asyncio.start_server(self.handle, self.args.host, self.args.port)
+        print(f"Serving {len(self.index.companies)} companies on "
+              f"http://{self.args.host}:{self.args.port}/")
+        async with server:
+            await asyncio.gather(server.serve_forever(), self.watch())
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve beledci.az company/category stats")
+    parser.add_argument("--host", default="127.0.0.1", help="Bind address (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765, help="Port (default: 8765)")
+    parser.add_argument(
+        "--cache-size", type=int, default=4096,
+        help="Max cached responses (default: 4096)",
+    )
+    parser.add_argument(
+        "--reload-interval", type=float, default=5.0,
+        help="Seconds between CSV change checks (default: 5)",
+    )
+    parser.add_argument("--companies", type=Path, default=COMPANIES_CSV, help=argparse.SUPPRESS)
+    parser.add_argument("--feedbacks", type=Path, default=FEEDBACKS_CSV, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(StatsService(args).serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,365 @@
+"""
+Compact review-text store with random access by review_id.
+
+Splits feedbacks.csv into two parts:
+
+  * data/feedbacks_meta.csv — every column except `review_text`, so analytics
+    that only need ids, companies and ratings read a fraction of the bytes;
+  * data/textstore/ — the review texts, compressed in small blocks with a
+    zstd dictionary trained on the corpus (small blocks compress poorly on
+    their own; the shared dictionary supplies the common vocabulary).
+
+Layout:
+    data/textstore/dictionary.zstd   trained zstd dictionary
+    data/textstore/blocks.zst        concatenated zstd frames, one per block
+                                     (texts of a block joined with NUL)
+    data/textstore/offsets.npy       int64 byte offset of each block, plus end
+    data/textstore/index.npy         int64 per review_id: block << 16 | slot,
+                                     -1 if absent (direct-address table)
+    data/textstore/manifest.json     block size, level, review count
+
+Reads memory-map blocks.zst and both .npy files, so a lookup is one array
+access plus decompressing a single block, independent of the store size.
+Re-runs append only reviews whose id is not indexed yet, reusing the
+existing dictionary; --rebuild retrains it and rewrites everything.
+
+Usage:
+    python scripts/textstore.py                   # add new reviews from feedbacks.csv
+    python scripts/textstore.py --rebuild --block-size 64 --level 19
+    python scripts/textstore.py --get 6949
+    python scripts/textstore.py --benchmark       # disk use and load time vs. the CSV
+"""
+
+import argparse
+import json
+import mmap
+import random
+import shutil
+import time
+from collections.abc import Iterable
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import zstandard as zstd
+
+ROOT = Path(__file__).parent.parent
+FEEDBACKS_CSV = ROOT / "data" / "feedbacks.csv"
+META_CSV = ROOT / "data" / "feedbacks_meta.csv"
+STORE_DIR = ROOT / "data" / "textstore"
+
+DICT_NAME = "dictionary.zstd"
+BLOCKS_NAME = "blocks.zst"
+OFFSETS_NAME = "offsets.npy"
+INDEX_NAME = "index.npy"
+MANIFEST_NAME = "manifest.json"
+
+SLOT_BITS = 16                 # block size is capped at 2**16 reviews
+TRAIN_SAMPLES = 100_000        # texts sampled from the first chunk for training
+SEPARATOR = b"\0"
+
+
+# ---------------------------------------------------------------------------
+# Read path
+# ---------------------------------------------------------------------------
+
+class TextStore:
+    """Memory-mapped, read-only view of the store.
+
+    Use as a context manager; the most recently decompressed block is kept,
+    so reading neighbouring review_ids costs one decompression.
+    """
+
+    def __init__(self, store_dir: Path = STORE_DIR):
+        self.index = np.load(store_dir / INDEX_NAME, mmap_mode="r")
+        self.offsets = np.load(store_dir / OFFSETS_NAME, mmap_mode="r")
+        self.manifest = json.loads((store_dir / MANIFEST_NAME).read_text(encoding="utf-8"))
+        self._file = open(store_dir / BLOCKS_NAME, "rb")
+        size = int(self.offsets[-1])
+        self._blocks = mmap.mmap(self._file.fileno(), size, access=mmap.ACCESS_READ) if size else b""
+        self._dctx = zstd.ZstdDecompressor(dict_data=load_dictionary(store_dir))
+        self._cached_block = -1
+        self._cached_texts: list[bytes] = []
+
+    def __enter__(self) -> "TextStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if isinstance(self._blocks, mmap.mmap):
+            self._blocks.close()
+        self._file.close()
+
+    def __len__(self) -> int:
+        return self.manifest["reviews"]
+
+    def __contains__(self, review_id: int) -> bool:
+        return 0 <= review_id < len(self.index) and self.index[review_id] >= 0
+
+    def block(self, block: int) -> list[bytes]:
+        """All UTF-8 texts of one block, in slot order.
+
+        Only the requested slot is decoded by get(); decoding the whole
+        block costs more than decompressing it.
+        """
+        if block != self._cached_block:
+            frame = self._blocks[self.offsets[block]:self.offsets[block + 1]]
+            self._cached_texts = self._dctx.decompress(frame).split(SEPARATOR)
+            self._cached_block = block
+        return self._cached_texts
+
+    def _text(self, loc: int) -> str:
+        return self.block(loc >> SLOT_BITS)[loc & ((1 << SLOT_BITS) - 1)].decode("utf-8")
+
+    def get(self, review_id: int) -> str | None:
+        if review_id not in self:
+            return None
+        return self._text(int(self.index[review_id]))
+
+    def get_many(self, review_ids: Iterable[int]) -> list[str | None]:
+        """Texts for many ids, decompressing each touched block once."""
+        review_ids = list(review_ids)
+        out: list[str | None] = [None] * len(review_ids)
+        located = [(int(self.index[rid]), i) for i, rid in enumerate(review_ids) if rid in self]
+        for loc, i in sorted(located):
+            out[i] = self._text(loc)
+        return out
+
+
+def load_dictionary(store_dir: Path = STORE_DIR) -> zstd.ZstdCompressionDict | None:
+    """The trained dictionary, or None if the corpus was too small to train one."""
+    data = (store_dir / DICT_NAME).read_bytes()
+    return zstd.ZstdCompressionDict(data) if data else None
+
+
+def read_meta(**kwargs) -> pd.DataFrame:
+    """feedbacks.csv without review_text; kwargs go to pd.read_csv."""
+    return pd.read_csv(META_CSV, **kwargs)
+
+
+# ---------------------------------------------------------------------------
+# Write path
+# ---------------------------------------------------------------------------
+
+def train_dictionary(texts: list[str], dict_size: int) -> bytes:
+    samples = [t.encode("utf-8") for t in texts[:TRAIN_SAMPLES] if t]
+    try:
+        return zstd.train_dictionary(dict_size, samples).as_bytes()
+    except zstd.ZstdError as e:
+        print(f"  [WARN] dictionary training failed ({e}); compressing without one")
+        return b""
+
+
+class StoreWriter:
+    """Appends blocks of reviews to a store; commit() publishes them.
+
+    Blocks are appended to blocks.zst first; offsets.npy and index.npy are
+    replaced atomically afterwards, so a crash leaves at most unreferenced
+    bytes at the end of blocks.zst, which the next writer truncates.
+    """
+
+    def __init__(self, store_dir: Path, block_size: int, level: int):
+        if not 0 < block_size <= 1 << SLOT_BITS:
+            raise ValueError(f"block size must be in 1..{1 << SLOT_BITS}")
+        self.store_dir = store_dir
+        self.block_size = block_size
+        self.level = level
+        if (store_dir / INDEX_NAME).exists():
+            self.index = np.load(store_dir / INDEX_NAME)
+            self.offsets = np.load(store_dir / OFFSETS_NAME).tolist()
+            self.reviews = json.loads((store_dir / MANIFEST_NAME).read_text(encoding="utf-8"))["reviews"]
+        else:
+            self.index = np.full(0, -1, dtype=np.int64)
+            self.offsets = [0]
+            self.reviews = 0
+        self._cctx = zstd.ZstdCompressor(
+            level=level, dict_data=load_dictionary(store_dir), write_dict_id=False,
+        )
+        self._blocks = open(store_dir / BLOCKS_NAME, "ab")
+        self._blocks.truncate(self.offsets[-1])
+        self._pending_ids: list[int] = []
+        self._pending_texts: list[bytes] = []
+
+    def is_new(self, review_ids: np.ndarray) -> np.ndarray:
+        """Mask of ids not stored yet (a batch may repeat an id; first wins)."""
+        known = np.zeros(len(review_ids), dtype=bool)
+        in_range = review_ids < len(self.index)
+        known[in_range] = self.index[review_ids[in_range]] >= 0
+        first = np.zeros(len(review_ids), dtype=bool)
+        first[np.unique(review_ids, return_index=True)[1]] = True
+        pending = np.isin(review_ids, self._pending_ids)
+        return ~known & first & ~pending
+
+    def add(self, review_ids: np.ndarray, texts: list[str]) -> None:
+        """Queue reviews that is_new() accepted; full blocks are written out."""
+        self._pending_ids.extend(int(r) for r in review_ids)
+        self._pending_texts.extend(t.replace("\0", "").encode("utf-8") for t in texts)
+        while len(self._pending_ids) >= self.block_size:
+            self._write_block(self.block_size)
+
+    def _write_block(self, n: int) -> None:
+        ids, texts = self._pending_ids[:n], self._pending_texts[:n]
+        del self._pending_ids[:n], self._pending_texts[:n]
+        frame = self._cctx.compress(SEPARATOR.join(texts))
+        self._blocks.write(frame)
+        block = len(self.offsets) - 1
+        self.offsets.append(self.offsets[-1] + len(frame))
+
+        ids = np.asarray(ids, dtype=np.int64)
+        if ids.max() >= len(self.index):
+            grown = np.full(max(int(ids.max()) + 1, 2 * len(self.index)), -1, dtype=np.int64)
+            grown[:len(self.index)] = self.index
+            self.index = grown
+        self.index[ids] = (block << SLOT_BITS) | np.arange(len(ids), dtype=np.int64)
+        self.reviews += len(ids)
+
+    def commit(self) -> None:
+        if self._pending_ids:
+            self._write_block(len(self._pending_ids))
+        self._blocks.flush()
+        self._blocks.close()
+        for name, array in ((OFFSETS_NAME, np.asarray(self.offsets, dtype=np.int64)),
+                            (INDEX_NAME, self.index)):
+            tmp = self.store_dir / f"{name}.tmp"
+            with open(tmp, "wb") as f:
+                np.save(f, array)
+            tmp.replace(self.store_dir / name)
+        manifest = {"block_size": self.block_size, "level": self.level,
+                    "reviews": self.reviews, "blocks": len(self.offsets) - 1}
+        (self.store_dir / MANIFEST_NAME).write_text(json.dumps(manifest), encoding="utf-8")
+
+
+def build(
+    csv_path: Path = FEEDBACKS_CSV, store_dir: Path = STORE_DIR, *,
+    meta_csv: Path = META_CSV, rebuild: bool = False, block_size: int = 32,
+    level: int = 15, dict_size: int = 32 * 1024, chunk_size: int = 100_000,
+) -> int:
+    """Store the texts of reviews not indexed yet; return how many were added.
+
+    The meta rows of the new reviews go to a copy of meta_csv that replaces
+    it only after the store is committed, so a crash part-way leaves both
+    unchanged and the rerun adds the same reviews once.
+    """
+    if rebuild and store_dir.exists():
+        shutil.rmtree(store_dir)
+        meta_csv.unlink(missing_ok=True)
+    store_dir.mkdir(parents=True, exist_ok=True)
+    meta_tmp = meta_csv.with_name(meta_csv.name + ".tmp")
+    meta_tmp.unlink(missing_ok=True)
+
+    reader = pd.read_csv(csv_path, dtype=str, keep_default_na=False, chunksize=chunk_size)
+    writer = None
+    added = 0
+    for chunk in reader:
+        chunk = chunk[chunk["review_id"].str.isdigit()]
+        if writer is None:
+            if not (store_dir / DICT_NAME).exists():
+                (store_dir / DICT_NAME).write_bytes(
+                    train_dictionary(chunk["review_text"].tolist(), dict_size)
+                )
+            writer = StoreWriter(store_dir, block_size, level)
+
+        review_ids = chunk["review_id"].astype(np.int64).to_numpy()
+        new = writer.is_new(review_ids)
+        if not new.any():
+            continue
+        chunk = chunk[new]
+        writer.add(review_ids[new], chunk["review_text"].tolist())
+        if not meta_tmp.exists() and meta_csv.exists():
+            shutil.copyfile(meta_csv, meta_tmp)
+        write_header = not meta_tmp.exists()
+        chunk.drop(columns="review_text").to_csv(meta_tmp, mode="a", header=write_header, index=False)
+        added += int(new.sum())
+        print(f"  {added:>9} reviews stored in {len(writer.offsets) - 1} blocks")
+
+    if writer is not None:
+        writer.commit()
+    if meta_tmp.exists():
+        meta_tmp.replace(meta_csv)
+    return added
+
+
+# ---------------------------------------------------------------------------
+# Benchmark
+# ---------------------------------------------------------------------------
+
+def benchmark(store_dir: Path = STORE_DIR, lookups: int = 10_000) -> None:
+    """Compare disk use and load time of the CSV with meta CSV + text store."""
+    store_bytes = sum(p.stat().st_size for p in store_dir.iterdir())
+    csv_bytes = FEEDBACKS_CSV.stat().st_size
+    meta_bytes = META_CSV.stat().st_size
+    texts = pd.read_csv(FEEDBACKS_CSV, usecols=["review_text"], dtype=str,
+                        keep_default_na=False)["review_text"]
+    text_bytes = int(texts.str.encode("utf-8").str.len().sum())
+
+    t0 = time.perf_counter()
+    pd.read_csv(FEEDBACKS_CSV)
+    t_csv = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    meta = read_meta()
+    store = TextStore(store_dir)
+    t_split = time.perf_counter() - t0
+
+    ids = random.Random(0).choices(meta["review_id"].tolist(), k=lookups)
+    t0 = time.perf_counter()
+    for rid in ids:
+        store.get(rid)
+    t_get = time.perf_counter() - t0
+    store.close()
+
+    kib = 1024
+    print(f"review_text       {text_bytes / kib:10.1f} KiB (UTF-8)")
+    print(f"text store        {store_bytes / kib:10.1f} KiB  "
+          f"({len(store)} reviews, {store.manifest['blocks']} blocks)")
+    print(f"feedbacks.csv     {csv_bytes / kib:10.1f} KiB")
+    print(f"meta + store      {(meta_bytes + store_bytes) / kib:10.1f} KiB  "
+          f"({csv_bytes / (meta_bytes + store_bytes):.1f}× smaller)")
+    print(f"\nload feedbacks.csv       {t_csv * 1000:8.1f} ms")
+    print(f"load meta + open store   {t_split * 1000:8.1f} ms  "
+          f"({t_csv / t_split:.1f}× faster)")
+    print(f"random get()             {t_get / lookups * 1e6:8.1f} µs per review "
+          f"({lookups} lookups)")
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compressed review-text store")
+    parser.add_argument("--rebuild", action="store_true",
+                        help="Retrain the dictionary and rewrite the store")
+    parser.add_argument("--block-size", type=int, default=32,
+                        help="Reviews per compressed block (default: 32)")
+    parser.add_argument("--level", type=int, default=15,
+                        help="zstd compression level (default: 15)")
+    parser.add_argument("--dict-size", type=int, default=32 * 1024,
+                        help="Dictionary size in bytes, used when training (default: 32768)")
+    parser.add_argument("--chunk-size", type=int, default=100_000,
+                        help="Rows per CSV chunk (default: 100000)")
+    parser.add_argument("--get", type=int, nargs="+", metavar="REVIEW_ID",
+                        help="Print the text of these reviews and exit")
+    parser.add_argument("--benchmark", action="store_true",
+                        help="Compare disk use and load time with feedbacks.csv")
+    args = parser.parse_args()
+
+    if args.get:
+        with TextStore() as store:
+            for rid, text in zip(args.get, store.get_many(args.get)):
+                print(f"#{rid}: {text if text is not None else '(not stored)'}")
+        return
+
+    if args.benchmark:
+        benchmark()
+        return
+
+    added = build(rebuild=args.rebuild, block_size=args.block_size, level=args.level,
+                  dict_size=args.dict_size, chunk_size=args.chunk_size)
+    print(f"\nDone. {added} new reviews stored in {STORE_DIR}; "
+          f"columns without text in {META_CSV}")
+
+
+if __name__ == "__main__":
+    main()
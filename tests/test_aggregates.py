@@ -0,0 +1,42 @@
+import aggregates
+
+
+def row(review_id: int, page: int) -> dict:
+    return {"review_id": str(review_id), "company_slug": "/acme",
+            "company_name": "Acme", "rating": "5", "has_images": "False",
+            "page": str(page)}
+
+
+def test_page_volumes_come_from_latest_full_crawl(tmp_path):
+    with aggregates.open_store(tmp_path / "aggregates.sqlite") as conn:
+        aggregates.add_reviews(conn, [row(1, 1), row(2, 1), row(3, 2)], count_pages=True)
+        # An incremental scrape lands on page 1 and must not inflate it
+        aggregates.add_reviews(conn, [row(4, 1), row(5, 1)])
+        assert aggregates.load_frames(conn)[1].values.tolist() == [[1, 2], [2, 1]]
+
+        # A new full crawl (seen rows included) replaces the page volumes
+        crawl = [row(5, 1), row(4, 1), row(3, 2), row(2, 2), row(1, 3)]
+        aggregates.add_reviews(conn, crawl, count_pages=True)
+        assert aggregates.load_frames(conn)[1].values.tolist() == [[1, 2], [2, 2], [3, 1]]
+        assert aggregates.load_frames(conn)[0]["n"].sum() == 5
+
+
+def test_old_page_table_is_replaced(tmp_path):
+    path = tmp_path / "aggregates.sqlite"
+    with aggregates.open_store(path) as conn:
+        conn.execute("DROP TABLE page_agg")
+        conn.execute("CREATE TABLE page_agg (page INTEGER PRIMARY KEY, n INTEGER)")
+    with aggregates.open_store(path) as conn:
+        aggregates.add_reviews(conn, [row(1, 1)], count_pages=True)
+        assert aggregates.load_frames(conn)[1].values.tolist() == [[1, 1]]
+
+
+def test_csv_ingest_counts_pages_only_when_asked(tmp_path):
+    path = tmp_path / "feedbacks.csv"
+    path.write_text("review_id,company_slug,company_name,rating,has_images,page\n"
+                    "1,/acme,Acme,5,False,1\n2,/acme,Acme,4,True,2\n", encoding="utf-8")
+    with aggregates.open_store(tmp_path / "aggregates.sqlite") as conn:
+        assert aggregates.ingest_csv(conn, path) == 2
+        assert aggregates.load_frames(conn)[1].empty
+        aggregates.ingest_csv(conn, path, count_pages=True)
+        assert aggregates.load_frames(conn)[1].values.tolist() == [[1, 1], [2, 1]]
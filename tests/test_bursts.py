@@ -0,0 +1,37 @@
+import bursts
+
+
+def review(rid: int, slug: str = "acme", rating: int = 5) -> dict:
+    return {"review_id": str(rid), "company_slug": f"/{slug}",
+            "company_name": slug, "rating": str(rating)}
+
+
+def test_late_reviews_are_scored_once(tmp_path):
+    detector = bursts.BurstDetector()
+    detector.update_many([review(rid) for rid in (10, 12, 14)])
+    assert detector.position == 3
+
+    # Gap refill: 11 and 13 arrive after 14, 12 again as a duplicate
+    detector.update_many([review(13), review(12), review(11)])
+    assert detector.position == 5
+    assert detector.last_review_id == 14
+    assert detector.companies["acme"].reviews == 5
+
+    path = tmp_path / "state.json"
+    detector.save(path)
+    restored = bursts.BurstDetector.load(path)
+    restored.update_many([review(rid) for rid in range(10, 16)])
+    assert restored.position == 6                    # only 15 is new
+
+
+def test_reviews_behind_the_window_are_counted(tmp_path):
+    detector = bursts.BurstDetector()
+    newest = bursts.LATE_WINDOW + 100
+    detector.update(review(newest))
+    detector.update_many([review(50), review(newest - 10)])
+    assert detector.position == 2
+    assert detector.skipped_late == 1
+
+    path = tmp_path / "state.json"
+    detector.save(path)
+    assert bursts.BurstDetector.load(path).recent_ids == {newest, newest - 10}
@@ -0,0 +1,85 @@
+import requests
+
+import companies
+import history
+
+
+def listed(*slugs):
+    return lambda session, delay: (
+        companies.Company(slug=s, name=s, company_url="", category_slug="bank",
+                          category_name="Banklar", review_count=10)
+        for s in slugs
+    )
+
+
+def test_failed_profile_keeps_previous_rating(monkeypatch, tmp_path):
+    def fetch(session, slug):
+        if slug == "kapital":
+            raise requests.ConnectionError("reset")
+        return {"rating_value": "3.1", "category_label": "Bank"}
+
+    monkeypatch.setattr(companies, "iter_listed_companies", listed("abb", "kapital", "new"))
+    monkeypatch.setattr(companies, "fetch_company_profile", fetch)
+    previous = {"kapital": {"rating_value": "2.4", "category_label": "Bank"}}
+    with history.open_store(tmp_path / "history.sqlite") as conn:
+        history.record(conn, [{"slug": "kapital", "rating_value": "2.4",
+                               "category_label": "Bank", "review_count": "10"}])
+
+        scraped = list(companies.iter_companies(0, session=object(), previous=previous))
+        assert [c.rating_value for c in scraped] == ["3.1", "2.4", "3.1"]
+
+        history.record(conn, scraped)
+        ratings = [r["rating_value"] for r in history.series(conn, "kapital")]
+        assert ratings == ["2.4", "2.4"]
+
+
+def test_skipped_profile_keeps_previous_rating(monkeypatch, tmp_path):
+    path = tmp_path / "companies.csv"
+    old = companies.Company(slug="abb", name="ABB", company_url="", category_slug="bank",
+                            category_name="Banklar", category_label="Bank", rating_value="4.0")
+    companies.write_csv([old], path)
+    monkeypatch.setattr(companies, "iter_listed_companies", listed("abb", "new"))
+
+    scraped = list(companies.iter_companies(
+        0, profile=False, session=object(), previous=companies.read_csv(path),
+    ))
+    assert [(c.rating_value, c.category_label) for c in scraped] == [("4.0", "Bank"), ("", "")]
+
+
+CARD = (
+    '<a class="company-card" href="/{slug}"><img class="company-avatar" src="/{slug}.png">'
+    '<strong>{slug}</strong><div class="category-page--item-rating">'
+    '<img src="/star_filled.svg"><img src="/star_filled.svg"><img src="/star.svg"></div>'
+    '<p class="rating-description">Reytinq: <b>Orta</b></p><p class="rate">(54)</p></a>'
+)
+
+
+class CategorySession:
+    def __init__(self, cards: dict[str, list[str]]):
+        self.cards = cards
+
+    def get(self, url, headers=None, timeout=None):
+        cat = url.rsplit("/", 1)[1]
+        if cat not in self.cards:
+            raise requests.ConnectionError("reset")
+        resp = requests.Response()
+        resp.status_code = 200
+        resp._content = "".join(CARD.format(slug=s) for s in self.cards[cat]).encode()
+        resp.encoding = "utf-8"
+        return resp
+
+
+def test_listed_companies_parse_cards_and_dedupe(monkeypatch):
+    monkeypatch.setattr(companies, "CATEGORIES",
+                        [("bank", "Banklar"), ("shop", "Mağazalar"), ("taxi", "Taksi")])
+    session = CategorySession({"bank": ["abb", "kapital"], "taxi": ["bolt", "abb"]})
+
+    listed = list(companies.iter_listed_companies(session, 0))
+    assert [(c.slug, c.category_slug) for c in listed] == [
+        ("abb", "bank"), ("kapital", "bank"), ("bolt", "taxi"),
+    ]
+    abb = listed[0]
+    assert (abb.name, abb.rating_stars, abb.rating_label, abb.review_count) == \
+        ("abb", 2, "Orta", 54)
+    assert abb.company_url == f"{companies.BASE_URL}/abb"
+    assert not hasattr(abb, "__dict__")
@@ -0,0 +1,146 @@
+import csv
+
+import pytest
+
+import companies as companies_scraper
+import crawlqueue
+import history
+
+
+@pytest.fixture
+def queue(tmp_path):
+    conn = crawlqueue.open_queue(tmp_path / "queue.sqlite")
+    yield conn
+    conn.close()
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(crawlqueue.time, "time", lambda: now[0])
+    return now
+
+
+def states(conn) -> dict[str, str]:
+    return dict(conn.execute("SELECT key, state FROM jobs"))
+
+
+def test_expired_lease_is_requeued(queue, clock):
+    crawlqueue.enqueue(queue, "feed_page", [1])
+    job = crawlqueue.claim(queue, "a", lease=60, max_attempts=3)
+    assert crawlqueue.claim(queue, "b", lease=60, max_attempts=3) is None
+
+    clock[0] += 61                        # worker "a" died without a heartbeat
+    retry = crawlqueue.claim(queue, "b", lease=60, max_attempts=3)
+    assert (retry.job_id, retry.attempts) == (job.job_id, 2)
+    assert not crawlqueue.heartbeat(queue, job, "a", lease=60)
+    assert crawlqueue.heartbeat(queue, retry, "b", lease=60)
+
+    # The stale owner's completion is ignored; the new owner's counts
+    crawlqueue.complete(queue, job, "a", [], [])
+    assert states(queue) == {"1": "leased"}
+    crawlqueue.complete(queue, retry, "b", [], [])
+    assert states(queue) == {"1": "done"}
+
+
+def test_expired_lease_out_of_attempts_is_parked(queue, clock):
+    crawlqueue.enqueue(queue, "feed_page", [1])
+    crawlqueue.claim(queue, "a", lease=60, max_attempts=1)
+    clock[0] += 61
+    assert crawlqueue.claim(queue, "b", lease=60, max_attempts=1) is None
+    assert states(queue) == {"1": "failed"}
+
+
+def test_failed_job_goes_back_to_pending_until_max_attempts(queue):
+    crawlqueue.enqueue(queue, "feed_page", [1])
+    job = crawlqueue.claim(queue, "a", lease=60, max_attempts=2)
+    crawlqueue.fail(queue, job, "a", "timeout", max_attempts=2)
+    assert states(queue) == {"1": "pending"}
+    job = crawlqueue.claim(queue, "a", lease=60, max_attempts=2)
+    crawlqueue.fail(queue, job, "a", "timeout", max_attempts=2)
+    assert states(queue) == {"1": "failed"}
+
+
+def drain(conn, follow_up=()):
+    while job := crawlqueue.claim(conn, "w", lease=60, max_attempts=1):
+        extra = [("profile", slug, {}) for slug in follow_up] if job.kind == "category" else []
+        crawlqueue.complete(conn, job, "w", [], extra)
+
+
+def test_reseed_rearms_finished_jobs(queue):
+    assert crawlqueue.enqueue(queue, "feed_page", [1, 2]) == 2
+    job = crawlqueue.claim(queue, "w", lease=60, max_attempts=1)
+    crawlqueue.fail(queue, job, "w", "boom", max_attempts=1)
+    drain(queue)
+    assert states(queue) == {"1": "failed", "2": "done"}
+
+    assert crawlqueue.enqueue(queue, "feed_page", [1, 2, 3]) == 3
+    assert states(queue) == {"1": "pending", "2": "pending", "3": "pending"}
+    assert queue.execute("SELECT MAX(attempts) FROM jobs").fetchone()[0] == 0
+
+    # Seeding again while the jobs are still queued changes nothing
+    assert crawlqueue.enqueue(queue, "feed_page", [1, 2, 3]) == 0
+
+
+def test_reseed_rearms_follow_up_jobs_once_per_epoch(queue):
+    crawlqueue.enqueue(queue, "category", ["a", "b"])
+    drain(queue, follow_up=["acme"])
+    assert queue.execute(
+        "SELECT COUNT(*) FROM jobs WHERE kind = 'profile'"
+    ).fetchone()[0] == 1
+    ran = queue.execute("SELECT attempts FROM jobs WHERE key = 'acme'").fetchone()[0]
+    assert ran == 1                       # listed by both categories, fetched once
+
+    crawlqueue.enqueue(queue, "category", ["a", "b"])
+    drain(queue, follow_up=["acme"])
+    assert states(queue)["acme"] == "done"
+    assert queue.execute("SELECT epoch FROM jobs WHERE key = 'acme'").fetchone()[0] == 2
+
+
+def test_one_seeding_is_one_epoch(queue):
+    epoch = crawlqueue.new_epoch(queue)
+    for slug in ("a", "b", "c"):
+        crawlqueue.enqueue(queue, "category", [slug], epoch=epoch)
+    crawlqueue.enqueue(queue, "feed_page", [1, 2], epoch=epoch)
+    assert queue.execute("SELECT DISTINCT epoch FROM jobs").fetchall() == [(1,)]
+    assert crawlqueue.new_epoch(queue) == 2
+
+
+def test_retry_failed_clears_the_error(queue):
+    crawlqueue.enqueue(queue, "feed_page", [1])
+    job = crawlqueue.claim(queue, "w", lease=60, max_attempts=1)
+    crawlqueue.fail(queue, job, "w", "HTTP 503", max_attempts=1)
+
+    assert crawlqueue.retry_failed(queue) == 1
+    assert queue.execute("SELECT state, attempts, error FROM jobs").fetchone() == (
+        "pending", 0, None)
+
+
+def test_export_companies_does_not_blank_failed_profiles(queue, tmp_path, monkeypatch):
+    store = tmp_path / "history.sqlite"
+    open_store = history.open_store
+    monkeypatch.setattr(history, "open_store", lambda: open_store(store))
+
+    def card(slug):
+        return {"slug": slug, "name": slug.title(), "company_url": "",
+                "category_slug": "c", "category_name": "C"}
+
+    path = tmp_path / "companies.csv"
+    old = companies_scraper.Company(**card("known"), rating_value="2.5", category_label="Orta")
+    companies_scraper.write_csv([old], path)
+
+    crawlqueue.enqueue(queue, "category", ["c"])
+    job = crawlqueue.claim(queue, "w", lease=60, max_attempts=1)
+    records = [("company", s, card(s)) for s in ("fresh", "known", "lost")]
+    follow_up = [("profile", s, {}) for s in ("fresh", "known", "lost")]
+    crawlqueue.complete(queue, job, "w", records, follow_up)
+    job = crawlqueue.claim(queue, "w", lease=60, max_attempts=1)
+    crawlqueue.complete(queue, job, "w", [("profile", "fresh", {
+        "rating_value": "4.0", "category_label": "Yaxşı"})], [])
+    while job := crawlqueue.claim(queue, "w", lease=60, max_attempts=1):
+        crawlqueue.fail(queue, job, "w", "timeout", max_attempts=1)
+
+    assert crawlqueue.export_companies(queue, path) == 2
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = {r["slug"]: r["rating_value"] for r in csv.DictReader(f)}
+    assert rows == {"fresh": "4.0", "known": "2.5"}
@@ -0,0 +1,99 @@
+from argparse import Namespace
+
+import pytest
+
+import aggregates
+import bursts
+import daemon
+import feedback
+
+PAGE_SIZE = 3
+
+
+def review(review_id: int) -> feedback.Review:
+    return feedback.Review(
+        review_id=str(review_id), reviewer_name="r", company_name="Acme",
+        company_slug="/acme", company_url="", rating=1, review_text="",
+        review_url="", has_images=False, page=None,
+    )
+
+
+@pytest.fixture
+def feed(monkeypatch):
+    """A newest-first fake feed; append to ``feed.ids`` to publish reviews."""
+    ids: list[int] = []
+
+    def iter_page(session, page):
+        chunk = ids[(page - 1) * PAGE_SIZE:page * PAGE_SIZE]
+        return iter([review(i) for i in chunk])
+
+    monkeypatch.setattr(feedback, "iter_page", iter_page)
+    return ids
+
+
+@pytest.fixture
+def store(tmp_path):
+    with aggregates.open_store(tmp_path / "aggregates.sqlite") as conn:
+        yield conn
+
+
+def cycle(store, max_pages: int) -> list[str]:
+    """One crawl plus the writes feed_cycle does after a successful append."""
+    new, state = daemon.crawl_feed_delta(store, 0, max_pages)
+    aggregates.set_state(store, daemon.FEED_STATE, state)
+    aggregates.add_reviews(store, new, source="test")
+    return [r.review_id for r in new]
+
+
+def seen(store) -> set[int]:
+    return {int(r) for r, in store.execute("SELECT review_id FROM seen_reviews")}
+
+
+def test_delta_stops_at_frontier(feed, store):
+    aggregates.add_reviews(store, [review(i) for i in range(1, 7)])
+    feed[:] = range(8, 0, -1)
+    assert cycle(store, max_pages=10) == ["8", "7"]
+    assert aggregates.get_state(store, daemon.FEED_STATE) == {"frontier": 8}
+
+
+def test_capped_cycle_resumes_past_seen_pages(feed, store):
+    aggregates.add_reviews(store, [review(i) for i in range(1, 7)])
+    feed[:] = range(12, 0, -1)
+    assert cycle(store, max_pages=1) == ["12", "11", "10"]
+    assert aggregates.get_state(store, daemon.FEED_STATE) == {
+        "frontier": 6, "top": 12, "resume_page": 2,
+    }
+
+    # A new review arrives; page 1 is otherwise seen, so the crawl jumps on
+    feed.insert(0, 13)
+    assert cycle(store, max_pages=2) == ["13", "9", "8"]
+
+    # Fully-seen pages no longer end the crawl before the frontier
+    assert cycle(store, max_pages=10) == ["7"]
+    assert seen(store) == set(range(1, 14))
+    assert aggregates.get_state(store, daemon.FEED_STATE) == {"frontier": 13}
+
+
+def test_failed_append_leaves_reviews_unseen(feed, store, monkeypatch, tmp_path):
+    monkeypatch.setattr(aggregates, "open_store", lambda: store)
+    monkeypatch.setattr(feedback, "OUTPUT_PATH", tmp_path / "feedbacks.csv")
+    monkeypatch.setattr(daemon, "rerender", lambda *a: None)
+    monkeypatch.setattr(bursts.BurstDetector, "save", lambda self: None)
+    monkeypatch.setattr(bursts, "append_alerts", lambda alerts: None)
+    monkeypatch.setattr(bursts.BurstDetector, "load", classmethod(lambda cls: cls()))
+    args = Namespace(delay=0, max_pages=5, dashboard=False)
+    feed[:] = [3, 2, 1]
+
+    def broken(reviews):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(feedback, "append_csv", broken)
+    with pytest.raises(OSError):
+        daemon.feed_cycle(args)
+    assert seen(store) == set()
+
+    written = []
+    monkeypatch.setattr(feedback, "append_csv", written.extend)
+    daemon.feed_cycle(args)
+    assert [r.review_id for r in written] == ["3", "2", "1"]
+    assert seen(store) == {1, 2, 3}
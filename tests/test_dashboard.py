@@ -0,0 +1,24 @@
+import dashboard
+
+
+def test_removed_panel_rebuilds_html(tmp_path, monkeypatch):
+    monkeypatch.setattr(dashboard, "DATA_DIR", tmp_path / "data")
+    monkeypatch.setattr(dashboard, "HTML_PATH", tmp_path / "index.html")
+    monkeypatch.setattr(dashboard.gc, "load_data", lambda: None)
+    specs = {"a": {"kind": "hbar", "title": "A"}, "b": {"kind": "hbar", "title": "B"}}
+
+    def chart_01_a(): ...
+    def chart_02_b(): ...
+    monkeypatch.setattr(dashboard, "PANELS", {
+        chart_01_a: lambda: specs["a"], chart_02_b: lambda: specs["b"],
+    })
+
+    assert dashboard.build() == ["01_a", "02_b"]
+    assert '"02_b"' in (tmp_path / "index.html").read_text(encoding="utf-8")
+    assert dashboard.build() == []
+
+    specs["b"] = None
+    assert dashboard.build() == ["02_b"]
+    assert not (tmp_path / "data" / "02_b.json").exists()
+    assert '"02_b"' not in (tmp_path / "index.html").read_text(encoding="utf-8")
+    assert dashboard.build() == []
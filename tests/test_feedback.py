@@ -0,0 +1,147 @@
+import csv
+
+import pytest
+import requests
+
+import aggregates
+import feedback
+
+
+def test_append_migrates_old_header(tmp_path):
+    path = tmp_path / "feedbacks.csv"
+    old_fields = feedback.CSV_FIELDS[:feedback.CSV_FIELDS.index("page") + 1]
+    path.write_text(",".join(old_fields) + "\n1,r,Acme,/acme,,1,,,False,1\n",
+                    encoding="utf-8")
+    new = feedback.Review(
+        review_id="2", reviewer_name="r", company_name="Acme", company_slug="/acme",
+        company_url="", rating=1, review_text="", review_url="", has_images=True,
+        page=1, attachment_count=1, attachment_urls="https://x/a.jpg",
+    )
+
+    feedback.append_csv([new], path)
+
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    assert list(rows[0]) == feedback.CSV_FIELDS
+    assert [r["attachment_urls"] for r in rows] == ["", "https://x/a.jpg"]
+
+
+def review_html(rid: int, body: str = "") -> str:
+    return (
+        f'<div class="review"><div class="review-author-info"><strong>R{rid}</strong>'
+        f'<span class="review-author-subline"><a href="/acme">Acme</a></span></div>'
+        f'<div class="review-rating"><img src="/star_filled.svg"></div>'
+        f'<p class="review-text" id="r-{rid}">Text {rid} &amp; more</p>{body}</div>'
+    )
+
+
+PAGE = "<html><body><div class=feed>{}</div><div class=pagination></div></body></html>"
+ATTACHMENTS = '<ul class="attachments"><li><a href="/a.jpg">x</a>'
+
+
+class PageResponse:
+    encoding = "utf-8"
+
+    def __init__(self, html: str):
+        self.text = html
+        self.body = html.encode("utf-8")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, chunk_size):
+        for i in range(0, len(self.body), 7):
+            yield self.body[i:i + 7]
+
+
+class PageSession:
+    def __init__(self, html: str):
+        self.html = html
+
+    def get(self, url, headers=None, timeout=None, stream=False):
+        return PageResponse(self.html)
+
+
+@pytest.mark.parametrize("first", [
+    review_html(1),
+    review_html(1, ATTACHMENTS + "</ul>"),                # unclosed <li>
+    review_html(1, "<p>unclosed paragraph <ul><li>a<li>b</ul>"),
+    review_html(1).replace("<p ", "</span><br><p "),      # stray end tag
+])
+def test_stream_parser_matches_full_parse(first):
+    session = PageSession(PAGE.format(first + review_html(2) + review_html(3, ATTACHMENTS)))
+
+    full = list(feedback.iter_page(session, 4))
+    streamed = list(feedback.iter_page_stream(session, 4))
+
+    assert [r.review_id for r in full] == ["1", "2", "3"]
+    assert streamed == full
+
+
+def test_stream_parser_flushes_unclosed_block(capsys):
+    parser = feedback.ReviewStreamParser(1)
+    parser.feed(review_html(1) + review_html(2)[:-len("</div>")])
+    parser.close()
+    assert [r.review_id for r in parser.drain()] == ["1", "2"]
+    assert "not closed" in capsys.readouterr().out
+
+
+class FeedSession:
+    def __init__(self, pages: dict[int, str]):
+        self.pages = pages
+        self.requested = []
+
+    def get(self, url, headers=None, timeout=None, stream=False):
+        page = int(url.rsplit("=", 1)[1])
+        self.requested.append(page)
+        if page not in self.pages:
+            raise requests.ConnectionError("reset")
+        return PageResponse(self.pages[page])
+
+
+def test_iter_reviews_is_lazy_and_skips_failed_pages(capsys):
+    session = FeedSession({1: PAGE.format(review_html(1) + review_html(2)),
+                           3: PAGE.format(review_html(3))})
+    reviews = feedback.iter_reviews(1, 3, delay=0, session=session)
+
+    first = next(reviews)
+    assert (first.review_id, first.page, first.company_slug) == ("1", 1, "/acme")
+    assert session.requested == [1]
+    assert not hasattr(first, "__dict__")
+    assert [r.review_id for r in reviews] == ["2", "3"]
+    assert session.requested == [1, 2, 3]
+    assert "[ERROR] page 2" in capsys.readouterr().out
+
+
+def make_review(rid: int, page: int) -> feedback.Review:
+    return feedback.Review(
+        review_id=str(rid), reviewer_name="r", company_name="Acme", company_slug="/acme",
+        company_url="", rating=5, review_text="", review_url="", has_images=False, page=page,
+    )
+
+
+def test_only_complete_crawls_record_page_volumes(tmp_path, monkeypatch):
+    open_store = aggregates.open_store
+    monkeypatch.setattr(aggregates, "open_store", lambda: open_store(tmp_path / "agg.sqlite"))
+    monkeypatch.setattr(feedback, "OUTPUT_PATH", tmp_path / "feedbacks.csv")
+
+    def scrape(pages: dict, start: int, end: int, last_page: int = 3):
+        def fake_iter(start, end, delay, stream, failed):
+            failed.extend(p for p in range(start, end + 1) if p not in pages)
+            for page in range(start, end + 1):
+                yield from (make_review(rid, page) for rid in pages.get(page, []))
+        monkeypatch.setattr(feedback, "iter_reviews", fake_iter)
+        feedback.scrape_all(start, end, 0, last_page=last_page)
+        with open_store(tmp_path / "agg.sqlite") as conn:
+            return aggregates.load_frames(conn)[1].values.tolist()
+
+    assert scrape({1: [9, 8], 2: [7], 3: [6]}, 1, 3) == [[1, 2], [2, 1], [3, 1]]
+    assert scrape({1: [11, 10, 9], 2: [8]}, 1, 2) == [[1, 2], [2, 1], [3, 1]]
+    assert scrape({2: [9, 8, 7]}, 1, 3) == [[1, 2], [2, 1], [3, 1]]       # page 1 failed
+    assert scrape({1: [11, 10], 2: [9, 8], 3: [7, 6]}, 1, 3) == [[1, 2], [2, 2], [3, 2]]
@@ -0,0 +1,48 @@
+import time
+
+import pytest
+
+import generate_charts as gc
+
+
+def test_render_reports_only_saved_charts(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(gc, "CHARTS_DIR", tmp_path)
+    monkeypatch.setattr(gc, "load_data", lambda: None)
+
+    def chart_01_drawn():
+        fig, ax = gc.subplots(figsize=(2, 2))
+        ax.plot([0, 1], [1, 0])
+        gc.save(fig, "01_drawn.png")
+
+    def chart_02_skipped():
+        print("  Skipped 02_skipped.png (no data)")
+
+    def chart_03_broken():
+        raise KeyError("rating")
+
+    saved = gc.render([chart_01_drawn, chart_02_skipped, chart_03_broken])
+
+    assert saved == ["01_drawn"]
+    assert [p.name for p in tmp_path.iterdir()] == ["01_drawn.png"]
+    assert "[ERROR] chart_03_broken: KeyError('rating')" in capsys.readouterr().out
+
+
+def test_profile_splits_prep_draw_save(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(gc, "CHARTS_DIR", tmp_path)
+    monkeypatch.setattr(gc, "load_data", lambda: None)
+
+    def chart_01_slow_prep():
+        time.sleep(0.05)
+        fig, ax = gc.subplots(figsize=(2, 2))
+        ax.plot([0, 1], [1, 0])
+        gc.save(fig, "01_slow_prep.png")
+
+    gc.profile_charts([chart_01_slow_prep], tmp_path / "prof")
+
+    row = next(line for line in capsys.readouterr().out.splitlines()
+               if "chart_01_slow_prep" in line)
+    prep, draw, save, total = map(float, row.split()[2:6])
+    assert prep >= 50
+    assert total == pytest.approx(prep + draw + save, abs=0.2)
+    assert (tmp_path / "prof" / "chart_01_slow_prep.prof").exists()
+    assert (tmp_path / "01_slow_prep.png").exists()
@@ -0,0 +1,24 @@
+import history
+
+
+def company(slug: str, rating: str, reviews: int) -> dict:
+    return {"slug": slug, "name": slug, "category_slug": "c", "category_name": "C",
+            "category_label": "Orta", "rating_value": rating, "review_count": reviews}
+
+
+def test_skipped_profile_fields_carry_forward(tmp_path):
+    with history.open_store(tmp_path / "history.sqlite") as conn:
+        history.record(conn, [company("bolt", "2.5", 10)])
+        _, changed = history.record(
+            conn, [company("bolt", "", 12)], skip_fields=["rating_value", "category_label"],
+        )
+        assert changed == 1                         # review_count only
+        assert [r["rating_value"] for r in history.series(conn, "bolt")] == ["2.5", "2.5"]
+        assert history.snapshot_at(conn)["bolt"]["review_count"] == "12"
+
+
+def test_runs_in_the_same_second_get_their_own_id(tmp_path):
+    with history.open_store(tmp_path / "history.sqlite") as conn:
+        ids = {history.record(conn, [company("bolt", "2.5", n)])[0] for n in range(3)}
+        assert len(ids) == 3
+        assert len({run_at for _, run_at in history.runs(conn)}) == 3
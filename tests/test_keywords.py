@@ -0,0 +1,37 @@
+import keywords
+
+
+def test_tokenize_drops_stopwords_and_short_words():
+    assert keywords.tokenize("İnternet və ÇOX yavaş 5 gün") == ["internet", "yavaş"]
+    assert keywords.tokenize("kart pulu qaytarmadı", ngrams=2) == [
+        "kart", "pulu", "qaytarmadı", "kart pulu", "pulu qaytarmadı"]
+
+
+def test_chunks_add_up_to_one_pass():
+    texts = ["kuryer gecikdi", "yemək soyuq gəldi", "kart bloklandı", "kuryer kobud"]
+    keys = ["wolt", "wolt", "bank", "wolt"]
+
+    whole = keywords.KeywordAccumulator(1 << 10, 1)
+    whole.add_chunk(keys, texts)
+    chunked = keywords.KeywordAccumulator(1 << 10, 1)
+    chunked.add_chunk(keys[:1], texts[:1])
+    chunked.add_chunk(keys[1:], texts[1:])
+
+    assert chunked.groups == whole.groups
+    assert (chunked.counts != whole.counts).nnz == 0
+    assert chunked.docs == {"wolt": 3, "bank": 1}
+
+
+def test_distinctive_terms_per_group_and_rollup():
+    acc = keywords.KeywordAccumulator(1 << 12, 1)
+    acc.add_chunk(["wolt"] * 6 + ["bank"] * 6,
+                  ["kuryer gecikdi"] * 6 + ["kart bloklandı"] * 6)
+
+    top = {group: term for group, term, _, _ in keywords.distinctive_terms(acc, 1, 10, 5)}
+    assert top["wolt"] in ("kuryer", "gecikdi")
+    assert top["bank"] in ("kart", "bloklandı")
+    assert keywords.distinctive_terms(acc, 1, 10, min_docs=7) == []
+
+    by_category = acc.rollup({"wolt": "Çatdırılma", "bank": "Banklar"})
+    assert by_category.docs == {"Çatdırılma": 6, "Banklar": 6}
+    assert by_category.counts.sum() == acc.counts.sum()
@@ -0,0 +1,121 @@
+import sqlite3
+
+import pytest
+import requests
+
+import media
+
+
+class FakeResponse:
+    def __init__(self, body: bytes, content_type: str, fail_after: int | None):
+        self.body, self.fail_after = body, fail_after
+        self.headers = {"Content-Type": content_type}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, chunk_size):
+        for i in range(0, len(self.body), 4):
+            if self.fail_after is not None and i >= self.fail_after:
+                raise requests.ConnectionError("connection reset")
+            yield self.body[i:i + 4]
+
+
+class FakeSession:
+    """Serves ``files`` (url → (bytes, content type)); ``broken`` URLs die mid-body."""
+
+    def __init__(self, files: dict, broken: frozenset = frozenset()):
+        self.files, self.broken = files, broken
+
+    def get(self, url, timeout, stream):
+        body, content_type = self.files[url]
+        return FakeResponse(body, content_type, 8 if url in self.broken else None)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+@pytest.fixture
+def media_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(media, "MEDIA_DIR", tmp_path)
+    monkeypatch.setattr(media, "OBJECTS_DIR", tmp_path / "objects")
+    monkeypatch.setattr(media, "INDEX_PATH", tmp_path / "index.sqlite")
+    return tmp_path
+
+
+def objects(media_dir) -> list[str]:
+    return sorted(p.name for p in (media_dir / "objects").rglob("*") if p.is_file())
+
+
+def test_identical_bytes_are_stored_once_across_suffixes(media_dir, monkeypatch):
+    photo = b"\x89PNG same bytes"
+    files = {
+        "https://x/a.jpg": (photo, "image/jpeg"),
+        "https://x/b.png": (photo, "image/png"),
+        "https://x/c": (photo, "image/webp"),
+        "https://x/d.jpg": (b"other bytes", "image/jpeg"),
+    }
+    monkeypatch.setattr(media, "make_session", lambda workers: FakeSession(files))
+    jobs = [media.MediaJob(url, "attachment", "1") for url in files]
+
+    new = media.fetch_all(jobs, workers=2)
+
+    assert len(new) == 2
+    assert len(objects(media_dir)) == 2
+    assert all("." not in name for name in objects(media_dir))
+    with sqlite3.connect(media_dir / "index.sqlite") as conn:
+        rows = dict(conn.execute("SELECT url, suffix FROM media"))
+        hashes = {h for h, in conn.execute("SELECT sha256 FROM media")}
+    assert rows == {"https://x/a.jpg": ".jpg", "https://x/b.png": ".png",
+                    "https://x/c": ".webp", "https://x/d.jpg": ".jpg"}
+    assert len(hashes) == 2
+
+    # Re-runs skip indexed URLs
+    assert media.fetch_all(jobs, workers=2) == []
+
+
+def test_base_url_only_changes_where_bytes_come_from(media_dir, monkeypatch):
+    files = {"http://127.0.0.1:8000/img/a.jpg?v=2": (b"mirrored", "image/jpeg")}
+    monkeypatch.setattr(media, "make_session", lambda workers: FakeSession(files))
+    jobs = [media.MediaJob("https://beledci.az/img/a.jpg?v=2", "avatar", "acme")]
+
+    assert len(media.fetch_all(jobs, 1, base_url="http://127.0.0.1:8000")) == 1
+    with sqlite3.connect(media_dir / "index.sqlite") as conn:
+        assert [u for u, in conn.execute("SELECT url FROM media")] == [jobs[0].url]
+
+    # Without the mirror the same URL is already indexed: nothing to fetch
+    assert media.fetch_all(jobs, 1) == []
+
+
+def test_failed_download_leaves_no_partial_file(media_dir, monkeypatch):
+    files = {"https://x/big.jpg": (b"0123456789abcdef", "image/jpeg")}
+    session = FakeSession(files, broken=frozenset(files))
+    monkeypatch.setattr(media, "make_session", lambda workers: session)
+
+    assert media.fetch_all([media.MediaJob("https://x/big.jpg", "avatar", "acme")], 1) == []
+    assert objects(media_dir) == []
+    with sqlite3.connect(media_dir / "index.sqlite") as conn:
+        assert conn.execute("SELECT COUNT(*) FROM media").fetchone()[0] == 0
+
+
+def test_old_suffixed_objects_are_renamed(media_dir):
+    shard = media_dir / "objects" / "ab"
+    shard.mkdir(parents=True)
+    (shard / "abcd.jpg").write_bytes(b"x")
+    (shard / "abef.png").write_bytes(b"y")
+    (shard / "abef.jpg").write_bytes(b"y")
+    with sqlite3.connect(media_dir / "index.sqlite") as conn:
+        conn.execute("CREATE TABLE media (url TEXT PRIMARY KEY, sha256 TEXT NOT NULL, "
+                      "size INTEGER NOT NULL, content_type TEXT NOT NULL, "
+                      "kind TEXT NOT NULL, ref TEXT NOT NULL)")
+    media.open_index().close()
+    assert objects(media_dir) == ["abcd", "abef"]
@@ -0,0 +1,64 @@
+import pandas as pd
+
+import feedback
+import reconcile
+
+
+def review(rid, slug="bolt"):
+    return feedback.Review(rid, "ali", slug.title(), slug, f"https://x/{slug}", 5,
+                           "ok", f"https://x/r/{rid}", False, None)
+
+
+def fake_site(monkeypatch, pages, last_page=None):
+    """Serve ``pages`` (lists of review_ids) as the company's review pages."""
+    requested = []
+
+    def page(session, slug, name, n):
+        requested.append(n)
+        return [review(rid, slug) for rid in (pages[n - 1] if n <= len(pages) else [])]
+
+    monkeypatch.setattr(feedback, "get_last_page",
+                        lambda session, path: last_page or len(pages))
+    monkeypatch.setattr(feedback, "iter_company_page", page)
+    return requested
+
+
+def test_disagreements():
+    feedbacks = pd.DataFrame({
+        "review_id": ["1", "2", "3", "4", "5", "6"],
+        "company_slug": ["/bolt", "bolt", "/wolt", "/wolt", "/wolt", "/gone"],
+    })
+    companies = pd.DataFrame({
+        "slug": ["bolt", "wolt", "umico"],
+        "name": ["Bolt", "Wolt", "Umico"],
+        "review_count": [2, 1, 4],
+    })
+    out = reconcile.disagreements(feedbacks, companies)
+
+    assert out.index.tolist() == ["umico", "wolt"]
+    assert out["feed_count"].tolist() == [0, 3]
+    assert out["delta"].tolist() == [4, -2]
+
+
+def test_deficit_stops_once_missing_reviews_are_found(monkeypatch):
+    requested = fake_site(monkeypatch, [["10", "9"], ["8", "7"], ["6", "5"]])
+    found, listed, pages = reconcile.crawl_company(
+        None, "bolt", "Bolt", 2, {"10", "8"}, delay=0, max_pages=50)
+
+    assert [r.review_id for r in found] == ["9", "7"]
+    assert pages == 2 and requested == [1, 2]
+    assert listed == {"10", "9", "8", "7"}
+
+
+def test_surplus_lists_all_pages_unless_cut_short(monkeypatch):
+    fake_site(monkeypatch, [["10", "9"], ["9", "7"]])
+    found, listed, pages = reconcile.crawl_company(
+        None, "bolt", "Bolt", -1, {"10", "9", "8", "7"}, delay=0, max_pages=50)
+    assert found == [] and pages == 2
+    assert listed == {"10", "9", "7"}
+
+    fake_site(monkeypatch, [["10"], ["9"], ["8"]])
+    found, listed, pages = reconcile.crawl_company(
+        None, "bolt", "Bolt", -1, {"10"}, delay=0, max_pages=2)
+    assert pages == 2 and listed is None
+    assert [r.review_id for r in found] == ["9"]
@@ -0,0 +1,37 @@
+import resolver
+
+COMPANIES = [
+    {"slug": "kontakt-home", "name": "Kontakt Home"},
+    {"slug": "bravo", "name": "Bravo Supermarket"},
+    {"slug": "mcdonalds", "name": "McDonald's Azərbaycan"},
+    {"slug": "azercell", "name": "Azərcell"},
+]
+
+
+def test_fold_handles_azerbaijani_letters_and_punctuation():
+    assert resolver.fold("McDonald's Azərbaycan") == "mcdonalds azerbaycan"
+    assert resolver.fold("  ŞƏKİ—Çay  ") == "seki cay"
+
+
+def test_exact_matches_win_before_trigrams():
+    r = resolver.CompanyResolver(COMPANIES)
+    assert r.resolve("anything", "/bravo").method == "slug"
+    match = r.resolve("AZERCELL", "/renamed")
+    assert (match.slug, match.method) == ("azercell", "name")
+
+
+def test_trigram_fallback_and_threshold():
+    r = resolver.CompanyResolver(COMPANIES)
+    match = r.resolve("Kontakt Hom")
+    assert (match.slug, match.method) == ("kontakt-home", "trigram")
+    assert 0.6 <= match.confidence < 1
+    assert r.resolve("Wolt") is None
+    assert resolver.CompanyResolver(COMPANIES, threshold=0.95).resolve("Kontakt Hom") is None
+
+
+def test_resolve_all_resolves_each_pair_once():
+    r = resolver.CompanyResolver(COMPANIES)
+    refs = [("/bravo", "Bravo"), ("/bravo", "Bravo"), ("", "Macdonalds Azerbaycan")]
+    matches = r.resolve_all(refs)
+    assert len(matches) == 2
+    assert matches["", "Macdonalds Azerbaycan"].slug == "mcdonalds"
@@ -0,0 +1,58 @@
+import pytest
+
+import reviewers
+
+
+def build():
+    index = reviewers.CoReviewIndex()
+    index.add(
+        [1, 2, 3, 4, 5, 6, 7],
+        ["ali", "ali", "ali", "vusal", "vusal", "leyla", "leyla"],
+        ["wolt", "bolt", "umico", "wolt", "bolt", "wolt", "umico"],
+    )
+    return index
+
+
+def test_add_skips_seen_and_repeated_review_ids():
+    index = build()
+    assert index.add([7, 8, 8], ["leyla", "leyla", "leyla"], ["umico", "bolt", "bolt"]) == 1
+    assert index.add([1, 8], ["ali", "leyla"], ["wolt", "bolt"]) == 0
+    assert index.counts.sum() == 8
+    assert index.counts.shape == (3, 3)
+
+
+def test_save_load_round_trip(tmp_path):
+    index = build()
+    index.save(tmp_path)
+    loaded = reviewers.CoReviewIndex.load(tmp_path)
+
+    assert loaded.reviewers == index.reviewers
+    assert loaded.companies == index.companies
+    assert (loaded.counts != index.counts).nnz == 0
+    assert loaded.add([3, 9], ["ali", "aysel"], ["umico", "wolt"]) == 1
+    assert reviewers.CoReviewIndex.load(tmp_path / "missing").counts.nnz == 0
+
+
+def test_company_similarity():
+    sim = build().company_similarity(min_shared=2)
+    pairs = {tuple(sorted((a, b))): (n, c) for a, b, n, c in
+             sim[["company_a", "company_b", "shared_reviewers", "cosine"]].itertuples(index=False)}
+
+    # wolt: ali, vusal, leyla; bolt: ali, vusal; umico: ali, leyla
+    assert pairs[("bolt", "wolt")] == (2, pytest.approx(2 / 6 ** 0.5, abs=1e-4))
+    assert pairs[("umico", "wolt")] == (2, pytest.approx(2 / 6 ** 0.5, abs=1e-4))
+    assert ("bolt", "umico") not in pairs
+    assert len(build().company_similarity(min_shared=1)) == 3
+
+
+def test_top_reviewers_per_category():
+    index = build()
+    index.add([8], ["leyla"], ["wolt"])
+    top = index.top_reviewers({"wolt": "food", "bolt": "taxi", "umico": "shop"}, top=2)
+
+    food = top[top["category"] == "food"]
+    assert food["reviewer_name"].tolist()[0] == "leyla"
+    assert food["reviews"].tolist() == [2, 1]
+    taxi = top[top["category"] == "taxi"]
+    assert sorted(taxi["reviewer_name"]) == ["ali", "vusal"]
+    assert set(top["companies"]) == {1}
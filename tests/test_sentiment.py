@@ -0,0 +1,42 @@
+import pytest
+
+from sentiment import score_batch
+
+
+def score(text: str) -> float:
+    return float(score_batch([text])[0])
+
+
+@pytest.mark.parametrize("text", [
+    "razı deyiləm", "razı deyilik", "razı deyilsiniz", "razı deyillər",
+    "yaxşı deyil", "yaxşı deyildi", "yaxşı yoxdur",
+])
+def test_post_negators_match_any_suffix(text):
+    assert score(text) < 0
+
+
+def test_intensifier_deepens_negated_word():
+    assert score("heç razı deyiləm") < score("razı deyiləm") < 0
+
+
+def test_intensifier_scales_next_word():
+    assert score("çox yaxşı") > score("yaxşı") > 0
+    assert score("çox pis") < score("pis") < 0
+
+
+def test_negation_is_milder_than_opposite_word():
+    assert score("pis") < score("yaxşı deyil") < 0
+
+
+def test_words_starting_with_yox_are_not_all_negators():
+    assert score("yaxşı yoxladılar") == score("yaxşı")
+
+
+def test_pre_negator_flips_next_word():
+    assert score("не плохо") > 0
+
+
+def test_batch_keeps_reviews_apart():
+    # A negator must not reach into the previous review of the batch
+    scores = score_batch(["yaxşı", "deyil"])
+    assert scores[0] > 0 and scores[1] == 0
@@ -0,0 +1,115 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+import stats_service
+
+COMPANIES = """slug,name,category_slug,category_name,rating_value,review_count
+abb,ABB,bank,Banklar,2.1,5
+kapital,Kapital,bank,Banklar,1.4,3
+bolt,Bolt,taxi,Taksi,3.9,oops
+uber,Uber,taxi,Taksi,4.2,2
+"""
+
+# (slug, ratings): bolt has a broken review_count, so its reviews are unmatched
+REVIEWS = {"abb": [1, 1, 2, 5], "kapital": [1, 1, 1], "uber": [5, 4], "bolt": [5],
+           "ghost": [3]}
+
+
+@pytest.fixture
+def args(tmp_path):
+    companies = tmp_path / "companies.csv"
+    companies.write_text(COMPANIES, encoding="utf-8")
+    feedbacks = tmp_path / "feedbacks.csv"
+    rows = [f"/{slug},{rating}" for slug, ratings in REVIEWS.items() for rating in ratings]
+    feedbacks.write_text("company_slug,rating\n" + "\n".join(rows) + "\n/uber,x\n",
+                         encoding="utf-8")
+    return SimpleNamespace(companies=companies, feedbacks=feedbacks, cache_size=16)
+
+
+@pytest.fixture
+def index(args):
+    return stats_service.StatsIndex(args.companies, args.feedbacks, args.cache_size)
+
+
+def get(index, target):
+    status, body = index.respond(target)
+    return status, json.loads(body)
+
+
+def test_malformed_cells_skip_their_rows(index):
+    status, health = get(index, "/health")
+    assert status == 200
+    assert health["companies"] == 3
+    assert health["skipped_companies"] == 1
+    assert health["unmatched_reviews"] == 3          # bolt, ghost and the "x" rating
+
+
+def test_top_orders_and_filters(index):
+    _, top = get(index, "/top?by=reviews&k=2")
+    assert [c["slug"] for c in top] == ["abb", "kapital"]
+
+    _, top = get(index, "/top?by=one_star_rate&k=10")
+    assert [c["slug"] for c in top] == ["kapital", "abb", "uber"]
+
+    _, top = get(index, "/top?by=avg_rating&category=bank&min_reviews=4")
+    assert [c["slug"] for c in top] == ["abb"]
+    assert top[0]["stars"] == [2, 1, 0, 0, 1]
+
+
+@pytest.mark.parametrize("target, status", [
+    ("/companies/nope", 404),
+    ("/categories/nope", 404),
+    ("/top?category=nope", 404),
+    ("/top?by=rating", 400),
+    ("/top?k=ten", 400),
+    ("/elsewhere", 404),
+])
+def test_error_statuses(index, target, status):
+    assert get(index, target)[0] == status
+
+
+class Writer:
+    def __init__(self):
+        self.data, self.closed = b"", False
+
+    def write(self, data):
+        self.data += data
+
+    async def drain(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+def exchange(args, request: bytes) -> bytes:
+    """Feed a request without closing the stream; return what was written."""
+    service = stats_service.StatsService(args)
+
+    async def run():
+        reader = asyncio.StreamReader()
+        reader.feed_data(request)
+        writer = Writer()
+        try:
+            await asyncio.wait_for(service.handle(reader, writer), timeout=0.5)
+        except asyncio.TimeoutError:
+            return writer.data + b"<open>"
+        return writer.data
+
+    return asyncio.run(run())
+
+
+def test_http10_closes_unless_asked(args):
+    out = exchange(args, b"GET /health HTTP/1.0\r\n\r\n")
+    assert out.count(b"HTTP/1.1 200") == 1 and b"Connection: close" in out
+    assert not out.endswith(b"<open>")
+
+    out = exchange(args, b"GET /health HTTP/1.0\r\nConnection: keep-alive\r\n\r\n")
+    assert out.endswith(b"<open>")
+
+    out = exchange(args, b"GET /health HTTP/1.1\r\n\r\nGET /categories HTTP/1.1\r\n"
+                          b"Connection: close\r\n\r\n")
+    assert out.count(b"HTTP/1.1 200") == 2 and not out.endswith(b"<open>")
@@ -0,0 +1,77 @@
+import csv
+
+import pandas as pd
+import pytest
+
+import textstore
+
+
+def write_feedbacks(path, reviews):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["review_id", "company_id", "rating", "review_text"])
+        for rid, text in reviews:
+            writer.writerow([rid, 7, 5, text])
+
+
+def review_text(rid):
+    return f"Sifariş #{rid} vaxtında çatdı, məhsul əladır, təşəkkür edirəm"
+
+
+def build(tmp_path, **kwargs):
+    return textstore.build(tmp_path / "feedbacks.csv", tmp_path / "store",
+                           meta_csv=tmp_path / "meta.csv", block_size=4,
+                           chunk_size=10, **kwargs)
+
+
+def test_round_trip_by_review_id(tmp_path):
+    reviews = [(rid, review_text(rid)) for rid in range(3, 40, 3)] + [(100, "")]
+    write_feedbacks(tmp_path / "feedbacks.csv", reviews)
+
+    assert build(tmp_path) == len(reviews)
+    with textstore.TextStore(tmp_path / "store") as store:
+        assert len(store) == len(reviews)
+        for rid, text in reviews:
+            assert store.get(rid) == text
+        assert store.get(4) is None and store.get(10_000) is None
+        ids = [39, 4, 3, 100, 21]
+        assert store.get_many(ids) == [dict(reviews).get(rid) for rid in ids]
+
+
+def test_rerun_adds_only_new_reviews(tmp_path):
+    reviews = [(rid, review_text(rid)) for rid in range(1, 13)]
+    write_feedbacks(tmp_path / "feedbacks.csv", reviews)
+    build(tmp_path)
+    assert build(tmp_path) == 0
+
+    reviews += [(rid, review_text(rid)) for rid in (20, 21)]
+    write_feedbacks(tmp_path / "feedbacks.csv", reviews)
+    assert build(tmp_path) == 2
+
+    meta = pd.read_csv(tmp_path / "meta.csv")
+    assert meta["review_id"].tolist() == [rid for rid, _ in reviews]
+    assert "review_text" not in meta.columns
+    with textstore.TextStore(tmp_path / "store") as store:
+        assert store.get(21) == review_text(21)
+
+
+def test_crash_before_commit_leaves_no_duplicate_meta(tmp_path, monkeypatch):
+    reviews = [(rid, review_text(rid)) for rid in range(1, 9)]
+    write_feedbacks(tmp_path / "feedbacks.csv", reviews)
+    build(tmp_path)
+
+    reviews += [(rid, review_text(rid)) for rid in range(9, 15)]
+    write_feedbacks(tmp_path / "feedbacks.csv", reviews)
+
+    def crash(self):
+        raise OSError("disk full")
+
+    with monkeypatch.context() as m:
+        m.setattr(textstore.StoreWriter, "commit", crash)
+        with pytest.raises(OSError):
+            build(tmp_path)
+    assert pd.read_csv(tmp_path / "meta.csv")["review_id"].tolist() == list(range(1, 9))
+
+    assert build(tmp_path) == 6
+    assert pd.read_csv(tmp_path / "meta.csv")["review_id"].tolist() == list(range(1, 15))
+    assert not (tmp_path / "meta.csv.tmp").exists()